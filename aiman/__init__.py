@@ -1,17 +1,129 @@
-"""aiman module"""
-from .client._ai_man_client import AimanClient
-from .core.credentials import TokenCredential
-from .core.util import Util
-from .core.classes import (
-    AIModel,
-    Attachment,
-    DataSource,
-    PromptOptions)
+"""aiman module
+
+The exports are imported on first access, so "import aiman" stays cheap and e.g. the
+async client (httpx) is only loaded by the processes using it.
+"""
+from typing import TYPE_CHECKING, List
+from .core.lazy import lazy_exports
+
+if TYPE_CHECKING:
+    from .client._ai_man_client import AimanClient
+    from .client._async_ai_man_client import AsyncAimanClient
+    from .core.credentials import TokenCredential
+    from .core.async_credentials import AsyncTokenCredential
+    from .core.token_store import (
+        FileTokenStore,
+        MemoryTokenStore,
+        TokenStore)
+    from .core.util import Util
+    from .core.session import SessionOptions
+    from .core.cache import (
+        AttachmentCache,
+        MemoryResponseCache,
+        SQLiteResponseCache)
+    from .core.retry import RetryPolicy
+    from .core.catalog import ModelCatalog
+    from .core.codec import JsonCodec
+    from .core.compression import CompressionOptions
+    from .core.upload import (
+        ChunkedUploadOptions,
+        UploadProgress)
+    from .core.throttle import (
+        FileBucketBackend,
+        RateLimit,
+        RouteLimiter)
+    from .core.hosts import (
+        LATENCY_WEIGHTED,
+        LEAST_OUTSTANDING,
+        HostPool)
+    from .core.hedging import (
+        HedgePolicy,
+        HedgeStats)
+    from .core.instrumentation import (
+        MultiObserver,
+        Observer,
+        OpenTelemetryObserver,
+        PrometheusObserver,
+        RequestEvent)
+    from .core.exceptions import (
+        AimanError,
+        AuthError,
+        RateLimitedError,
+        ServerError)
+    from .core.classes import (
+        AIModel,
+        Attachment,
+        DataSource,
+        PromptOptions)
+
+_EXPORTS = {
+    ".client._ai_man_client": ("AimanClient",),
+    ".client._async_ai_man_client": ("AsyncAimanClient",),
+    ".core.credentials": ("TokenCredential",),
+    ".core.async_credentials": ("AsyncTokenCredential",),
+    ".core.token_store": ("FileTokenStore", "MemoryTokenStore", "TokenStore"),
+    ".core.util": ("Util",),
+    ".core.session": ("SessionOptions",),
+    ".core.cache": ("AttachmentCache", "MemoryResponseCache", "SQLiteResponseCache"),
+    ".core.retry": ("RetryPolicy",),
+    ".core.catalog": ("ModelCatalog",),
+    ".core.codec": ("JsonCodec",),
+    ".core.compression": ("CompressionOptions",),
+    ".core.upload": ("ChunkedUploadOptions", "UploadProgress"),
+    ".core.throttle": ("FileBucketBackend", "RateLimit", "RouteLimiter"),
+    ".core.hosts": ("HostPool", "LATENCY_WEIGHTED", "LEAST_OUTSTANDING"),
+    ".core.hedging": ("HedgePolicy", "HedgeStats"),
+    ".core.instrumentation": (
+        "MultiObserver", "Observer", "OpenTelemetryObserver", "PrometheusObserver", "RequestEvent"),
+    ".core.exceptions": ("AimanError", "AuthError", "RateLimitedError", "ServerError"),
+    ".core.classes": ("AIModel", "Attachment", "DataSource", "PromptOptions")
+}
+"""Exported names by module"""
+
+_MODULES = {name: module for module, names in _EXPORTS.items() for name in names}
+__getattr__ = lazy_exports(__name__, _MODULES)
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(__all__))
+
 
 __all__ = [
     "AimanClient",
+    "AsyncAimanClient",
     "TokenCredential",
+    "AsyncTokenCredential",
+    "TokenStore",
+    "MemoryTokenStore",
+    "FileTokenStore",
     "Util",
+    "SessionOptions",
+    "AttachmentCache",
+    "MemoryResponseCache",
+    "SQLiteResponseCache",
+    "RetryPolicy",
+    "ModelCatalog",
+    "JsonCodec",
+    "CompressionOptions",
+    "ChunkedUploadOptions",
+    "UploadProgress",
+    "RouteLimiter",
+    "RateLimit",
+    "FileBucketBackend",
+    "HostPool",
+    "LEAST_OUTSTANDING",
+    "LATENCY_WEIGHTED",
+    "HedgePolicy",
+    "HedgeStats",
+    "Observer",
+    "MultiObserver",
+    "PrometheusObserver",
+    "OpenTelemetryObserver",
+    "RequestEvent",
+    "AimanError",
+    "AuthError",
+    "RateLimitedError",
+    "ServerError",
     "AIModel",
     "Attachment",
     "DataSource",
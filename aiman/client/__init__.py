@@ -1,3 +1,19 @@
-"""Client module"""
-from ._ai_man_client import AimanClient
-from ._ai_man_client import AIModel
+"""Client module
+
+The clients are imported on first access, the sync client does not load httpx.
+"""
+from typing import TYPE_CHECKING
+from aiman.core.lazy import lazy_exports
+
+if TYPE_CHECKING:
+    from ._ai_man_client import AimanClient
+    from ._ai_man_client import AIModel
+    from ._async_ai_man_client import AsyncAimanClient
+
+_MODULES = {
+    "AimanClient": "._ai_man_client",
+    "AIModel": "._ai_man_client",
+    "AsyncAimanClient": "._async_ai_man_client"
+}
+"""Modules by their exported names"""
+__getattr__ = lazy_exports(__name__, _MODULES)
@@ -1,68 +1,221 @@
 """Module providing a aiman service client"""
-import json
-import base64
+import concurrent.futures
+from collections import deque
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    Future,
+    ThreadPoolExecutor,
+    wait
+)
 from typing import (
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
     List,
-    Optional
+    Optional,
+    Set,
+    Tuple,
+    Union
 )
+import threading
+import time
 import requests
+import urllib3
 from aiman.core.util import Util
 from aiman.core.credentials import TokenCredential
+from aiman.core.token_store import TokenStore
+from aiman.core.session import RequestHandle, SessionOptions
+from aiman.core.encoding import StreamingJsonBody
+from aiman.core.cache import AttachmentCache, ResponseCache
+from aiman.core.retry import RetryPolicy
+from aiman.core.codec import JsonCodec
+from aiman.core.compression import CompressionOptions, TransferMeter
+from aiman.core.instrumentation import Observer, RequestEvent
+from aiman.core.catalog import ModelCatalog
+from aiman.core.readiness import ReadinessTracker, settle
+from aiman.core.upload import ChunkedUploadOptions, UploadJournal
+from aiman.core.exceptions import AimanError
+from aiman.core.streaming import StreamDecoder
+from aiman.core.throttle import RateLimiter, RouteLimiter
+from aiman.core.hosts import HostAttempt, HostPool
+from aiman.core.hedging import HedgePolicy, HedgeTracker, race_winner
 from aiman.core.classes import (
     AIModel,
     Attachment,
     DataSource,
-    PromptOptions,
+    IngestionProgress,
+    IngestionSummary,
+    PromptResult,
     Route,
-    Prompt,
     RequestType
 )
+from ._base_client import BaseClient
+
+
+def _close_response(future: Future) -> None:
+    """Close the response of a request which lost the race"""
+    if not future.cancelled() and future.exception() is None:
+        future.result().close()
 
-class AimanClient():
+
+class AimanClient(BaseClient):
     """Represents the AI Manager Service Client"""
 
     def __init__(self,
-                 host_url:str = None,
+                 host_url:Union[str, List[str], HostPool] = None,
                  user_name:str = None,
                  password:str = None,
-                 token_credential:TokenCredential = None) -> None:
+                 token_credential:TokenCredential = None,
+                 session:requests.Session = None,
+                 session_options:SessionOptions = None,
+                 stream_attachments:bool = False,
+                 attachment_cache:AttachmentCache = None,
+                 retry_policy:RetryPolicy = None,
+                 response_cache:ResponseCache = None,
+                 model_catalog:ModelCatalog = None,
+                 json_codec:JsonCodec = None,
+                 compression:CompressionOptions = None,
+                 observer:Observer = None,
+                 route_limiter:RouteLimiter = None,
+                 chunked_upload:ChunkedUploadOptions = None,
+                 token_store:TokenStore = None,
+                 hedge_policy:HedgePolicy = None) -> None:
         """ Instantiate a new Client to communicate with an AIMan API
             NOTE: Use host, user and password or a TokenCredential Object
 
         Args:
-            host_url (str, optional): _description_. Defaults to None.
+            host_url (Union[str, List[str], HostPool], optional): The API-Host, or several equivalent hosts
+                (a list or a HostPool) to balance the requests across with a token per host. Defaults to None.
             user_name (str, optional): _description_. Defaults to None.
             password (str, optional): _description_. Defaults to None.
             token_credential (TokenCredential, optional): _description_. Defaults to None.
+            session (requests.Session, optional): Session to share with the credential. Defaults to None.
+            session_options (SessionOptions, optional): Pool settings used when the client
+                creates its own session. Its max_retries require RetryPolicy.disabled(), as they
+                would multiply the attempts of the retry policy. Defaults to None.
+            stream_attachments (bool, optional): Base64 encode attached files chunk by chunk while
+                sending instead of building the whole body in memory. Defaults to False.
+            attachment_cache (AttachmentCache, optional): Reuse encoded attachments of unchanged
+                files for prompt() and add_documents(). Defaults to None.
+            retry_policy (RetryPolicy, optional): Retries of transient failures. Defaults to
+                RetryPolicy() which retries idempotent requests up to 3 times. The urllib3 retries of a
+                passed session add to its attempts.
+            response_cache (ResponseCache, optional): Serve repeated identical prompts from a
+                MemoryResponseCache or SQLiteResponseCache. Defaults to None.
+            model_catalog (ModelCatalog, optional): Cache the models for get_models() and lookups
+                by name, uuid and model tag id. Defaults to None.
+            json_codec (JsonCodec, optional): Encodes request and decodes response bodies.
+                Defaults to JsonCodec() which uses the fastest installed backend.
+            compression (CompressionOptions, optional): Compress large request bodies with gzip or zstd.
+                Defaults to None.
+            observer (Observer, optional): Receives the timings of every call, e.g. a PrometheusObserver
+                or OpenTelemetryObserver. Defaults to None.
+            route_limiter (RouteLimiter, optional): Limits the requests per second and in flight by route group,
+                share one between clients (or a FileBucketBackend between processes) for a common quota.
+                Defaults to None.
+            chunked_upload (ChunkedUploadOptions, optional): Upload large attachments and documents in
+                resumable parts instead of embedding them as base64. Defaults to None.
+            token_store (TokenStore, optional): Reuse the access token of an earlier client of the same host
+                and user instead of logging in, e.g. a FileTokenStore shared by short-lived processes.
+                Ignored with a token_credential. Defaults to None.
+            hedge_policy (HedgePolicy, optional): Send a slow prompt a second time and take the first answer,
+                the slower request is aborted. Applies to prompts with temperature 0 and a fixed seed only.
+                Defaults to None.
 
         Raises:
-            ValueError: Missing credential informations
+            ValueError: Missing credential informations or max_retries of the session options
+                with a retrying retry policy
         """
+        self.host_pool = self._host_pool(host_url) if token_credential is None else None
+        host_urls = self.host_pool.urls if self.host_pool is not None else [host_url]
         if token_credential is None:
-            if host_url is None or len(host_url) == 0:
-                raise ValueError("Missing parameter: host_url")
-            if password is None or len(host_url) == 0:
-                raise ValueError("Missing parameter: password. ")
-            if user_name is None or len(host_url) == 0:
-                raise ValueError("Missing parameter: username. ")
-            token_credential = TokenCredential(api_host_url=host_url, user_name=user_name,password=password)
-        self.credential = token_credential
+            self._validate_login(host_url=host_urls[0], user_name=user_name, password=password)
+        self._owns_session = session is None and token_credential is None
+        self._owns_credential = token_credential is None
+        if retry_policy is None:
+            retry_policy = RetryPolicy()
+        if session is None:
+            if token_credential is not None:
+                session = token_credential.session
+            else:
+                session = self._session_options(session_options or SessionOptions(), retry_policy).create_session()
+        self._set_credentials(token_credential, host_urls, lambda url: TokenCredential(
+            api_host_url=url, user_name=user_name, password=password, session=session, token_store=token_store))
+        self.session = session
         self.request_timeout = 200
+        self.stream_attachments = stream_attachments
+        self.attachment_cache = attachment_cache
+        self.retry_policy = retry_policy
+        self.response_cache = response_cache
+        if json_codec is not None:
+            self.json_codec = json_codec
+        self.compression = compression
+        self.transfer_meter = TransferMeter()
+        self.observer = observer
+        self.route_limiter = route_limiter
+        self.chunked_upload = chunked_upload
+        self.upload_journal = UploadJournal(
+            chunked_upload.journal_path, chunked_upload.journal_ttl) if chunked_upload is not None else None
+        self.model_catalog = model_catalog.bind(self._load_models) if model_catalog is not None else None
+        self.hedge_tracker = HedgeTracker(hedge_policy) if hedge_policy is not None else None
+
+    @staticmethod
+    def _session_options(options: SessionOptions, retry_policy: RetryPolicy) -> SessionOptions:
+        """Warning. This method is private and should not be called manually
+           Rejects adapter retries while the retry policy retries, so the attempts do not multiply
+        """
+        if retry_policy.max_attempts > 1 and options.max_retries:
+            raise ValueError("max_retries of the session options require RetryPolicy.disabled()")
+        return options
+
+    def __enter__(self) -> "AimanClient":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the client session and credential if they were created by the client"""
+        if self.model_catalog is not None:
+            self.model_catalog.close()
+        if self._owns_credential:
+            for credential in self.credentials.values():
+                credential.close()
+        if self._owns_session:
+            self.session.close()
 
     def get_models(self) -> List[AIModel]:
-        """Get all available models to prompt on
+        """Get all available models to prompt on, served by the model catalog if the client has one
 
         Returns:
             List[AIModel]: List of available AIModel objects
         """
+        if self.model_catalog is not None:
+            return self.model_catalog.models()
         results = self._perform_request(
             request_type=RequestType.GET, route=Route.GET_MODELS.value)
-        models = []
-        for model in results['Models']:
-            new_model = AIModel()
-            models.append(new_model.from_dict(model))
+        return self._parse_models(results)
 
-        return models
+    def _load_models(self, validators: Dict[str, str]) -> Tuple[Optional[List[AIModel]], Dict[str, str]]:
+        """Warning. This method is private and should not be called manually
+           Loads the models for the model catalog with a conditional request
+
+        Args:
+            validators (Dict[str, str]): If-None-Match and If-Modified-Since headers
+
+        Returns:
+            Tuple[Optional[List[AIModel]], Dict[str, str]]: The models (None if not modified) and the response headers
+        """
+        with self._observe(RequestType.GET, Route.GET_MODELS.value) as event:
+            response = self._send_with_retries(
+                RequestType.GET, Route.GET_MODELS.value, None, False, headers=validators, event=event)
+            if event is not None:
+                event.status_code = response.status_code
+            if response.status_code == 304:
+                return None, dict(response.headers)
+            return self._parse_models(self._result(RequestType.GET, response, event)), dict(response.headers)
 
     def prompt(self, **kwargs) -> dict:
         """_summary_
@@ -72,46 +225,125 @@ class AimanClient():
             query (str): Query to prompt
             attachments (Optional[str], optional): Absolute path to a file. Defaults to None.
             prompt_options (Optional[PromptOptions], optional): Prompt options. Defaults to None.
+            use_cache (Optional[bool], optional): True caches the response even if the prompt is not
+                deterministic, False bypasses the response cache. Defaults to None, which caches
+                prompts with temperature 0 and a fixed seed only.
 
         Raises:
             ValueError: If any of the required parameters are missing
 
         Returns:
-            dict: The API-Response as dict
+            dict: The API-Response as dict, marked with "fromCache": True if served by the response cache
         """
-        if "model_tag_id" not in kwargs:
-            raise ValueError(
-                "Error: missing required argument: model_tag_id")
-
-        if "query" not in kwargs:
-            raise ValueError(
-                "Error: missing required argument: query")
-
-        model_tag: int = kwargs["model_tag_id"]
-        query = kwargs["query"]
-        attachments = kwargs["attachments"] if Util.has_parameter("attachments", kwargs) else None
-        prompt_options = kwargs["prompt_options"] if Util.has_parameter("prompt_options", kwargs) else PromptOptions()
-        if not isinstance(prompt_options, PromptOptions):
-            raise ValueError("Passed parameter promp_options needs to be type of PromptOptions")
-
-        prompt = Prompt()
-        prompt.prompt = query
-        prompt_dict = prompt.to_dict()
-        prompt_option_dict = prompt_options.to_dict()
-        prompt_dict['options'] = prompt_option_dict
-        if attachments is not None:
-            medias = self._build_media_attachments(attachments)
-            prompt_dict['attachments'] = []
-            for media in medias:
-                prompt_dict['attachments'].append(media.to_dict())
-
-        prompt_dict['raw'] = prompt_options.raw
-        prompt_dict['keepContext'] = prompt_options.keep_context
-
-        route = Route.PROMPT.value.replace("model_tag", f"{model_tag}")
+        files, uploads = {}, {}
+        route, prompt_dict = self._build_prompt_request(kwargs, files=files, uploads=uploads)
+        key = self._response_cache_key(kwargs, route, prompt_dict, files, uploads)
+        cached = self._cached_response(key)
+        if cached is not None:
+            return cached
+        if uploads:
+            # large files are only uploaded once the prompt is valid and missed the cache
+            self._resolve_uploads(prompt_dict, uploads, self._upload_files(list(uploads)))
+        data = StreamingJsonBody(prompt_dict, files, dumps=self.json_codec.dumps) if files else prompt_dict
         response = self._perform_request(
-            RequestType.POST, route=route, data=prompt_dict)
-        return response
+            RequestType.POST, route=route, data=data)
+        return self._cache_response(key, response)
+
+    def prompt_stream(self, **kwargs) -> Iterator[str]:
+        """Prompt a query and receive the answer incrementally
+
+        The request is sent right away, the returned generator yields the text deltas
+        as soon as the server emits them (ndjson, server-sent events or plain text).
+
+        Args:
+            model_tag_id (int): the model tag id
+            query (str): Query to prompt
+            datasource_id (int, optional): Prompt on a datasource instead. Defaults to None.
+            attachments (Optional[str], optional): Absolute path to a file. Defaults to None.
+            prompt_options (Optional[PromptOptions], optional): Prompt options. Defaults to None.
+
+        Raises:
+            ValueError: If any of the required parameters are missing
+
+        Returns:
+            Iterator[str]: The text deltas
+        """
+        route, prompt_dict = self._build_stream_request(kwargs)
+        response = self._perform_request(
+            RequestType.POST, route=route, data=prompt_dict, stream=True)
+        return self._iter_stream(response)
+
+    def _iter_stream(self, response: requests.Response) -> Iterator[str]:
+        """Warning. This method is private and should not be called manually"""
+        with response:
+            decoder = StreamDecoder(response.headers.get("Content-Type"), loads=self.json_codec.loads)
+            for chunk in response.iter_content(chunk_size=None):
+                yield from decoder.feed(chunk)
+            yield from decoder.flush()
+
+    def prompt_many(self,
+                    prompts: Iterable[Union[str, dict]],
+                    max_concurrency: int = 8,
+                    ordered: bool = False,
+                    requests_per_second: float = None,
+                    **defaults) -> Iterator[PromptResult]:
+        """Prompt a batch of queries on a worker pool
+
+        Every item is sent through prompt(), so the payloads are identical to single calls.
+        Errors are captured per item and never stop the batch.
+        NOTE: Raise SessionOptions.pool_maxsize to at least max_concurrency to reuse all connections.
+
+        Args:
+            prompts (Iterable[Union[str, dict]]): Queries or dicts with the keyword arguments of prompt()
+            max_concurrency (int, optional): Amount of prompts in flight. Defaults to 8.
+            ordered (bool, optional): Yield results in input order instead of completion order.
+                Defaults to False.
+            requests_per_second (float, optional): Upper bound of started prompts per second. Defaults to None.
+            defaults: Keyword arguments of prompt() shared by all items, e.g. model_tag_id or prompt_options
+
+        Returns:
+            Iterator[PromptResult]: Results with either a response or the captured error
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency needs to be at least 1")
+        limiter = RateLimiter(requests_per_second) if requests_per_second else None
+
+        def run(index: int, request: dict) -> PromptResult:
+            if limiter is not None:
+                limiter.acquire()
+            try:
+                return PromptResult(index=index, request=request, response=self.prompt(**request))
+            except Exception as error:  # pylint: disable=broad-exception-caught
+                return PromptResult(index=index, request=request, error=error)
+
+        requests_iter = enumerate(prompts)
+        window = max_concurrency * 2
+        with ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="aiman-prompt") as executor:
+            pending: deque = deque()
+
+            def submit_next() -> bool:
+                item = next(requests_iter, None)
+                if item is None:
+                    return False
+                index, prompt = item
+                request = dict(defaults)
+                request.update({"query": prompt} if isinstance(prompt, str) else prompt)
+                pending.append(executor.submit(run, index, request))
+                return True
+
+            while len(pending) < window and submit_next():
+                pass
+            while pending:
+                if ordered:
+                    done: List[Future] = [pending.popleft()]
+                else:
+                    completed, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    done = [future for future in pending if future in completed]
+                    for future in done:
+                        pending.remove(future)
+                for future in done:
+                    yield future.result()
+                    submit_next()
 
     def prompt_on_datasource(self, **kwargs) -> dict:
         """Prompt on a datasource (by id)
@@ -121,60 +353,53 @@ class AimanClient():
             model_tag_id (int): Model tag id
             query (str): The query to prompt
             prompt_options (PromptOptions, optional): Prompt options. Defaults to None.
+            use_cache (Optional[bool], optional): True caches the response even if the prompt is not
+                deterministic, False bypasses the response cache. Defaults to None, which caches
+                prompts with temperature 0 and a fixed seed only.
 
         Returns:
-            dict: The API-Response as dict
+            dict: The API-Response as dict, marked with "fromCache": True if served by the response cache
         """
-        if "datasource_id" not in kwargs:
-            raise ValueError("Missing required argument: datasource_id")
-
-        if "model_tag_id" not in kwargs:
-            raise ValueError("Missing required argument: model_tag_id")
-
-        if "query" not in kwargs:
-            raise ValueError("Missing required argument: query")
-
-        prompt_options = kwargs["prompt_options"] if Util.has_parameter("prompt_options", kwargs) else PromptOptions()
-        if not isinstance(prompt_options, PromptOptions):
-            raise ValueError("Passed parameter promp_options needs to be type of PromptOptions")
-
-        prompt = Prompt()
-        prompt.prompt = kwargs["query"]
-        prompt.datasource_id = kwargs["datasource_id"]
-        prompt_dict = prompt.to_dict()
-        prompt_dict["options"] = prompt_options.to_dict()
-        model_tag_id = kwargs["model_tag_id"]
-        route = f"{Route.PROMPT_WITH_DATASOURCE.value}/{model_tag_id}"
+        route, prompt_dict = self._build_datasource_prompt_request(kwargs)
+        key = self._response_cache_key(kwargs, route, prompt_dict)
+        cached = self._cached_response(key)
+        if cached is not None:
+            return cached
         response = self._perform_request(
             RequestType.POST, route=route, data=prompt_dict)
-        return response
+        return self._cache_response(key, response)
 
-    def _get_document_content(self, file_path: str) -> Optional[str]:
-        """Parsing document content)
+    def fetch_all_datasources(self,
+                              max_concurrency: int = 8,
+                              shallow: bool = False,
+                              status: Optional[int] = None) -> List[DataSource]:
+        """Fetch all datasources related to the account
 
         Args:
-            file_path (str): The absolute file path
-            loader (Loader, optional): Loader to use for parsing content. Defaults to None.
-
-        Returns:
-            str: None or document content
-        """
-        with open(file_path, "rb") as rag_file:
-            return rag_file.read()
-
-
-    def fetch_all_datasources(self) -> List[DataSource]:
-        """Fetch all datasources related to the account
+            max_concurrency (int, optional): Amount of datasource details fetched concurrently. Defaults to 8.
+            shallow (bool, optional): Build the datasources from the listing only, without
+                fetching details like the media list. Defaults to False.
+            status (Optional[int], optional): Only return datasources with this status, e.g. 2 (ready).
+                Defaults to None.
 
         Returns:
             List[DataSource]: List of datasource objects
         """
         fetch_all_response = self._perform_request(
             RequestType.GET, Route.DATA_SOURCE.value)
-        datasources = []
-        for response in fetch_all_response["datasources"]:
-            source = self.get_datasource_by_id(response["id"])
-            datasources.append(source)
+        summaries = self._filter_datasource_summaries(fetch_all_response["datasources"], status)
+        if shallow:
+            return [DataSource().from_dict(summary) for summary in summaries]
+
+        ids = [summary["id"] for summary in summaries]
+        if max_concurrency <= 1 or len(ids) <= 1:
+            datasources = [self.get_datasource_by_id(datasource_id) for datasource_id in ids]
+        else:
+            with ThreadPoolExecutor(max_workers=min(max_concurrency, len(ids)),
+                                    thread_name_prefix="aiman-datasource") as executor:
+                datasources = list(executor.map(self.get_datasource_by_id, ids))
+        if status is not None:
+            datasources = [source for source in datasources if source.status == status]
         return datasources
 
     def get_datasource_by_id(self, datasource_id: int) -> Optional[DataSource]:
@@ -188,9 +413,73 @@ class AimanClient():
         """
         url = f"{Route.DATA_SOURCE.value}/{datasource_id}"
         response = self._perform_request(RequestType.GET, url)
-        source = response["datasource"]
-        data_source = DataSource()
-        return data_source.from_dict(source)
+        return self._parse_datasource(response)
+
+    def iter_ready(self,
+                   datasource_ids: Union[int, Iterable[int]],
+                   timeout: Optional[float] = 600.0,
+                   poll_interval: float = 1.0,
+                   max_poll_interval: float = 30.0) -> Iterator[DataSource]:
+        """Wait for datasources to become ready (status 2) and yield each as soon as it is
+
+        Every poll is a single listing request for all pending datasources; only datasources
+        the listing holds no status of are fetched by id. The poll interval grows from
+        poll_interval up to max_poll_interval while no status changes.
+
+        Args:
+            datasource_ids (Union[int, Iterable[int]]): The datasource id(s)
+            timeout (Optional[float], optional): Seconds to wait, None for no limit. Defaults to 600.
+            poll_interval (float, optional): Seconds between the first polls. Defaults to 1.
+            max_poll_interval (float, optional): Upper bound of the poll interval. Defaults to 30.
+
+        Raises:
+            TimeoutError: If a datasource is not ready within the timeout
+            AimanError: If a datasource does not exist (404)
+
+        Returns:
+            Iterator[DataSource]: The ready datasources (from the listing, without media list)
+        """
+        tracker = ReadinessTracker(datasource_ids, timeout, poll_interval, max_poll_interval)
+        while tracker.pending:
+            listing = self._perform_request(RequestType.GET, Route.DATA_SOURCE.value)
+            ready, unknown = tracker.update(listing["datasources"])
+            yield from ready
+            for datasource_id in unknown:
+                datasource = tracker.record(datasource_id, self.get_datasource_by_id(datasource_id))
+                if datasource is not None:
+                    yield datasource
+            if tracker.pending:
+                time.sleep(tracker.next_delay())
+
+    def wait_until_ready(self,
+                         datasource_ids: Union[int, Iterable[int]],
+                         timeout: Optional[float] = 600.0,
+                         poll_interval: float = 1.0,
+                         max_poll_interval: float = 30.0) -> Dict[int, Future]:
+        """Wait for datasources to become ready (status 2) in a background thread
+
+        Args:
+            datasource_ids (Union[int, Iterable[int]]): The datasource id(s)
+            timeout (Optional[float], optional): Seconds to wait, None for no limit. Defaults to 600.
+            poll_interval (float, optional): Seconds between the first polls. Defaults to 1.
+            max_poll_interval (float, optional): Upper bound of the poll interval. Defaults to 30.
+
+        Returns:
+            Dict[int, Future]: A future per datasource id, resolved with the DataSource once it is ready
+                or failed with the TimeoutError (or the error of the polling)
+        """
+        ids = [datasource_ids] if isinstance(datasource_ids, int) else list(datasource_ids)
+        futures = {datasource_id: Future() for datasource_id in ids}
+
+        def poll() -> None:
+            try:
+                for datasource in self.iter_ready(ids, timeout, poll_interval, max_poll_interval):
+                    settle(futures, datasource)
+            except Exception as error:  # pylint: disable=broad-exception-caught
+                settle(futures, error=error)
+
+        threading.Thread(target=poll, name="aiman-readiness", daemon=True).start()
+        return futures
 
     def init_new_datasource(self, **kwargs) -> int:
         """Initiate and add a new datasource to current account
@@ -204,28 +493,10 @@ class AimanClient():
         Returns:
             int: The datasource id
         """
-        if "name" not in kwargs:
-            raise ValueError("Missing required argument: name")
-
-        if "summary" not in kwargs:
-            raise ValueError("Missing required argument: summary")
-
-        data = {
-            "name": kwargs["name"],
-            "summary": kwargs["summary"],
-            "tags": kwargs["tags"] if Util.has_parameter("tags", kwargs) else [],
-            "categories": kwargs["categories"] if Util.has_parameter("categories", kwargs) else [],
-            "assocContexts": [],
-            "media": []
-        }
+        data = self._build_new_datasource_request(kwargs)
         response = self._perform_request(
             request_type=RequestType.POST, route=Route.DATA_SOURCE.value, data=data)
-
-        if "datasource" in response:
-            datasource = response["datasource"]
-            if "id" in datasource:
-                return datasource["id"]
-        return -1
+        return self._parse_datasource_id(response)
 
     def delete_datasource(self, datasource_id: int) -> bool:
         """Delete a specific datasource by id
@@ -255,9 +526,124 @@ class AimanClient():
         """
         datasource: DataSource = self.get_datasource_by_id(
             datasource_id=data_source_id)
-        datasource.media = self._build_media_attachments(sources=sources)
+        files = {}
+        uploads = self._upload_files(sources)
+        datasource.media = self._build_media_attachments(sources=sources, files=files, uploads=uploads)
+        if not files:
+            return self.update_datasource(datasource=datasource)
+
+        data = StreamingJsonBody(self._build_update_datasource_request(datasource), files,
+                                 dumps=self.json_codec.dumps)
+        return self._perform_request(
+            RequestType.PUT, f"{Route.DATA_SOURCE.value}/{datasource.id}", data=data)
 
-        return self.update_datasource(datasource=datasource)
+    def ingest_documents(self,
+                         data_source_id: int,
+                         sources: List[str],
+                         max_workers: int = 4,
+                         max_chunk_bytes: int = 32 * 1024 * 1024,
+                         skip_existing: bool = True,
+                         use_processes: bool = False,
+                         progress: Callable[[IngestionProgress], None] = None) -> IngestionSummary:
+        """Add many documents (files, urls) to a datasource in size bounded chunks
+
+        Files are encoded on a worker pool while the previous chunk is uploaded. Every chunk
+        is sent as its own datasource update, so a failed run can simply be repeated:
+        documents whose name is already part of the datasource are skipped.
+
+        Args:
+            data_source_id (int): the datasource id
+            sources (List[str]): list of file paths or urls
+            max_workers (int, optional): Amount of files encoded concurrently. Defaults to 4.
+            max_chunk_bytes (int, optional): Maximum encoded size of a single update. Defaults to 32 MB.
+            skip_existing (bool, optional): Skip documents already added to the datasource. Defaults to True.
+            use_processes (bool, optional): Encode on a process pool instead of threads. Defaults to False.
+            progress (Callable[[IngestionProgress], None], optional): Called for every skipped, encoded
+                and uploaded document. Defaults to None.
+
+        Raises:
+            ValueError: By unsupported file types (before anything is uploaded)
+
+        Returns:
+            IngestionSummary: Uploaded and skipped files, chunks and the achieved throughput
+        """
+        started = time.monotonic()
+        if isinstance(sources, str):
+            sources = [sources]
+        names = {}
+        for source in sources:
+            if Util.validate_url(url=source, check_only=True):
+                names[source] = source
+            else:
+                names[source] = self._get_file_name_and_mime_type(source)[0]
+
+        datasource: DataSource = self.get_datasource_by_id(datasource_id=data_source_id)
+        existing = set()
+        if skip_existing:
+            existing = {media["name"] if isinstance(media, dict) else media.name for media in datasource.media or []}
+        summary = IngestionSummary(files_total=len(sources))
+
+        def notify(source: str, status: str, size: int = 0) -> None:
+            if progress is not None:
+                done = summary.files_uploaded + summary.files_skipped
+                progress(IngestionProgress(
+                    source=source, status=status, bytes=size, files_done=done, files_total=summary.files_total))
+
+        pending = []
+        for source in sources:
+            if names[source] in existing:
+                summary.files_skipped += 1
+                notify(source, "skipped")
+            else:
+                pending.append(source)
+
+        chunk: List[tuple] = []
+        chunk_bytes = 0
+
+        def upload() -> None:
+            datasource.media = [attachment for _, attachment in chunk]
+            self.update_datasource(datasource=datasource)
+            summary.chunks += 1
+            for source, attachment in chunk:
+                summary.files_uploaded += 1
+                summary.bytes_uploaded += len(attachment.base64)
+                notify(source, "uploaded", len(attachment.base64))
+
+        # the process pool module is loaded on first use
+        pool = concurrent.futures.ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+        with pool(max_workers=max_workers) as executor:
+            attachments = self._encode_bounded(executor, pending, max_workers * 2, use_processes)
+            for source, attachment in zip(pending, attachments):
+                notify(source, "encoded", len(attachment.base64))
+                if chunk and chunk_bytes + len(attachment.base64) > max_chunk_bytes:
+                    upload()
+                    chunk, chunk_bytes = [], 0
+                chunk.append((source, attachment))
+                chunk_bytes += len(attachment.base64)
+            if chunk:
+                upload()
+
+        summary.seconds = time.monotonic() - started
+        return summary
+
+    def _encode_bounded(self,
+                        executor: Executor,
+                        sources: List[str],
+                        window: int,
+                        use_processes: bool) -> Iterator[Attachment]:
+        """Warning. This method is private and should not be called manually
+           Encodes the sources in order while keeping at most window results ahead of the consumer
+        """
+        # a process pool needs a picklable encoder without session and cache
+        encoder = BaseClient() if use_processes else self
+        pending: deque = deque()
+        for source in sources:
+            encode = encoder._build_media_attachments  # pylint: disable=protected-access
+            pending.append(executor.submit(encode, [source]))
+            if len(pending) >= window:
+                yield pending.popleft().result()[0]
+        while pending:
+            yield pending.popleft().result()[0]
 
     def update_datasource(self, datasource: DataSource) -> DataSource:
         """Update an existing datasource
@@ -268,113 +654,290 @@ class AimanClient():
         Returns:
             DataSource: Updated datasource
         """
-        data = {
-            "name": datasource.name,
-            "summary": datasource.summary,
-            "categories": datasource.categories,
-            "tags": datasource.tags,
-            "assocContexts": datasource.assoc_contexts,
-            "media": datasource.media}
-
+        data = self._build_update_datasource_request(datasource)
         response = self._perform_request(
             RequestType.PUT, f"{Route.DATA_SOURCE.value}/{datasource.id}", data=data)
         return response
 
-    def _build_media_attachments(self, sources: List[str]) -> List[Attachment]:
-        """ Warning. This method is private and should not be called manually
-        Args:
-            sources (List[str]): List of file paths or url
+    def _upload_files(self, sources) -> Dict[str, str]:
+        """Warning. This method is private and should not be called manually
+           Uploads the files above the chunked upload threshold in parts
 
-        Raises:
-            ValueError: By unsupported file types
+        Args:
+            sources: The file paths or urls of attachments or documents
 
         Returns:
-            List[Attachments]: List of Attachment instances
+            Dict[str, str]: The upload ids by file path
         """
-        if isinstance(sources, str):
-            sources = [sources]
-        medias = []
-        for path_or_url in sources:
-            attachment = Attachment()
-            if Util.validate_url(url=path_or_url, check_only=True):
-                attachment.name = path_or_url
-                attachment.mime_type = "text/x-uri"
-                medias.append(attachment)
-                continue
-
-            filename, file_ext = Util.get_file_name_and_ext(file_path=path_or_url)
-            mime_type = Util.get_mimetype_by_ext(file_ext=file_ext)
-            if mime_type is None:
-                raise ValueError(
-                    f"Error: Unsupported filetype:{file_ext} (file:{filename})")
-
-            attachment.base64 = base64.b64encode(self._get_document_content(file_path=path_or_url)).decode()
-            attachment.name = filename
-            attachment.size = ((len(attachment.base64) * (3/4)) - 1) * 10
-            attachment.mime_type = mime_type
-            medias.append(attachment)
-
-        return medias
-
-    def _perform_request(self, request_type: RequestType, route: str, data: dict = None) -> dict:
+        uploads = {}
+        for upload in self._chunked_uploads(sources):
+            steps = upload.requests()
+            request, upload_id = self._upload_step(steps)
+            while request is not None:
+                try:
+                    response = self._perform_request(*request)
+                except AimanError as error:
+                    request, upload_id = self._upload_step(steps, error=error)
+                else:
+                    request, upload_id = self._upload_step(steps, response)
+            uploads[upload.file_path] = upload_id
+        return uploads
+
+    def _perform_request(self,
+                         request_type: RequestType,
+                         route: str,
+                         data: dict = None,
+                         stream: bool = False) -> dict:
         """Warning. This method is private and should not be called manually
 
         Args:
             request_type (RequestType): Enum of RequestTypes (GET, POST, PUT and DELETE)
             route (str): _description_
-            data (dict, optional): _description_. Defaults to None.
+            data (dict, optional): Json payload or a StreamingJsonBody. Defaults to None.
+            stream (bool, optional): Return the unread response of a POST request. Defaults to False.
 
         Raises:
-            Exception: _description_
+            AimanError: AuthError, RateLimitedError, ServerError or AimanError if the request failed
 
         Returns:
             dict: _description_
         """
-        if self.credential.auto_refresh_token and Util.is_token_expired(self.credential.access.expires_on):
-            self.credential.refresh_access_token()
+        with self._observe(request_type, route) as event:
+            if self._hedges(request_type, route, data, stream):
+                response = self._send_hedged(request_type, route, data, event)
+            else:
+                response = self._send_with_retries(request_type, route, data, stream, event=event)
+            if event is not None:
+                event.status_code = response.status_code
+            if stream:
+                if response.status_code not in [200, 201, 202]:
+                    with response:
+                        self._check_status(response.status_code, response.text, response.headers)
+                return response
+
+            return self._result(request_type, response, event)
+
+    def _send_with_retries(self,
+                           request_type: RequestType,
+                           route: str,
+                           data: dict,
+                           stream: bool,
+                           headers: Optional[dict] = None,
+                           event: Optional[RequestEvent] = None) -> requests.Response:
+        """Warning. This method is private and should not be called manually
+           Sends a request and repeats it on transient failures according to the retry policy
+        """
+        retryable = self.retry_policy.allows(request_type, route)
+        deadline = self.retry_policy.deadline_from(time.monotonic())
+        tried: Set[str] = set()
+        attempt = 0
+        while True:
+            attempt += 1
+            if event is not None:
+                event.attempts = attempt
+            target = HostAttempt(self.host_pool, tried)
+            try:
+                with self._throttle(route), target:
+                    response = self._send(
+                        request_type, route, data, stream, self._attempt_timeout(deadline), headers, event,
+                        target.host)
+                    target.status_code = response.status_code
+            except (requests.ConnectionError, requests.Timeout) as error:
+                handle = RequestHandle.current()
+                if handle is not None and handle.aborted:
+                    raise
+                delay = 0.0 if self._failover(target, self._connect_failed(error)) else self._retry_delay(
+                    attempt, retryable, deadline)
+                if delay is None:
+                    raise
+            else:
+                self._rate_feedback(route, response.status_code, response.headers)
+                delay = self._retry_delay(
+                    attempt, retryable, deadline, response.status_code, response.headers, target.host)
+                if delay is None:
+                    return response
+                response.close()
+            started = time.perf_counter()
+            time.sleep(delay)
+            if event is not None:
+                event.phase("backoff", started)
+
+    def _send_hedged(self,
+                     request_type: RequestType,
+                     route: str,
+                     data: dict,
+                     event: Optional[RequestEvent] = None) -> requests.Response:
+        """Warning. This method is private and should not be called manually
+           Sends the request again once it is slower than the hedge delay, the first response wins
 
-        url = f"{self.credential.api_host}{route}"
+           The request is sent on the calling thread, a timer started once it is dispatched sends
+           the hedge on a thread of its own. The loser is aborted (see RequestHandle), with a session
+           whose connections can not be aborted the caller waits for its request to return.
+        """
+        delay = self.hedge_tracker.delay()
+        if delay is None:
+            return self._timed_send(request_type, route, data, event)
+        events = [event.child() if event is not None else None for _ in range(2)]
+        racing = [Future(), Future()]
+        started, returned = [0.0, 0.0], [0.0, 0.0]
+        # the finished requests in the order they returned
+        finished: List[Future] = []
+        lock = threading.Lock()
+
+        def race(index: int) -> None:
+            started[index] = time.perf_counter()
+            with handles[index]:
+                try:
+                    racing[index].set_result(self._timed_send(request_type, route, data, events[index]))
+                except Exception as error:  # pylint: disable=broad-exception-caught
+                    racing[index].set_exception(error)
+            returned[index] = time.perf_counter()
+            with lock:
+                finished.append(racing[index])
+                winner = race_winner(finished, len(finished) == len(racing))
+            if winner is racing[index]:
+                handles[1 - index].abort()
+
+        def hedge() -> None:
+            if racing[1].set_running_or_notify_cancel():
+                race(1)
+
+        timer = threading.Timer(delay, hedge)
+        timer.daemon = True
+        handles = [RequestHandle(on_dispatch=timer.start), RequestHandle()]
+        race(0)
+        timer.cancel()
+        if racing[1].cancel():
+            # the request returned before the hedge was sent
+            racing.pop()
+        winner = None
+        while winner is None:
+            with lock:
+                done = list(finished)
+            winner = race_winner(done, len(done) == len(racing))
+            if winner is None:
+                wait([future for future in racing if future not in done], return_when=FIRST_COMPLETED)
+        if event is not None:
+            event.merge(events[:len(racing)])
+        if len(racing) > 1:
+            primary, hedge_future = racing
+            self.hedge_tracker.hedged(winner is hedge_future)
+            if winner is hedge_future and primary.exception() is None:
+                # the request could not be aborted and ran to its end
+                self.hedge_tracker.saved(returned[0] - returned[1])
+            elif winner is hedge_future:
+                # the aborted request had run that much longer than the hedge when the hedge won
+                self.hedge_tracker.saved((returned[1] - started[0]) - (returned[1] - started[1]))
+            for future in racing:
+                if future is not winner:
+                    future.add_done_callback(_close_response)
+        return winner.result()
+
+    def _timed_send(self,
+                    request_type: RequestType,
+                    route: str,
+                    data: dict,
+                    event: Optional[RequestEvent] = None) -> requests.Response:
+        """Warning. This method is private and should not be called manually
+           Sends a hedged request and adds its latency to the hedge tracker
+        """
+        started = time.perf_counter()
+        response = self._send_with_retries(request_type, route, data, False, event=event)
+        self.hedge_tracker.record(time.perf_counter() - started)
+        return response
+
+    @staticmethod
+    def _connect_failed(error: requests.RequestException) -> bool:
+        """Warning. This method is private and should not be called manually
+           If the request failed before a connection to the host was made
+        """
+        if isinstance(error, requests.ConnectTimeout):
+            return True
+        reason = getattr(error.args[0] if error.args else None, "reason", None)
+        return isinstance(reason, urllib3.exceptions.ConnectTimeoutError)
+
+    def _send(self,
+              request_type: RequestType,
+              route: str,
+              data: dict,
+              stream: bool,
+              timeout: float,
+              extra_headers: Optional[dict] = None,
+              event: Optional[RequestEvent] = None,
+              host: Optional[str] = None) -> requests.Response:
+        """Warning. This method is private and should not be called manually"""
+        started = time.perf_counter() if event is not None else 0.0
+        credential = self._credential_for(host)
+        access = credential.get_access_token()
+        if event is not None:
+            started = event.phase("token", started)
+        url = f"{credential.api_host}{route}"
+        headers = self._build_headers(request_type, access.token, data)
+        if extra_headers:
+            headers.update(extra_headers)
+        body = self._encode_body(request_type, data)
+        payload, encoding = self._compress_body(body)
+        if encoding is not None:
+            headers["Content-Encoding"] = encoding
+        if event is not None:
+            started = event.phase("encode", started)
+        handle = RequestHandle.current()
+        if handle is not None:
+            handle.dispatched()
+        response = self._dispatch(request_type, url, headers, payload, stream, timeout)
+        if encoding is not None and response.status_code == 415:
+            # the server does not accept compressed bodies, send this and all further requests uncompressed
+            response.close()
+            self.compression_rejected = True
+            del headers["Content-Encoding"]
+            payload, encoding = body, None
+            response = self._dispatch(request_type, url, headers, payload, stream, timeout)
+        if event is not None:
+            ttfb = response.elapsed.total_seconds()
+            event.phase("ttfb", started, started + ttfb)
+            if not stream:
+                event.phase("download", started + ttfb)
+        self._record_transfer(request_type, route, body, payload, encoding, event)
+        return response
+
+    def _dispatch(self,
+                  request_type: RequestType,
+                  url: str,
+                  headers: dict,
+                  payload,
+                  stream: bool,
+                  timeout: float) -> requests.Response:
+        """Warning. This method is private and should not be called manually"""
         response = None
-        headers = {"accept": "application/json"}
-        headers.update(
-            {"Authorization": f"Bearer {self.credential.access.token}"})
         if request_type == RequestType.GET:
-            response = requests.get(
+            response = self.session.get(
                 url=url,
                 headers=headers,
                 allow_redirects=True,
-                timeout=self.request_timeout)
+                timeout=timeout)
 
         if request_type == RequestType.POST:
-            headers.update({"Content-Type": "application/json"})
-            response = requests.post(
+            response = self.session.post(
                 url=url,
                 headers=headers,
-                json=data,
+                data=payload,
                 allow_redirects=True,
-                timeout=self.request_timeout)
+                stream=stream,
+                timeout=timeout)
 
         if request_type == RequestType.DELETE:
-            headers.update({"Content-Type": "application/json"})
-            response = requests.delete(
+            response = self.session.delete(
                 url=url,
                 headers=headers,
                 allow_redirects=True,
-                timeout=self.request_timeout)
-            return response.status_code
+                timeout=timeout)
 
         if request_type == RequestType.PUT:
-            headers.update({"Content-Type": "application/json"})
-            response = requests.put(
+            response = self.session.put(
                 url=url,
                 headers=headers,
-                json=data,
+                data=payload,
                 allow_redirects=True,
-                timeout=self.request_timeout)
+                timeout=timeout)
 
-        if response.status_code not in [200, 201, 202]:
-            raise RuntimeError(
-                f"[{response.status_code}]-{response.text}")
-
-        content = json.loads(response.content.decode('utf-8'))
-        return content['messageContent']['data']
+        return response
@@ -0,0 +1,653 @@
+"""Module providing an asyncio aiman service client"""
+import asyncio
+import itertools
+import time
+from typing import (
+    AsyncIterator,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union
+)
+try:
+    import httpx
+except ImportError:
+    httpx = None
+from aiman.core.util import Util
+from aiman.core.async_credentials import AsyncTokenCredential
+from aiman.core.token_store import TokenStore
+from aiman.core.cache import AttachmentCache, ResponseCache
+from aiman.core.retry import RetryPolicy
+from aiman.core.codec import JsonCodec
+from aiman.core.compression import CompressionOptions, TransferMeter
+from aiman.core.throttle import RouteLimiter
+from aiman.core.hosts import HostAttempt, HostPool
+from aiman.core.hedging import HedgePolicy, HedgeTracker, race_winner
+from aiman.core.instrumentation import Observer, RequestEvent
+from aiman.core.catalog import ModelCatalog
+from aiman.core.streaming import StreamDecoder
+from aiman.core.readiness import ReadinessTracker, settle
+from aiman.core.upload import ChunkedUploadOptions, UploadJournal
+from aiman.core.exceptions import AimanError
+from aiman.core.classes import (
+    AIModel,
+    DataSource,
+    Route,
+    RequestType
+)
+from ._base_client import BaseClient
+
+
+class AsyncAimanClient(BaseClient):
+    """Represents the asyncio AI Manager Service Client
+
+    Mirrors the AimanClient surface with awaitable methods. All requests share one
+    pooled httpx.AsyncClient, so a single event loop can keep many prompts in flight.
+    """
+
+    def __init__(self,
+                 host_url:Union[str, List[str], HostPool] = None,
+                 user_name:str = None,
+                 password:str = None,
+                 token_credential:AsyncTokenCredential = None,
+                 client:"httpx.AsyncClient" = None,
+                 limits:"httpx.Limits" = None,
+                 attachment_cache:AttachmentCache = None,
+                 retry_policy:RetryPolicy = None,
+                 response_cache:ResponseCache = None,
+                 model_catalog:ModelCatalog = None,
+                 json_codec:JsonCodec = None,
+                 compression:CompressionOptions = None,
+                 observer:Observer = None,
+                 route_limiter:RouteLimiter = None,
+                 chunked_upload:ChunkedUploadOptions = None,
+                 token_store:TokenStore = None,
+                 hedge_policy:HedgePolicy = None) -> None:
+        """ Instantiate a new async Client to communicate with an AIMan API
+            NOTE: Use host, user and password or an AsyncTokenCredential Object
+
+        Args:
+            host_url (Union[str, List[str], HostPool], optional): The API-Host, or several equivalent hosts
+                (a list or a HostPool) to balance the requests across with a token per host. Defaults to None.
+            user_name (str, optional): _description_. Defaults to None.
+            password (str, optional): _description_. Defaults to None.
+            token_credential (AsyncTokenCredential, optional): _description_. Defaults to None.
+            client (httpx.AsyncClient, optional): Client to share with the credential. Defaults to None.
+            limits (httpx.Limits, optional): Pool limits used when the client creates its own
+                httpx.AsyncClient. Defaults to None.
+            attachment_cache (AttachmentCache, optional): Reuse encoded attachments of unchanged
+                files. Defaults to None.
+            retry_policy (RetryPolicy, optional): Retries of transient failures. Defaults to
+                RetryPolicy() which retries idempotent requests up to 3 times.
+            response_cache (ResponseCache, optional): Serve repeated identical prompts from a
+                MemoryResponseCache or SQLiteResponseCache. Defaults to None.
+            model_catalog (ModelCatalog, optional): Cache the models for get_models(), the lookups by name,
+                uuid and model tag id serve the models of the last get_models(). Defaults to None.
+            json_codec (JsonCodec, optional): Encodes request and decodes response bodies.
+                Defaults to JsonCodec() which uses the fastest installed backend.
+            compression (CompressionOptions, optional): Compress large request bodies with gzip or zstd.
+                Defaults to None.
+            observer (Observer, optional): Receives the timings of every call, e.g. a PrometheusObserver
+                or OpenTelemetryObserver. Defaults to None.
+            route_limiter (RouteLimiter, optional): Limits the requests per second and in flight by route group,
+                share one between clients (or a FileBucketBackend between processes) for a common quota.
+                Defaults to None.
+            chunked_upload (ChunkedUploadOptions, optional): Upload large attachments and documents in
+                resumable parts instead of embedding them as base64. Defaults to None.
+            token_store (TokenStore, optional): Reuse the access token of an earlier client of the same host
+                and user instead of logging in, e.g. a FileTokenStore shared by short-lived processes.
+                Ignored with a token_credential. Defaults to None.
+            hedge_policy (HedgePolicy, optional): Send a slow prompt a second time and take the first answer,
+                the slower request is cancelled. Only for prompts giving the same answer twice. Defaults to None.
+
+        Raises:
+            ImportError: If httpx is not installed
+            ValueError: Missing credential informations
+        """
+        if httpx is None:
+            raise ImportError("The async client requires httpx: pip install aiman-client[async]")
+        self.host_pool = self._host_pool(host_url) if token_credential is None else None
+        host_urls = self.host_pool.urls if self.host_pool is not None else [host_url]
+        if token_credential is None:
+            self._validate_login(host_url=host_urls[0], user_name=user_name, password=password)
+        self._owns_client = client is None and token_credential is None
+        if client is None:
+            if token_credential is not None:
+                client = token_credential.client
+            else:
+                client = httpx.AsyncClient(limits=limits or httpx.Limits(max_connections=100))
+        self._set_credentials(token_credential, host_urls, lambda url: AsyncTokenCredential(
+            api_host_url=url, user_name=user_name, password=password, client=client, token_store=token_store))
+        self.client = client
+        self.request_timeout = 200
+        self.attachment_cache = attachment_cache
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+        self.response_cache = response_cache
+        self.model_catalog = model_catalog.bind_async(self._load_models) if model_catalog is not None else None
+        self.json_codec = json_codec or self.json_codec
+        self.compression = compression
+        self.chunked_upload = chunked_upload
+        self.upload_journal = UploadJournal(
+            chunked_upload.journal_path, chunked_upload.journal_ttl) if chunked_upload is not None else None
+        self.transfer_meter = TransferMeter()
+        self.observer = observer
+        self.route_limiter = route_limiter
+        self.hedge_tracker = HedgeTracker(hedge_policy) if hedge_policy is not None else None
+        self._pollers: set = set()
+
+    async def __aenter__(self) -> "AsyncAimanClient":
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Close the client if it was created by the client, pending wait_until_ready() polls are cancelled"""
+        for poller in list(self._pollers):
+            poller.cancel()
+        if self._owns_client:
+            await self.client.aclose()
+
+    async def get_models(self) -> List[AIModel]:
+        """Get all available models to prompt on, served by the model catalog if the client has one
+
+        Returns:
+            List[AIModel]: List of available AIModel objects
+        """
+        if self.model_catalog is not None:
+            return await self.model_catalog.models_async()
+        results = await self._perform_request(
+            request_type=RequestType.GET, route=Route.GET_MODELS.value)
+        return self._parse_models(results)
+
+    async def _load_models(self, validators: Dict[str, str]) -> Tuple[Optional[List[AIModel]], Dict[str, str]]:
+        """Warning. This method is private and should not be called manually
+           Loads the models for the model catalog with a conditional request
+
+        Args:
+            validators (Dict[str, str]): If-None-Match and If-Modified-Since headers
+
+        Returns:
+            Tuple[Optional[List[AIModel]], Dict[str, str]]: The models (None if not modified) and the response headers
+        """
+        with self._observe(RequestType.GET, Route.GET_MODELS.value) as event:
+            response = await self._send_with_retries(
+                RequestType.GET, Route.GET_MODELS.value, None, False, event, headers=validators)
+            if event is not None:
+                event.status_code = response.status_code
+            # httpx.Headers look up case-insensitively, a dict copy has lowercase keys
+            if response.status_code == 304:
+                return None, response.headers
+            return self._parse_models(self._result(RequestType.GET, response, event)), response.headers
+
+    async def prompt(self, **kwargs) -> dict:
+        """Prompt a query to a specific model
+
+        Args:
+            model_tag_id (int): the model tag id
+            query (str): Query to prompt
+            attachments (Optional[str], optional): Absolute path to a file. Defaults to None.
+            prompt_options (Optional[PromptOptions], optional): Prompt options. Defaults to None.
+            use_cache (Optional[bool], optional): True caches the response even if the prompt is not
+                deterministic, False bypasses the response cache. Defaults to None, which caches
+                prompts with temperature 0 and a fixed seed only.
+
+        Raises:
+            ValueError: If any of the required parameters are missing
+
+        Returns:
+            dict: The API-Response as dict, marked with "fromCache": True if served by the response cache
+        """
+        uploads = {}
+        if Util.has_parameter("attachments", kwargs):
+            route, prompt_dict = await self._run_blocking(self._build_prompt_request, kwargs, None, uploads)
+        else:
+            route, prompt_dict = self._build_prompt_request(kwargs)
+        return await self._prompt_cached(kwargs, route, prompt_dict, uploads)
+
+    async def prompt_stream(self, **kwargs) -> AsyncIterator[str]:
+        """Prompt a query and receive the answer incrementally
+
+        Args:
+            model_tag_id (int): the model tag id
+            query (str): Query to prompt
+            datasource_id (int, optional): Prompt on a datasource instead. Defaults to None.
+            attachments (Optional[str], optional): Absolute path to a file. Defaults to None.
+            prompt_options (Optional[PromptOptions], optional): Prompt options. Defaults to None.
+
+        Raises:
+            ValueError: If any of the required parameters are missing
+
+        Returns:
+            AsyncIterator[str]: The text deltas
+        """
+        if Util.has_parameter("attachments", kwargs):
+            route, prompt_dict = await self._run_blocking(self._build_stream_request, kwargs)
+        else:
+            route, prompt_dict = self._build_stream_request(kwargs)
+        response = await self._perform_request(
+            RequestType.POST, route=route, data=prompt_dict, stream=True)
+        try:
+            decoder = StreamDecoder(response.headers.get("Content-Type"), loads=self.json_codec.loads)
+            async for chunk in response.aiter_bytes():
+                for delta in decoder.feed(chunk):
+                    yield delta
+            for delta in decoder.flush():
+                yield delta
+        finally:
+            await response.aclose()
+
+    async def prompt_on_datasource(self, **kwargs) -> dict:
+        """Prompt on a datasource (by id)
+
+        Args:
+            datasource_id (int): The datasource id (related to current account)
+            model_tag_id (int): Model tag id
+            query (str): The query to prompt
+            prompt_options (PromptOptions, optional): Prompt options. Defaults to None.
+            use_cache (Optional[bool], optional): True caches the response even if the prompt is not
+                deterministic, False bypasses the response cache. Defaults to None, which caches
+                prompts with temperature 0 and a fixed seed only.
+
+        Returns:
+            dict: The API-Response as dict, marked with "fromCache": True if served by the response cache
+        """
+        route, prompt_dict = self._build_datasource_prompt_request(kwargs)
+        return await self._prompt_cached(kwargs, route, prompt_dict)
+
+    async def fetch_all_datasources(self,
+                                    max_concurrency: int = 8,
+                                    shallow: bool = False,
+                                    status: Optional[int] = None) -> List[DataSource]:
+        """Fetch all datasources related to the account
+
+        Args:
+            max_concurrency (int, optional): Amount of datasource details fetched concurrently. Defaults to 8.
+            shallow (bool, optional): Build the datasources from the listing only, without
+                fetching details like the media list. Defaults to False.
+            status (Optional[int], optional): Only return datasources with this status, e.g. 2 (ready).
+                Defaults to None.
+
+        Returns:
+            List[DataSource]: List of datasource objects
+        """
+        fetch_all_response = await self._perform_request(
+            RequestType.GET, Route.DATA_SOURCE.value)
+        summaries = self._filter_datasource_summaries(fetch_all_response["datasources"], status)
+        if shallow:
+            return [DataSource().from_dict(summary) for summary in summaries]
+
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+        async def fetch(datasource_id: int) -> DataSource:
+            async with semaphore:
+                return await self.get_datasource_by_id(datasource_id)
+
+        datasources = await asyncio.gather(*[fetch(summary["id"]) for summary in summaries])
+        if status is not None:
+            datasources = [source for source in datasources if source.status == status]
+        return list(datasources)
+
+    async def get_datasource_by_id(self, datasource_id: int) -> Optional[DataSource]:
+        """Get a specific datasource by id
+
+        Args:
+            datasource_id (int): the datasource id
+
+        Returns:
+            DataSource: None or Datasource object
+        """
+        url = f"{Route.DATA_SOURCE.value}/{datasource_id}"
+        response = await self._perform_request(RequestType.GET, url)
+        return self._parse_datasource(response)
+
+    async def iter_ready(self,
+                         datasource_ids: Union[int, Iterable[int]],
+                         timeout: Optional[float] = 600.0,
+                         poll_interval: float = 1.0,
+                         max_poll_interval: float = 30.0) -> AsyncIterator[DataSource]:
+        """Wait for datasources to become ready (status 2) without blocking the event loop
+
+        Args:
+            datasource_ids (Union[int, Iterable[int]]): The datasource id(s)
+            timeout (Optional[float], optional): Seconds to wait, None for no limit. Defaults to 600.
+            poll_interval (float, optional): Seconds between the first polls. Defaults to 1.
+            max_poll_interval (float, optional): Upper bound of the poll interval. Defaults to 30.
+
+        Raises:
+            TimeoutError: If a datasource is not ready within the timeout
+            AimanError: If a datasource does not exist (404)
+
+        Returns:
+            AsyncIterator[DataSource]: The ready datasources in the order they became ready
+        """
+        tracker = ReadinessTracker(datasource_ids, timeout, poll_interval, max_poll_interval)
+        while True:
+            listing = await self._perform_request(RequestType.GET, Route.DATA_SOURCE.value)
+            ready, unknown = tracker.update(listing["datasources"])
+            if unknown:
+                details = await asyncio.gather(*[self.get_datasource_by_id(item) for item in unknown])
+                ready += [source for source in map(tracker.record, unknown, details) if source is not None]
+            for datasource in ready:
+                yield datasource
+            if not tracker.pending:
+                return
+            await asyncio.sleep(tracker.next_delay())
+
+    def wait_until_ready(self,
+                         datasource_ids: Union[int, Iterable[int]],
+                         timeout: Optional[float] = 600.0,
+                         poll_interval: float = 1.0,
+                         max_poll_interval: float = 30.0) -> Dict[int, "asyncio.Future"]:
+        """Wait for datasources to become ready (status 2) in a background task
+
+        Args:
+            datasource_ids (Union[int, Iterable[int]]): The datasource id(s)
+            timeout (Optional[float], optional): Seconds to wait, None for no limit. Defaults to 600.
+            poll_interval (float, optional): Seconds between the first polls. Defaults to 1.
+            max_poll_interval (float, optional): Upper bound of the poll interval. Defaults to 30.
+
+        Returns:
+            Dict[int, asyncio.Future]: A future per datasource id, resolved with the DataSource once it
+                is ready or failed with the TimeoutError (or the error of the polling)
+        """
+        ids = [datasource_ids] if isinstance(datasource_ids, int) else list(datasource_ids)
+        loop = asyncio.get_running_loop()
+        futures = {datasource_id: loop.create_future() for datasource_id in ids}
+
+        async def poll() -> None:
+            try:
+                async for datasource in self.iter_ready(ids, timeout, poll_interval, max_poll_interval):
+                    settle(futures, datasource)
+            except Exception as error:  # pylint: disable=broad-exception-caught
+                settle(futures, error=error)
+
+        poller = loop.create_task(poll())
+        # keep a reference, the loop only holds weak ones
+        self._pollers.add(poller)
+        poller.add_done_callback(self._pollers.discard)
+        return futures
+
+    async def init_new_datasource(self, **kwargs) -> int:
+        """Initiate and add a new datasource to current account
+
+        Args:
+            name (str): datasource name
+            summary (str): summary
+            tags (List[str], optional): A list of tags. Defaults to None.
+            categories (List[str], optional): a list of categories. Defaults to None.
+
+        Returns:
+            int: The datasource id
+        """
+        data = self._build_new_datasource_request(kwargs)
+        response = await self._perform_request(
+            request_type=RequestType.POST, route=Route.DATA_SOURCE.value, data=data)
+        return self._parse_datasource_id(response)
+
+    async def delete_datasource(self, datasource_id: int) -> bool:
+        """Delete a specific datasource by id
+
+        Args:
+            datasource_id (int): the datasource id
+
+        Returns:
+            bool: success true or false
+        """
+        return await self._perform_request(
+            request_type=RequestType.DELETE, route=f"{Route.DATA_SOURCE.value}/{datasource_id}")
+
+    async def add_documents(self, data_source_id: int, sources: List[str]) -> DataSource:
+        """Add one or more documents (files, urls) to an datasource
+
+        Args:
+            data_source_id (int): the datasource id
+            sources (List[str]): list of file paths or urls
+
+        Raises:
+            Exception: If datasource not exists
+
+        Returns:
+            DataSource: the datasource with all added documents (media list)
+        """
+        datasource: DataSource = await self.get_datasource_by_id(
+            datasource_id=data_source_id)
+        uploads = await self._upload_files(sources)
+        datasource.media = await self._run_blocking(self._build_media_attachments, sources, None, uploads)
+
+        return await self.update_datasource(datasource=datasource)
+
+    async def update_datasource(self, datasource: DataSource) -> DataSource:
+        """Update an existing datasource
+
+        Args:
+            datasource (DataSource): The datasource to update
+
+        Returns:
+            DataSource: Updated datasource
+        """
+        data = self._build_update_datasource_request(datasource)
+        return await self._perform_request(
+            RequestType.PUT, f"{Route.DATA_SOURCE.value}/{datasource.id}", data=data)
+
+    async def _prompt_cached(self, kwargs: dict, route: str, prompt_dict: dict,
+                             uploads: Optional[Dict[str, str]] = None) -> dict:
+        """Warning. This method is private and should not be called manually
+           Serves the prompt from the response cache or uploads the large files, sends it and stores the response
+        """
+        if uploads:
+            # the key hashes the files to upload
+            key = await self._run_blocking(self._response_cache_key, kwargs, route, prompt_dict, None, uploads)
+        else:
+            key = self._response_cache_key(kwargs, route, prompt_dict)
+        cached = self._cached_response(key)
+        if cached is not None:
+            return cached
+        if uploads:
+            self._resolve_uploads(prompt_dict, uploads, await self._upload_files(list(uploads)))
+        response = await self._perform_request(
+            RequestType.POST, route=route, data=prompt_dict)
+        return self._cache_response(key, response)
+
+    async def _run_blocking(self, func, *args):
+        """Warning. This method is private and should not be called manually
+           Runs blocking file IO in the default executor to keep the event loop responsive
+        """
+        return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+    async def _upload_files(self, sources) -> Dict[str, str]:
+        """Warning. This method is private and should not be called manually
+           Uploads the files above the chunked upload threshold in parts, parts are read off the event loop
+        """
+        uploads = {}
+        for upload in self._chunked_uploads(sources):
+            steps = upload.requests()
+            request, uploads[upload.file_path] = await self._run_blocking(self._upload_step, steps)
+            while request is not None:
+                response, failure = None, None
+                try:
+                    response = await self._perform_request(*request)
+                except AimanError as error:
+                    failure = error
+                request, uploads[upload.file_path] = await self._run_blocking(
+                    self._upload_step, steps, response, failure)
+        return uploads
+
+    async def _perform_request(self,
+                               request_type: RequestType,
+                               route: str,
+                               data: dict = None,
+                               stream: bool = False) -> dict:
+        """Warning. This method is private and should not be called manually
+
+        Args:
+            request_type (RequestType): Enum of RequestTypes (GET, POST, PUT and DELETE)
+            route (str): The api route
+            data (dict, optional): The json payload. Defaults to None.
+            stream (bool, optional): Return the unread response. Defaults to False.
+
+        Raises:
+            AimanError: AuthError, RateLimitedError, ServerError or AimanError if the request failed
+
+        Returns:
+            dict: The response data or the status code for DELETE requests
+        """
+        with self._observe(request_type, route) as event:
+            if self._hedges(request_type, route, data, stream):
+                response = await self._send_hedged(request_type, route, data, event)
+            else:
+                response = await self._send_with_retries(request_type, route, data, stream, event)
+            if event is not None:
+                event.status_code = response.status_code
+            if not stream:
+                return self._result(request_type, response, event)
+            if response.status_code not in [200, 201, 202]:
+                await response.aread()
+                await response.aclose()
+                self._check_status(response.status_code, response.text, response.headers)
+            return response
+
+    async def _send_with_retries(self,
+                                 request_type: RequestType,
+                                 route: str,
+                                 data: dict,
+                                 stream: bool,
+                                 event: Optional[RequestEvent] = None,
+                                 headers: Optional[dict] = None) -> "httpx.Response":
+        """Warning. This method is private and should not be called manually
+           Awaits a request and repeats it on transient failures without blocking the event loop
+        """
+        policy = self.retry_policy
+        retryable, deadline = policy.allows(request_type, route), policy.deadline_from(time.monotonic())
+        tried: Set[str] = set()
+        for attempt in itertools.count(1):
+            if event is not None:
+                event.attempts = attempt
+            target = HostAttempt(self.host_pool, tried)
+            try:
+                async with self._throttle_async(route):
+                    with target:
+                        response = await self._send(
+                            request_type, route, data, stream, self._attempt_timeout(deadline), event, target.host,
+                            headers)
+                        target.status_code = response.status_code
+            except httpx.TransportError as error:
+                connect_failed = isinstance(error, (httpx.ConnectError, httpx.ConnectTimeout))
+                wait = 0.0 if self._failover(target, connect_failed) else self._retry_delay(
+                    attempt, retryable, deadline)
+                if wait is None:
+                    raise
+            else:
+                self._rate_feedback(route, response.status_code, response.headers)
+                wait = self._retry_delay(
+                    attempt, retryable, deadline, response.status_code, response.headers, target.host)
+                if wait is None:
+                    return response
+                await response.aclose()
+            started = time.perf_counter()
+            await asyncio.sleep(wait)
+            if event is not None:
+                event.phase("backoff", started)
+
+    async def _send_hedged(self,
+                           request_type: RequestType,
+                           route: str,
+                           data: dict,
+                           event: Optional[RequestEvent] = None) -> "httpx.Response":
+        """Warning. This method is private and should not be called manually
+           Sends the request again once it is slower than the hedge delay, the first response wins
+        """
+        delay = self.hedge_tracker.delay()
+        if delay is None:
+            return await self._timed_send(request_type, route, data, event)
+        events = [event.child() if event is not None else None for _ in range(2)]
+        racing = [asyncio.ensure_future(self._timed_send(request_type, route, data, events[0]))]
+        started = [time.perf_counter()]
+        done, _ = await asyncio.wait(racing, timeout=delay)
+        if not done:
+            started.append(time.perf_counter())
+            racing.append(asyncio.ensure_future(self._timed_send(request_type, route, data, events[1])))
+        try:
+            winner = None
+            while winner is None:
+                await asyncio.wait(racing, return_when=asyncio.FIRST_COMPLETED)
+                done = [task for task in racing if task.done()]
+                winner = race_winner(done, len(done) == len(racing))
+            returned = time.perf_counter()
+        finally:
+            for task in racing:
+                if not task.done():
+                    # the loser (or both, if the call is cancelled) stops at once
+                    task.cancel()
+                task.add_done_callback(lambda task: task.cancelled() or task.exception())
+            if event is not None:
+                event.merge(events[:len(racing)])
+        if len(racing) > 1:
+            self.hedge_tracker.hedged(winner is racing[1])
+            if winner is racing[1]:
+                # the cancelled request had run that much longer than the hedge when the hedge won
+                self.hedge_tracker.saved((returned - started[0]) - (returned - started[1]))
+        return winner.result()
+
+    async def _timed_send(self,
+                          request_type: RequestType,
+                          route: str,
+                          data: dict,
+                          event: Optional[RequestEvent] = None) -> "httpx.Response":
+        """Warning. This method is private and should not be called manually
+           Sends a hedged request and adds its latency to the hedge tracker
+        """
+        started = time.perf_counter()
+        response = await self._send_with_retries(request_type, route, data, False, event)
+        self.hedge_tracker.record(time.perf_counter() - started)
+        return response
+
+    async def _send(self,
+                    request_type: RequestType,
+                    route: str,
+                    data: dict,
+                    stream: bool,
+                    timeout: float,
+                    event: Optional[RequestEvent] = None,
+                    host: Optional[str] = None,
+                    extra_headers: Optional[dict] = None) -> "httpx.Response":
+        """Warning. This method is private and should not be called manually"""
+        started = time.perf_counter() if event is not None else 0.0
+        credential = self._credential_for(host)
+        access = await credential.get_access_token()
+        if event is not None:
+            started = event.phase("token", started)
+        headers = self._build_headers(request_type, access.token, data)
+        if extra_headers:
+            headers.update(extra_headers)
+        body = self._encode_body(request_type, data)
+        content, encoding = self._compress_body(body)
+        if encoding is not None:
+            headers["Content-Encoding"] = encoding
+        if event is not None:
+            started = event.phase("encode", started)
+        url = f"{credential.api_host}{route}"
+        response = await self.client.send(
+            self.client.build_request(request_type.name, url, headers=headers, content=content, timeout=timeout),
+            stream=stream, follow_redirects=True)
+        if encoding is not None and response.status_code == 415:
+            # the server does not accept compressed bodies, send this and all further requests uncompressed
+            await response.aclose()
+            self.compression_rejected = True
+            del headers["Content-Encoding"]
+            content, encoding = body, None
+            response = await self.client.send(
+                self.client.build_request(request_type.name, url, headers=headers, content=content, timeout=timeout),
+                stream=stream, follow_redirects=True)
+        if event is not None:
+            event.phase("ttfb" if stream else "send", started)
+        self._record_transfer(request_type, route, body, content, encoding, event)
+        return response
+
+
+__all__ = [
+    "AsyncAimanClient"
+]
@@ -0,0 +1,809 @@
+"""Module providing the transport independent part of the aiman service clients"""
+import os
+import base64
+import hashlib
+import time
+from contextlib import nullcontext
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    Union
+)
+from aiman.core.util import Util
+from aiman.core.encoding import StreamingJsonBody, encode_base64
+from aiman.core.cache import AttachmentCache, ResponseCache
+from aiman.core.codec import JsonCodec
+from aiman.core.instrumentation import Observer, RequestEvent, RequestScope
+from aiman.core.compression import (
+    CompressedBody,
+    CompressionOptions,
+    TransferMeter,
+    TransferRecord,
+    TransferStats
+)
+from aiman.core.exceptions import AimanError
+from aiman.core.retry import RetryPolicy
+from aiman.core.throttle import UNLIMITED, RouteLimiter
+from aiman.core.hosts import HostAttempt, HostPool, HostStats
+from aiman.core.hedging import HedgeStats, HedgeTracker
+from aiman.core.upload import ChunkedUpload, ChunkedUploadOptions, UploadJournal, UploadPart
+from aiman.core.classes import (
+    AIModel,
+    Attachment,
+    DataSource,
+    PromptOptions,
+    Route,
+    Prompt,
+    RequestType,
+    UploadedAttachment
+)
+
+_NO_EVENT = nullcontext()
+
+
+class BaseClient():
+    """Builds request payloads and parses responses for the sync and async clients"""
+
+    credential = None
+    credentials: Dict[str, Any] = {}
+    host_pool: Optional[HostPool] = None
+    hedge_tracker: Optional[HedgeTracker] = None
+    request_timeout: int = 200
+    stream_attachments: bool = False
+    retry_policy: RetryPolicy = RetryPolicy.disabled()
+    attachment_cache: Optional[AttachmentCache] = None
+    response_cache: Optional[ResponseCache] = None
+    json_codec: JsonCodec = JsonCodec()
+    compression: Optional[CompressionOptions] = None
+    compression_rejected: bool = False
+    transfer_meter: Optional[TransferMeter] = None
+    observer: Optional[Observer] = None
+    route_limiter: Optional[RouteLimiter] = None
+    chunked_upload: Optional[ChunkedUploadOptions] = None
+    upload_journal: Optional[UploadJournal] = None
+
+    def _validate_login(self, host_url: str, user_name: str, password: str) -> None:
+        """Warning. This method is private and should not be called manually
+
+        Args:
+            host_url (str): The API-Host
+            user_name (str): The Username to login
+            password (str): The User related password
+
+        Raises:
+            ValueError: Missing credential informations
+        """
+        if host_url is None or len(host_url) == 0:
+            raise ValueError("Missing parameter: host_url")
+        if password is None or len(host_url) == 0:
+            raise ValueError("Missing parameter: password. ")
+        if user_name is None or len(host_url) == 0:
+            raise ValueError("Missing parameter: username. ")
+
+    def _build_prompt_request(self, kwargs: dict, files: Optional[Dict[str, str]] = None,
+                              uploads: Optional[Dict[str, str]] = None) -> Tuple[str, dict]:
+        """Warning. This method is private and should not be called manually
+           Validates the prompt arguments and builds route and payload
+
+        Args:
+            kwargs (dict): The keyword arguments passed to prompt
+            files (Optional[Dict[str, str]], optional): Collects placeholders of streamed files. Defaults to None.
+            uploads (Optional[Dict[str, str]], optional): Collects placeholder upload ids of the files which are
+                uploaded in parts by file path, see _resolve_uploads. Defaults to None.
+
+        Raises:
+            ValueError: If any of the required parameters are missing
+
+        Returns:
+            Tuple[str, dict]: The route and the prompt payload
+        """
+        if "model_tag_id" not in kwargs:
+            raise ValueError(
+                "Error: missing required argument: model_tag_id")
+
+        if "query" not in kwargs:
+            raise ValueError(
+                "Error: missing required argument: query")
+
+        model_tag: int = kwargs["model_tag_id"]
+        query = kwargs["query"]
+        attachments = kwargs["attachments"] if Util.has_parameter("attachments", kwargs) else None
+        prompt_options = kwargs["prompt_options"] if Util.has_parameter("prompt_options", kwargs) else PromptOptions()
+        if not isinstance(prompt_options, PromptOptions):
+            raise ValueError("Passed parameter promp_options needs to be type of PromptOptions")
+
+        prompt = Prompt()
+        prompt.prompt = query
+        prompt_dict = prompt.to_dict()
+        prompt_option_dict = prompt_options.to_dict()
+        prompt_dict['options'] = prompt_option_dict
+        if attachments is not None:
+            if uploads is not None:
+                uploads.update({upload.file_path: StreamingJsonBody.placeholder()
+                                for upload in self._chunked_uploads(attachments)})
+            medias = self._build_media_attachments(attachments, files=files, uploads=uploads)
+            prompt_dict['attachments'] = []
+            for media in medias:
+                prompt_dict['attachments'].append(media.to_dict())
+
+        prompt_dict['raw'] = prompt_options.raw
+        prompt_dict['keepContext'] = prompt_options.keep_context
+
+        route = Route.PROMPT.value.replace("model_tag", f"{model_tag}")
+        return route, prompt_dict
+
+    def _build_datasource_prompt_request(self, kwargs: dict) -> Tuple[str, dict]:
+        """Warning. This method is private and should not be called manually
+           Validates the datasource prompt arguments and builds route and payload
+
+        Args:
+            kwargs (dict): The keyword arguments passed to prompt_on_datasource
+
+        Raises:
+            ValueError: If any of the required parameters are missing
+
+        Returns:
+            Tuple[str, dict]: The route and the prompt payload
+        """
+        if "datasource_id" not in kwargs:
+            raise ValueError("Missing required argument: datasource_id")
+
+        if "model_tag_id" not in kwargs:
+            raise ValueError("Missing required argument: model_tag_id")
+
+        if "query" not in kwargs:
+            raise ValueError("Missing required argument: query")
+
+        prompt_options = kwargs["prompt_options"] if Util.has_parameter("prompt_options", kwargs) else PromptOptions()
+        if not isinstance(prompt_options, PromptOptions):
+            raise ValueError("Passed parameter promp_options needs to be type of PromptOptions")
+
+        prompt = Prompt()
+        prompt.prompt = kwargs["query"]
+        prompt.datasource_id = kwargs["datasource_id"]
+        prompt_dict = prompt.to_dict()
+        prompt_dict["options"] = prompt_options.to_dict()
+        model_tag_id = kwargs["model_tag_id"]
+        route = f"{Route.PROMPT_WITH_DATASOURCE.value}/{model_tag_id}"
+        return route, prompt_dict
+
+    def _response_cache_key(self, kwargs: dict, route: str, prompt_dict: dict,
+                            files: Optional[Dict[str, str]] = None,
+                            uploads: Optional[Dict[str, str]] = None) -> Optional[str]:
+        """Warning. This method is private and should not be called manually
+           Get the response cache key of a prompt, attachment contents and upload ids are replaced by the
+           SHA-256 digest of the file, so inline, streamed and uploaded attachments share a key
+
+        Args:
+            kwargs (dict): The keyword arguments passed to the prompt method, use_cache=False skips the cache,
+                use_cache=True caches prompts which are not deterministic too
+            route (str): The prompt route
+            prompt_dict (dict): The prompt payload
+            files (Optional[Dict[str, str]], optional): Placeholders of streamed files. Defaults to None.
+            uploads (Optional[Dict[str, str]], optional): Placeholder upload ids by file path. Defaults to None.
+
+        Returns:
+            Optional[str]: The key or None if the response must not be cached
+        """
+        use_cache = kwargs.get("use_cache")
+        if self.response_cache is None or use_cache is False:
+            return None
+        if use_cache is None and not ResponseCache.cacheable(prompt_dict.get("options")):
+            return None
+        payload = dict(prompt_dict)
+        if payload.get("attachments"):
+            paths = {placeholder: path for path, placeholder in (uploads or {}).items()}
+            payload["attachments"] = [self._attachment_key(attachment, files, paths)
+                                      for attachment in payload["attachments"]]
+        return ResponseCache.key_for(route, payload)
+
+    def _attachment_key(self, attachment: dict, files: Optional[Dict[str, str]], paths: Dict[str, str]) -> dict:
+        """Warning. This method is private and should not be called manually"""
+        if "base64" in attachment:
+            return {**attachment, "base64": self._attachment_digest(attachment["base64"], files)}
+        if attachment.get("uploadId") in paths:
+            return {**attachment, "uploadId": AttachmentCache.file_digest(paths[attachment["uploadId"]])}
+        return attachment
+
+    def _resolve_uploads(self, prompt_dict: dict, uploads: Dict[str, str], upload_ids: Dict[str, str]) -> None:
+        """Warning. This method is private and should not be called manually
+           Replaces the placeholder upload ids of the payload with the ids of the finished uploads
+
+        Args:
+            prompt_dict (dict): The prompt payload
+            uploads (Dict[str, str]): Placeholder upload ids by file path
+            upload_ids (Dict[str, str]): Upload ids by file path
+        """
+        upload_id_of = {placeholder: upload_ids[path] for path, placeholder in uploads.items()}
+        for attachment in prompt_dict.get("attachments") or []:
+            if attachment.get("uploadId") in upload_id_of:
+                attachment["uploadId"] = upload_id_of[attachment["uploadId"]]
+
+    def _attachment_digest(self, content: str, files: Optional[Dict[str, Union[str, bytearray]]]) -> str:
+        """Warning. This method is private and should not be called manually"""
+        if files and content in files:
+            if isinstance(files[content], str):
+                return AttachmentCache.file_digest(files[content])
+            content = files[content]
+        return hashlib.sha256(base64.b64decode(content)).hexdigest()
+
+    def _cached_response(self, key: Optional[str]) -> Optional[dict]:
+        """Warning. This method is private and should not be called manually
+
+        Args:
+            key (Optional[str]): The response cache key
+
+        Returns:
+            Optional[dict]: The cached response marked with fromCache or None
+        """
+        if key is None:
+            return None
+        response = self.response_cache.get(key)
+        if isinstance(response, dict):
+            response["fromCache"] = True
+        return response
+
+    def _cache_response(self, key: Optional[str], response: dict) -> dict:
+        """Warning. This method is private and should not be called manually"""
+        if key is not None:
+            self.response_cache.set(key, response)
+        return response
+
+    def _build_new_datasource_request(self, kwargs: dict) -> dict:
+        """Warning. This method is private and should not be called manually
+           Validates the datasource arguments and builds the payload
+
+        Args:
+            kwargs (dict): The keyword arguments passed to init_new_datasource
+
+        Raises:
+            ValueError: If any of the required parameters are missing
+
+        Returns:
+            dict: The datasource payload
+        """
+        if "name" not in kwargs:
+            raise ValueError("Missing required argument: name")
+
+        if "summary" not in kwargs:
+            raise ValueError("Missing required argument: summary")
+
+        return {
+            "name": kwargs["name"],
+            "summary": kwargs["summary"],
+            "tags": kwargs["tags"] if Util.has_parameter("tags", kwargs) else [],
+            "categories": kwargs["categories"] if Util.has_parameter("categories", kwargs) else [],
+            "assocContexts": [],
+            "media": []
+        }
+
+    def _build_update_datasource_request(self, datasource: DataSource) -> dict:
+        """Warning. This method is private and should not be called manually
+
+        Args:
+            datasource (DataSource): The datasource to update
+
+        Returns:
+            dict: The datasource payload
+        """
+        return {
+            "name": datasource.name,
+            "summary": datasource.summary,
+            "categories": datasource.categories,
+            "tags": datasource.tags,
+            "assocContexts": datasource.assoc_contexts,
+            "media": None if datasource.media is None else [
+                media.to_dict() if isinstance(media, Attachment) else media for media in datasource.media]}
+
+    def _parse_models(self, results: dict) -> List[AIModel]:
+        """Warning. This method is private and should not be called manually
+
+        Args:
+            results (dict): The models response
+
+        Returns:
+            List[AIModel]: List of AIModel objects
+        """
+        models = []
+        for model in results['Models']:
+            new_model = AIModel()
+            models.append(new_model.from_dict(model))
+        return models
+
+    def _parse_datasource(self, response: dict) -> DataSource:
+        """Warning. This method is private and should not be called manually
+
+        Args:
+            response (dict): The datasource response
+
+        Returns:
+            DataSource: Datasource object
+        """
+        source = response["datasource"]
+        data_source = DataSource()
+        return data_source.from_dict(source)
+
+    def _filter_datasource_summaries(self, summaries: List[dict], status: Optional[int]) -> List[dict]:
+        """Warning. This method is private and should not be called manually
+
+        Args:
+            summaries (List[dict]): The entries of the datasource listing
+            status (Optional[int]): Keep only datasources with this status
+
+        Returns:
+            List[dict]: The matching entries (entries without status are kept)
+        """
+        if status is None:
+            return list(summaries)
+        return [summary for summary in summaries if summary.get("status", status) == status]
+
+    def _parse_datasource_id(self, response: dict) -> int:
+        """Warning. This method is private and should not be called manually
+
+        Args:
+            response (dict): The response of a created datasource
+
+        Returns:
+            int: The datasource id or -1
+        """
+        if "datasource" in response:
+            datasource = response["datasource"]
+            if "id" in datasource:
+                return datasource["id"]
+        return -1
+
+    def _build_media_attachments(self, sources: List[str], files: Optional[Dict[str, str]] = None,
+                                 uploads: Optional[Dict[str, str]] = None) -> List[Attachment]:
+        """ Warning. This method is private and should not be called manually
+        Args:
+            sources (List[str]): List of file paths or url
+            files (Optional[Dict[str, Union[str, bytearray]]], optional): If passed, the contents are not
+                embedded into the attachments but referenced by a placeholder which is collected in this dict
+                with the file path (stream_attachments) or the encoded content (see StreamingJsonBody).
+                Defaults to None.
+            uploads (Optional[Dict[str, str]], optional): Upload ids of files uploaded in parts, these
+                are referenced by the upload id. Defaults to None.
+
+        Raises:
+            ValueError: By unsupported file types
+
+        Returns:
+            List[Attachments]: List of Attachment instances
+        """
+        if isinstance(sources, str):
+            sources = [sources]
+        started = time.perf_counter() if self.observer is not None else 0.0
+        medias = []
+        for path_or_url in sources:
+            attachment = Attachment()
+            if Util.validate_url(url=path_or_url, check_only=True):
+                attachment.name = path_or_url
+                attachment.mime_type = "text/x-uri"
+                medias.append(attachment)
+                continue
+
+            filename, mime_type = self._get_file_name_and_mime_type(path_or_url)
+            if uploads and path_or_url in uploads:
+                medias.append(UploadedAttachment(
+                    name=filename, size=os.path.getsize(path_or_url), mime_type=mime_type,
+                    upload_id=uploads[path_or_url]))
+                continue
+            if self.attachment_cache is not None:
+                attachment = self.attachment_cache.get(path_or_url, self._encode_file)
+                attachment.mime_type = mime_type
+                medias.append(attachment)
+                continue
+            if files is None:
+                medias.append(self._encode_file(path_or_url))
+                continue
+
+            attachment.base64 = StreamingJsonBody.placeholder()
+            files[attachment.base64] = path_or_url if self.stream_attachments else encode_base64(path_or_url)
+            encoded_size = StreamingJsonBody.content_size(files[attachment.base64])
+            attachment.name = filename
+            attachment.size = ((encoded_size * (3/4)) - 1) * 10
+            attachment.mime_type = mime_type
+            medias.append(attachment)
+
+        if self.observer is not None:
+            self.observer.operation_finished(
+                "encode_attachments", time.perf_counter() - started,
+                {"files": str(len(medias)), "streamed": str(files is not None and self.stream_attachments).lower()})
+        return medias
+
+    def _get_file_name_and_mime_type(self, file_path: str) -> Tuple[str, str]:
+        """Warning. This method is private and should not be called manually
+
+        Args:
+            file_path (str): The file path
+
+        Raises:
+            ValueError: By unsupported file types
+
+        Returns:
+            Tuple[str, str]: The file name and mime type
+        """
+        filename, file_ext = Util.get_file_name_and_ext(file_path=file_path)
+        mime_type = Util.get_mimetype_by_ext(file_ext=file_ext)
+        if mime_type is None:
+            raise ValueError(
+                f"Error: Unsupported filetype:{file_ext} (file:{filename})")
+        return filename, mime_type
+
+    def _encode_file(self, file_path: str) -> Attachment:
+        """Warning. This method is private and should not be called manually
+
+        Args:
+            file_path (str): The file path
+
+        Raises:
+            ValueError: By unsupported file types
+
+        Returns:
+            Attachment: The attachment with base64 encoded file content
+        """
+        filename, mime_type = self._get_file_name_and_mime_type(file_path)
+        attachment = Attachment()
+        attachment.base64 = encode_base64(file_path).decode("ascii")
+        attachment.name = filename
+        attachment.size = ((len(attachment.base64) * (3/4)) - 1) * 10
+        attachment.mime_type = mime_type
+        return attachment
+
+    def _build_headers(self, request_type: RequestType, token: str, data=None) -> dict:
+        """Warning. This method is private and should not be called manually
+
+        Args:
+            request_type (RequestType): Enum of RequestTypes (GET, POST, PUT and DELETE)
+            token (str): The current access token
+            data (optional): The payload, an UploadPart brings its own headers. Defaults to None.
+
+        Returns:
+            dict: The request headers
+        """
+        headers = {"accept": "application/json"}
+        headers.update({"Authorization": f"Bearer {token}"})
+        if request_type != RequestType.GET:
+            headers.update({"Content-Type": "application/json"})
+        if isinstance(data, UploadPart):
+            headers.update(data.headers)
+        return headers
+
+    def _encode_body(self, request_type: RequestType, data):
+        """Warning. This method is private and should not be called manually
+           Encodes json payloads to bytes, StreamingJsonBody objects are sent as they are
+        """
+        if data is None or request_type not in (RequestType.POST, RequestType.PUT):
+            return None
+        if isinstance(data, StreamingJsonBody):
+            return data
+        if isinstance(data, UploadPart):
+            return data.content
+        return self.json_codec.dumps(data)
+
+    @staticmethod
+    def _upload_step(steps, response: Optional[dict] = None, error: Optional[Exception] = None):
+        """Warning. This method is private and should not be called manually
+           Passes the response (or error) of a request to the upload steps of a ChunkedUpload
+
+        Returns:
+            Tuple[Optional[UploadRequest], Optional[str]]: The next request or None and the upload id once finished
+        """
+        try:
+            return (steps.throw(error) if error is not None else steps.send(response)), None
+        except StopIteration as finished:
+            return None, finished.value
+
+    def _chunked_uploads(self, sources) -> List[ChunkedUpload]:
+        """Warning. This method is private and should not be called manually
+
+        Args:
+            sources: The file paths or urls of attachments or documents
+
+        Returns:
+            List[ChunkedUpload]: The uploads of the files which are uploaded in parts
+        """
+        if self.chunked_upload is None or not sources:
+            return []
+        if isinstance(sources, str):
+            sources = [sources]
+        uploads = []
+        for source in sources:
+            if Util.validate_url(url=source, check_only=True) or not self.chunked_upload.applies(
+                    os.path.getsize(source)):
+                continue
+            name, mime_type = self._get_file_name_and_mime_type(source)
+            uploads.append(ChunkedUpload(source, name, mime_type, self.chunked_upload, self.upload_journal))
+        return uploads
+
+    def transfer_stats(self) -> TransferStats:
+        """Get the accumulated request body sizes before and after compression
+
+        Returns:
+            TransferStats: requests, compressed requests, raw and wire bytes
+        """
+        return self.transfer_meter.stats() if self.transfer_meter is not None else TransferStats()
+
+    def _compress_body(self, body) -> Tuple[Any, Optional[str]]:
+        """Warning. This method is private and should not be called manually
+
+        Args:
+            body (bytes | StreamingJsonBody | None): The encoded request body
+
+        Returns:
+            Tuple[Any, Optional[str]]: The body to send and its Content-Encoding (None if uncompressed)
+        """
+        options = self.compression
+        if options is None or self.compression_rejected or body is None or not options.applies(len(body)):
+            return body, None
+        if isinstance(body, bytes):
+            return options.compress(body), options.algorithm
+        return CompressedBody(body, options), options.algorithm
+
+    def _record_transfer(self, request_type: RequestType, route: str, body, payload,
+                         encoding: Optional[str], event: Optional[RequestEvent] = None) -> None:
+        """Warning. This method is private and should not be called manually"""
+        if body is None or self.transfer_meter is None:
+            return
+        wire_bytes = payload.wire_bytes if isinstance(payload, CompressedBody) else len(payload)
+        if event is not None:
+            event.request_bytes += wire_bytes
+        self.transfer_meter.record(TransferRecord(
+            method=request_type.name, route=route, content_encoding=encoding,
+            raw_bytes=len(body), wire_bytes=wire_bytes), self.compression)
+
+    def _observe(self, request_type: RequestType, route: str):
+        """Warning. This method is private and should not be called manually
+
+        Args:
+            request_type (RequestType): The request type
+            route (str): The api route
+
+        Returns:
+            ContextManager[Optional[RequestEvent]]: Yields the event of the call or None without an observer
+        """
+        if self.observer is None:
+            return _NO_EVENT
+        return RequestScope(self.observer, RequestEvent.start(request_type.name, route))
+
+    def _attempt_timeout(self, deadline: Optional[float]) -> float:
+        """Warning. This method is private and should not be called manually
+
+        Args:
+            deadline (Optional[float]): Monotonic time of the retry deadline
+
+        Returns:
+            float: The request timeout, shortened to the remaining time until the deadline
+        """
+        if deadline is None:
+            return self.request_timeout
+        return max(0.001, min(self.request_timeout, deadline - time.monotonic()))
+
+    def _throttle(self, route: str):
+        """Warning. This method is private and should not be called manually
+
+        Args:
+            route (str): The api route
+
+        Returns:
+            ContextManager: Waits for the route limiter and holds a slot of the route group
+        """
+        return self.route_limiter.acquire(route) if self.route_limiter is not None else UNLIMITED
+
+    def _throttle_async(self, route: str):
+        """Warning. This method is private and should not be called manually
+
+        Args:
+            route (str): The api route
+
+        Returns:
+            AsyncContextManager: Like _throttle() without blocking the event loop
+        """
+        return self.route_limiter.acquire_async(route) if self.route_limiter is not None else UNLIMITED
+
+    def _rate_feedback(self, route: str, status_code: int, headers: dict) -> None:
+        """Warning. This method is private and should not be called manually
+           Passes the response status to the route limiter, which slows down on 429
+        """
+        if self.route_limiter is not None:
+            retry_after = RetryPolicy.parse_retry_after(headers.get("Retry-After")) if status_code == 429 else None
+            self.route_limiter.feedback(route, status_code, retry_after)
+
+    def host_stats(self) -> List[HostStats]:
+        """Get the state of the hosts the client balances its requests across
+
+        Returns:
+            List[HostStats]: The hosts, empty if the client talks to a single host
+        """
+        return self.host_pool.stats() if self.host_pool is not None else []
+
+    def hedge_stats(self) -> HedgeStats:
+        """Get the number of hedged prompts, the wins of the hedges and the latency they saved
+
+        Returns:
+            HedgeStats: The statistics, all zero without a hedge policy
+        """
+        return self.hedge_tracker.stats() if self.hedge_tracker is not None else HedgeStats()
+
+    def _hedges(self, request_type: RequestType, route: str, data, stream: bool) -> bool:
+        """Warning. This method is private and should not be called manually
+
+        Returns:
+            bool: If the call races a second request once it is slow
+        """
+        if self.hedge_tracker is None or stream:
+            return False
+        payload = data.payload if isinstance(data, StreamingJsonBody) else data
+        options = payload.get("options") if isinstance(payload, dict) else None
+        return self.hedge_tracker.policy.applies(request_type, route, options)
+
+    @staticmethod
+    def _host_pool(host_url: Union[str, List[str], HostPool, None]) -> Optional[HostPool]:
+        """Warning. This method is private and should not be called manually
+
+        Args:
+            host_url (Union[str, List[str], HostPool, None]): The host_url argument of the client
+
+        Returns:
+            Optional[HostPool]: The pool of a list of hosts or None for a single host
+        """
+        if isinstance(host_url, HostPool):
+            return host_url
+        if isinstance(host_url, (list, tuple)):
+            return HostPool(host_url)
+        return None
+
+    def _set_credentials(self, token_credential: Any, host_urls: List[str], create: Callable[[str], Any]) -> None:
+        """Warning. This method is private and should not be called manually
+
+        Args:
+            token_credential (Any): The credential passed to the client or None
+            host_urls (List[str]): The hosts of the client
+            create (Callable[[str], Any]): Creates the credential of a host
+        """
+        if token_credential is None:
+            self.credentials = {url: create(url) for url in host_urls}
+            token_credential = self.credentials[host_urls[0]]
+        else:
+            self.credentials = {token_credential.api_host: token_credential}
+        self.credential = token_credential
+
+    def _credential_for(self, host: Optional[str]) -> Any:
+        """Warning. This method is private and should not be called manually
+           Every host of the pool has its own credential and tokens
+        """
+        return self.credential if host is None else self.credentials[host]
+
+    def _failover(self, target: HostAttempt, connect_failed: bool) -> bool:
+        """Warning. This method is private and should not be called manually
+
+        Args:
+            target (HostAttempt): The failed attempt
+            connect_failed (bool): If no connection to the host could be made
+
+        Returns:
+            bool: If the request may go to another host at once. The request never
+                reached the failed host, so this holds for non idempotent requests too.
+        """
+        return target.host is not None and connect_failed and len(target.tried) < len(self.host_pool.hosts)
+
+    def _retry_delay(self,
+                     attempt: int,
+                     retryable: bool,
+                     deadline: Optional[float],
+                     status_code: Optional[int] = None,
+                     headers: Optional[dict] = None,
+                     host: Optional[str] = None) -> Optional[float]:
+        """Warning. This method is private and should not be called manually
+
+        Args:
+            attempt (int): The number of the finished attempt (starting at 1)
+            retryable (bool): If the request may be sent again
+            deadline (Optional[float]): Monotonic time of the retry deadline
+            status_code (Optional[int], optional): The response status, None after a connection error.
+                Defaults to None.
+            headers (Optional[dict], optional): The response headers. Defaults to None.
+            host (Optional[str], optional): The host of the pool the attempt went to. Defaults to None.
+
+        Returns:
+            Optional[float]: Seconds to wait before the next attempt or None to give up
+        """
+        credential = self._credential_for(host) if self.credential is not None else None
+        if status_code == 401 and credential is not None and credential.discard_reused():
+            # a token of the token store was revoked, log in and send again
+            return 0.0
+        policy = self.retry_policy
+        if not retryable or attempt >= policy.max_attempts:
+            return None
+        retry_after = None
+        if status_code is not None:
+            if status_code not in policy.retry_statuses:
+                return None
+            retry_after = policy.parse_retry_after((headers or {}).get("Retry-After"))
+        delay = policy.backoff(attempt, retry_after)
+        if deadline is not None and time.monotonic() + delay > deadline:
+            return None
+        return delay
+
+    def _check_status(self, status_code: int, text: str, headers: Optional[dict] = None) -> None:
+        """Warning. This method is private and should not be called manually
+
+        Args:
+            status_code (int): The response status code
+            text (str): The response text
+            headers (Optional[dict], optional): The response headers. Defaults to None.
+
+        Raises:
+            AimanError: AuthError, RateLimitedError, ServerError or AimanError if the request failed
+        """
+        if status_code not in [200, 201, 202]:
+            retry_after = RetryPolicy.parse_retry_after((headers or {}).get("Retry-After"))
+            raise AimanError.from_status(
+                status_code, f"[{status_code}]-{text}", retry_after=retry_after)
+
+    def _build_stream_request(self, kwargs: dict) -> Tuple[str, dict]:
+        """Warning. This method is private and should not be called manually
+           Builds a prompt (or datasource prompt) payload with streaming enabled
+
+        Args:
+            kwargs (dict): The keyword arguments passed to prompt_stream
+
+        Returns:
+            Tuple[str, dict]: The route and the prompt payload
+        """
+        if "datasource_id" in kwargs:
+            route, prompt_dict = self._build_datasource_prompt_request(kwargs)
+        else:
+            route, prompt_dict = self._build_prompt_request(kwargs)
+        prompt_dict["stream"] = True
+        return route, prompt_dict
+
+    def _result(self, request_type: RequestType, response, event: Optional[RequestEvent] = None) -> Union[dict, int]:
+        """Warning. This method is private and should not be called manually
+
+        Args:
+            request_type (RequestType): The request type
+            response (requests.Response | httpx.Response): The read response
+            event (Optional[RequestEvent], optional): Collects the decode time. Defaults to None.
+
+        Returns:
+            Union[dict, int]: The response data or the status code for DELETE requests
+        """
+        if request_type == RequestType.DELETE:
+            return response.status_code
+        started = time.perf_counter() if event is not None else 0.0
+        # the text is only needed for the error message, skip decoding large bodies to str
+        text = response.text if response.status_code not in [200, 201, 202] else ""
+        result = self._parse_response(response.status_code, text, response.content, response.headers)
+        if event is not None:
+            event.response_bytes = len(response.content)
+            event.phase("decode", started)
+        return result
+
+    def _parse_response(self, status_code: int, text: str, content: bytes, headers: Optional[dict] = None) -> dict:
+        """Warning. This method is private and should not be called manually
+
+        Args:
+            status_code (int): The response status code
+            text (str): The response text
+            content (bytes): The raw response body
+            headers (Optional[dict], optional): The response headers. Defaults to None.
+
+        Raises:
+            AimanError: AuthError, RateLimitedError, ServerError or AimanError if the request failed
+
+        Returns:
+            dict: The response data
+        """
+        self._check_status(status_code, text, headers)
+        content = self.json_codec.loads(content)
+        return content['messageContent']['data']
+
+
+__all__ = [
+    "BaseClient"
+]
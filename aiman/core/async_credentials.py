@@ -0,0 +1,178 @@
+"""Module providing an async Token Credential"""
+import asyncio
+from typing import Optional
+try:
+    import httpx
+except ImportError:
+    httpx = None
+from aiman.core.util import Util
+from aiman.core.classes import Route
+from aiman.core.exceptions import AimanError
+from aiman.core.credentials import AccessToken, TokenCredential
+from aiman.core.token_store import TokenStore
+
+
+class AsyncTokenCredential():
+    """Represents an async token credential
+
+    The login happens on the first awaited request. Login and refresh are guarded by
+    a lock, so concurrent coroutines wait for a single refresh instead of racing. With
+    a token_store a still valid token of an earlier credential is reused instead of
+    logging in. The store is accessed in the default executor, as a FileTokenStore
+    blocks on file IO and its lock, and it is not locked during the login.
+    """
+
+    def __init__(self,
+                 api_host_url: str,
+                 user_name: str,
+                 password: str,
+                 auto_refresh_token=True,
+                 client: "httpx.AsyncClient" = None,
+                 refresh_skew: float = 30.0,
+                 token_store: Optional[TokenStore] = None) -> None:
+        if httpx is None:
+            raise ImportError("The async client requires httpx: pip install aiman-client[async]")
+        self.auto_refresh_token = auto_refresh_token
+        self.refresh_skew = refresh_skew
+        self.api_host = Util.validate_url(api_host_url)
+        self.client = client if client is not None else httpx.AsyncClient()
+        self.access: Optional[AccessToken] = None
+        self._user_name = user_name
+        self._password = password
+        self._lock: Optional[asyncio.Lock] = None
+        self.token_store = token_store
+        self._reused = False
+        self._revoked: Optional[AccessToken] = None
+
+    async def get_access_token(self) -> AccessToken:
+        """Get a valid AccessToken, login or refresh if required
+
+        Returns:
+            AccessToken: AccessToken instance with expiration time in Unix time
+        """
+        access = self.access
+        if access is not None and not self._needs_refresh():
+            return access
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if self.access is None:
+                await self._login()
+            elif self.access is access:
+                await self.refresh_access_token()
+        return self.access
+
+    def discard_reused(self) -> bool:
+        """Drop a token taken from the token store after the server rejected it (401)
+
+        Returns:
+            bool: True if the token was reused, so the next request logs in again
+        """
+        if not self._reused:
+            return False
+        # removed from the store by the next login, off the event loop
+        self._revoked, self.access, self._reused = self.access, None, False
+        return True
+
+    async def _login(self) -> None:
+        """Warning. This method is private and should not be called manually
+           Takes a valid token from the token store, refreshes a stored one or logs in
+        """
+        stored = None
+        if self.token_store is not None:
+            stored = await self._run_blocking(self._load_stored, self._revoked)
+            self._revoked = None
+        if stored is not None and not Util.is_token_expired(stored.expires_on - self.refresh_skew):
+            self.access, self._reused = stored, True
+            return
+        if stored is not None and self.auto_refresh_token:
+            self.access = stored
+            try:
+                await self.refresh_access_token()
+                return
+            except AimanError:
+                self.access = None
+        self.access = await self.get_token()
+        await self._store()
+
+    def _load_stored(self, revoked: Optional[AccessToken]) -> Optional[AccessToken]:
+        """Warning. This method is private and should not be called manually
+           Gets the stored token, a token the server rejected is deleted instead
+        """
+        key = TokenStore.key_for(self.api_host, self._user_name)
+        with self.token_store.locked():
+            stored = self.token_store.load(key)
+            if revoked is not None and stored == revoked:
+                self.token_store.delete(key)
+                return None
+            return stored
+
+    async def _store(self) -> None:
+        """Warning. This method is private and should not be called manually"""
+        self._reused = False
+        if self.token_store is not None:
+            await self._run_blocking(
+                self.token_store.save, TokenStore.key_for(self.api_host, self._user_name), self.access)
+
+    async def _run_blocking(self, func, *args):
+        """Warning. This method is private and should not be called manually
+           Runs blocking token store calls in the default executor to keep the event loop responsive
+        """
+        return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+    async def get_token(self) -> AccessToken:
+        """Generate an AccessToken
+
+        Raises:
+            Exception: Raise if login was not successfully
+
+        Returns:
+            AccessToken: AccessToken instance with expiration time in Unix time
+        """
+        data = {"userName": self._user_name, "userPassword": self._password}
+        headers = {
+            "accept": "application/json",
+            "Content-Type": "application/json"
+        }
+        response = await self.client.post(
+            url=f"{self.api_host}{Route.AUTH.value}", headers=headers, json=data,
+            follow_redirects=True, timeout=120)
+        if response.status_code != 200:
+            raise AimanError.from_status(
+                response.status_code, f"[{response.status_code}] Reason: {response.reason_phrase}")
+
+        return TokenCredential._to_access_token_object(response=response)  # pylint: disable=protected-access
+
+    async def refresh_access_token(self) -> AccessToken:
+        """Refreshing an existing AccessToken object
+
+        Raises:
+            Exception: Raise if refresh was not successfully
+
+        Returns:
+            AccessToken: AccessToken instance with expiration time in Unix time
+        """
+        response = await self.client.post(
+            url=f"{self.api_host}{Route.AUTH_REFRESH.value}",
+            json={"refresh_token": self.access.refresh_token},
+            follow_redirects=True, timeout=120)
+
+        if response.status_code != 200:
+            raise AimanError.from_status(
+                response.status_code, f"[{response.status_code}] Reason: {response.reason_phrase}")
+
+        self.access = TokenCredential._to_access_token_object(response=response)  # pylint: disable=protected-access
+        await self._store()
+        return self.access
+
+    async def aclose(self) -> None:
+        """Close the underlying client and release all pooled connections"""
+        await self.client.aclose()
+
+    def _needs_refresh(self) -> bool:
+        return self.auto_refresh_token and Util.is_token_expired(self.access.expires_on - self.refresh_skew)
+
+
+__all__ = [
+    "AsyncTokenCredential"
+]
@@ -0,0 +1,385 @@
+"""Module providing client side caches"""
+import dataclasses
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Optional, Tuple
+from aiman.core.classes import Attachment
+
+
+@dataclass
+class CacheStats:
+    """Represents the counters of a cache"""
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    entries: int = 0
+    bytes: int = 0
+    bytes_saved: int = 0
+
+
+class AttachmentCache:
+    """Represents a content addressed LRU cache of base64 encoded attachments
+
+    Entries are keyed by the SHA-256 digest of the file content, so identical files
+    are encoded only once. Paths are remembered with their modification time and size
+    (the max_paths most recent ones); a changed file is hashed again and never served
+    from a stale entry. A file which changed while it was hashed and encoded is not
+    cached. The cache is bounded by the total length of the encoded content and is
+    safe to share between threads.
+    """
+
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024, max_paths: int = 4096) -> None:
+        """Instantiate a new attachment cache
+
+        Args:
+            max_bytes (int, optional): Maximum total size of all encoded entries. Defaults to 256 MB.
+            max_paths (int, optional): Maximum number of remembered file paths. Defaults to 4096.
+        """
+        self.max_bytes = max_bytes
+        self.max_paths = max_paths
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._bytes = 0
+        self._entries: "OrderedDict[str, Attachment]" = OrderedDict()
+        self._paths: "OrderedDict[str, Tuple[int, int, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, file_path: str, encode: Callable[[str], Attachment]) -> Attachment:
+        """Get the encoded attachment of a file, encode it on a miss
+
+        Args:
+            file_path (str): The file to attach
+            encode (Callable[[str], Attachment]): Builds the attachment of a file path
+
+        Returns:
+            Attachment: The attachment named after the given file
+        """
+        path = os.path.abspath(file_path)
+        version = self._version(path)
+        with self._lock:
+            known = self._paths.get(path)
+            if known is not None and known[:2] == version:
+                self._paths.move_to_end(path)
+        if known is not None and known[:2] == version:
+            digest = known[2]
+        else:
+            digest = self.file_digest(path)
+            known = None
+
+        name = os.path.basename(file_path)
+        with self._lock:
+            cached = self._entries.get(digest)
+            if cached is not None:
+                self._entries.move_to_end(digest)
+                self.hits += 1
+            else:
+                self.misses += 1
+        if cached is not None:
+            if known is None and self._version(path) == version:
+                self._remember(path, version, digest)
+            return dataclasses.replace(cached, name=name)
+
+        attachment = encode(file_path)
+        # the digest and the encoded content belong to the same file version only if it did not change
+        if self._version(path) == version:
+            self._remember(path, version, digest)
+            self._store(digest, attachment)
+        return dataclasses.replace(attachment, name=name)
+
+    def stats(self) -> CacheStats:
+        """Get the current counters
+
+        Returns:
+            CacheStats: hits, misses, evictions, entries and encoded bytes
+        """
+        with self._lock:
+            return CacheStats(hits=self.hits, misses=self.misses, evictions=self.evictions,
+                              entries=len(self._entries), bytes=self._bytes)
+
+    def clear(self) -> None:
+        """Remove all entries"""
+        with self._lock:
+            self._entries.clear()
+            self._paths.clear()
+            self._bytes = 0
+
+    @classmethod
+    def file_digest(cls, file_path: str, chunk_size: int = 1024 * 1024) -> str:
+        """Get the SHA-256 digest of a file without reading it into memory at once
+
+        Args:
+            file_path (str): The file path
+            chunk_size (int, optional): Bytes read per chunk. Defaults to 1 MB.
+
+        Returns:
+            str: The hex digest
+        """
+        digest = hashlib.sha256()
+        with open(file_path, "rb") as source:
+            for chunk in iter(lambda: source.read(chunk_size), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    @staticmethod
+    def _version(path: str) -> Tuple[int, int]:
+        stat = os.stat(path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def _remember(self, path: str, version: Tuple[int, int], digest: str) -> None:
+        with self._lock:
+            self._paths[path] = (*version, digest)
+            self._paths.move_to_end(path)
+            while len(self._paths) > self.max_paths:
+                self._paths.popitem(last=False)
+
+    def _store(self, digest: str, attachment: Attachment) -> None:
+        size = len(attachment.base64)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if digest in self._entries:
+                return
+            self._entries[digest] = attachment
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted.base64)
+                self.evictions += 1
+
+
+class ResponseCache(ABC):
+    """Represents a cache of prompt responses
+
+    Base class of the response cache backends. Keys are canonical hashes of the prompt
+    route and payload (see key_for), values the serialized response data. Entries
+    expire after ttl seconds, None keeps them until they are evicted. Only deterministic
+    prompts (see cacheable) are cached unless a prompt opts in with use_cache=True.
+    """
+
+    def __init__(self, ttl: Optional[float] = 3600.0) -> None:
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bytes_saved = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def key_for(cls, route: str, payload: dict) -> str:
+        """Get the canonical key of a prompt
+
+        Args:
+            route (str): The prompt route
+            payload (dict): The prompt payload, attachment contents replaced by their digests
+
+        Returns:
+            str: The hex digest of the sorted, compact json of route and payload
+        """
+        canonical = json.dumps({"route": route, "payload": payload},
+                               sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    @classmethod
+    def cacheable(cls, options: Optional[dict]) -> bool:
+        """Check if the prompt options give the same answer twice
+
+        Args:
+            options (Optional[dict]): The prompt options of the payload
+
+        Returns:
+            bool: True for temperature 0 with a fixed seed, the default seed 0 is not fixed
+        """
+        if not options:
+            return False
+        return options.get("temperature") == 0 and bool(options.get("seed"))
+
+    def get(self, key: str) -> Optional[dict]:
+        """Get a cached response
+
+        Args:
+            key (str): The prompt key
+
+        Returns:
+            Optional[dict]: The response data or None on a miss
+        """
+        value = self._load(key, time.time())
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.bytes_saved += len(value)
+        return json.loads(value)
+
+    def set(self, key: str, response: dict) -> None:
+        """Store a response
+
+        Args:
+            key (str): The prompt key
+            response (dict): The response data
+        """
+        expires = None if self.ttl is None else time.time() + self.ttl
+        self._save(key, json.dumps(response).encode("utf-8"), expires)
+
+    def stats(self) -> CacheStats:
+        """Get the current counters
+
+        Returns:
+            CacheStats: hits, misses, evictions, entries, stored bytes and bytes served from the cache
+        """
+        entries, size = self._size()
+        with self._lock:
+            return CacheStats(hits=self.hits, misses=self.misses, evictions=self.evictions,
+                              entries=entries, bytes=size, bytes_saved=self.bytes_saved)
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Remove all entries"""
+
+    @abstractmethod
+    def _load(self, key: str, now: float) -> Optional[bytes]:
+        """Warning. This method is private and should not be called manually"""
+
+    @abstractmethod
+    def _save(self, key: str, value: bytes, expires: Optional[float]) -> None:
+        """Warning. This method is private and should not be called manually"""
+
+    @abstractmethod
+    def _size(self) -> Tuple[int, int]:
+        """Warning. This method is private and should not be called manually"""
+
+
+class MemoryResponseCache(ResponseCache):
+    """Represents an in-memory LRU response cache with a time to live"""
+
+    def __init__(self, ttl: Optional[float] = 3600.0, max_entries: int = 1024,
+                 max_bytes: int = 64 * 1024 * 1024) -> None:
+        """Instantiate a new in-memory response cache
+
+        Args:
+            ttl (Optional[float], optional): Seconds until an entry expires. Defaults to 3600.
+            max_entries (int, optional): Maximum amount of entries. Defaults to 1024.
+            max_bytes (int, optional): Maximum total size of all entries. Defaults to 64 MB.
+        """
+        super().__init__(ttl=ttl)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._bytes = 0
+        self._entries: "OrderedDict[str, Tuple[Optional[float], bytes]]" = OrderedDict()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _load(self, key: str, now: float) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] is not None and entry[0] <= now:
+                del self._entries[key]
+                self._bytes -= len(entry[1])
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def _save(self, key: str, value: bytes, expires: Optional[float]) -> None:
+        if len(value) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous[1])
+            self._entries[key] = (expires, value)
+            self._bytes += len(value)
+            while self._bytes > self.max_bytes or len(self._entries) > self.max_entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted[1])
+                self.evictions += 1
+
+    def _size(self) -> Tuple[int, int]:
+        with self._lock:
+            return len(self._entries), self._bytes
+
+
+class SQLiteResponseCache(ResponseCache):
+    """Represents an on-disk response cache stored in a SQLite database
+
+    The cache survives restarts and can be shared by several processes. Least
+    recently used entries are evicted once max_entries is exceeded.
+    """
+
+    def __init__(self, path: str, ttl: Optional[float] = 24 * 3600.0, max_entries: int = 100000) -> None:
+        """Instantiate a new SQLite response cache
+
+        Args:
+            path (str): The database file, created if missing
+            ttl (Optional[float], optional): Seconds until an entry expires. Defaults to 24 hours.
+            max_entries (int, optional): Maximum amount of entries. Defaults to 100000.
+        """
+        super().__init__(ttl=ttl)
+        self.path = path
+        self.max_entries = max_entries
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, expires REAL, accessed REAL NOT NULL)")
+        self._connection.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+
+    def close(self) -> None:
+        """Close the database connection"""
+        with self._lock:
+            self._connection.close()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._connection.execute("DELETE FROM responses")
+
+    def _load(self, key: str, now: float) -> Optional[bytes]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value, expires FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if row[1] is not None and row[1] <= now:
+                self._connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+            self._connection.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+            return bytes(row[0])
+
+    def _save(self, key: str, value: bytes, expires: Optional[float]) -> None:
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses (key, value, expires, accessed) VALUES (?, ?, ?, ?)",
+                (key, sqlite3.Binary(value), expires, time.time()))
+            count = self._connection.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            if count > self.max_entries:
+                self._connection.execute(
+                    "DELETE FROM responses WHERE key IN "
+                    "(SELECT key FROM responses ORDER BY accessed LIMIT ?)", (count - self.max_entries,))
+                self.evictions += count - self.max_entries
+
+    def _size(self) -> Tuple[int, int]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(value)), 0) FROM responses").fetchone()
+        return row[0], row[1]
+
+
+__all__ = [
+    "AttachmentCache",
+    "CacheStats",
+    "ResponseCache",
+    "MemoryResponseCache",
+    "SQLiteResponseCache"
+]
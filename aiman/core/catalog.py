@@ -0,0 +1,231 @@
+"""Module providing a cached catalog of the available models"""
+import asyncio
+import threading
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+from aiman.core.classes import AIModel
+
+ModelLoader = Callable[[Dict[str, str]], Tuple[Optional[List[AIModel]], Dict[str, str]]]
+AsyncModelLoader = Callable[[Dict[str, str]], Awaitable[Tuple[Optional[List[AIModel]], Dict[str, str]]]]
+
+
+class ModelCatalog:
+    """Represents a cached catalog of the available models
+
+    The models are loaded once and kept for ttl seconds. A stale catalog is revalidated
+    with If-None-Match / If-Modified-Since if the server sent an ETag or Last-Modified
+    header, an unchanged catalog costs a 304 without a body. Lookups by name, uuid and
+    model tag id are dict lookups. With background_refresh a timer thread revalidates
+    the catalog before it expires, so lookups never wait for the server.
+
+    Bound to an AsyncAimanClient the catalog is loaded by await models_async() (or
+    refresh_async()), concurrent coroutines share a single revalidation. The lookups
+    do not block the event loop, they serve the catalog as of the last load. There
+    is no background refresh for an async client.
+    """
+
+    def __init__(self, ttl: float = 300.0, background_refresh: bool = False) -> None:
+        """Instantiate a new model catalog
+
+        Args:
+            ttl (float, optional): Seconds until the catalog is revalidated. Defaults to 300.
+            background_refresh (bool, optional): Revalidate in a timer thread ahead of expiry. Defaults to False.
+        """
+        self.ttl = ttl
+        self.background_refresh = background_refresh
+        self.loader: Optional[ModelLoader] = None
+        self.async_loader: Optional[AsyncModelLoader] = None
+        self.fetched_at: Optional[float] = None
+        self.revalidations = 0
+        self._models: List[AIModel] = []
+        self._by_name: Dict[str, AIModel] = {}
+        self._by_uuid: Dict[str, AIModel] = {}
+        self._by_tag_id: Dict[int, AIModel] = {}
+        self._validators: Dict[str, str] = {}
+        self._lock = threading.RLock()
+        self._timer: Optional[threading.Timer] = None
+        self._closed = False
+        self._pending: Optional[asyncio.Future] = None
+
+    def bind(self, loader: ModelLoader) -> "ModelCatalog":
+        """Set the function loading the models, called by the client
+
+        Args:
+            loader (ModelLoader): Gets the validator headers and returns the models (None if not modified)
+                and the response headers
+
+        Returns:
+            ModelCatalog: self
+        """
+        self.loader = loader
+        return self
+
+    def bind_async(self, loader: AsyncModelLoader) -> "ModelCatalog":
+        """Set the coroutine function loading the models, called by the async client
+
+        Args:
+            loader (AsyncModelLoader): Like the loader of bind(), awaitable
+
+        Returns:
+            ModelCatalog: self
+        """
+        self.async_loader = loader
+        return self
+
+    async def models_async(self) -> List[AIModel]:
+        """Get all available models, revalidated without blocking the event loop
+
+        Returns:
+            List[AIModel]: List of AIModel objects
+        """
+        fetched_at = self.fetched_at
+        if fetched_at is None or time.monotonic() - fetched_at >= self.ttl:
+            return await self.refresh_async()
+        return list(self._models)
+
+    async def refresh_async(self) -> List[AIModel]:
+        """Revalidate the catalog now, a revalidation in flight is awaited instead
+
+        Raises:
+            RuntimeError: If no async loader is bound
+
+        Returns:
+            List[AIModel]: List of AIModel objects
+        """
+        if self.async_loader is None:
+            raise RuntimeError("The model catalog is not bound to an async client")
+        pending = self._pending
+        if pending is None or pending.done() or pending.get_loop() is not asyncio.get_running_loop():
+            pending = self._pending = asyncio.ensure_future(self._load_async())
+        return list(await asyncio.shield(pending))
+
+    def models(self) -> List[AIModel]:
+        """Get all available models
+
+        Returns:
+            List[AIModel]: List of AIModel objects
+        """
+        self._ensure_fresh()
+        return list(self._models)
+
+    def by_name(self, name: str) -> Optional[AIModel]:
+        """Get a model by name
+
+        Args:
+            name (str): The model name
+
+        Returns:
+            Optional[AIModel]: The model or None
+        """
+        self._ensure_fresh()
+        return self._by_name.get(name)
+
+    def by_uuid(self, uuid: str) -> Optional[AIModel]:
+        """Get a model by uuid
+
+        Args:
+            uuid (str): The model uuid
+
+        Returns:
+            Optional[AIModel]: The model or None
+        """
+        self._ensure_fresh()
+        return self._by_uuid.get(uuid)
+
+    def by_tag_id(self, model_tag_id: int) -> Optional[AIModel]:
+        """Get a model by its default model tag id
+
+        Args:
+            model_tag_id (int): The model tag id
+
+        Returns:
+            Optional[AIModel]: The model or None
+        """
+        self._ensure_fresh()
+        return self._by_tag_id.get(model_tag_id)
+
+    def refresh(self) -> List[AIModel]:
+        """Revalidate the catalog now (thread-safe)
+
+        Raises:
+            RuntimeError: If no loader is bound
+
+        Returns:
+            List[AIModel]: List of AIModel objects
+        """
+        if self.loader is None:
+            raise RuntimeError("The model catalog is not bound to a client")
+        with self._lock:
+            self._apply(*self.loader(dict(self._validators)))
+            if self.background_refresh:
+                self._schedule_refresh(self.ttl * 0.9)
+            return list(self._models)
+
+    def invalidate(self) -> None:
+        """Force a full reload on the next access"""
+        with self._lock:
+            self.fetched_at = None
+            self._validators = {}
+
+    def close(self) -> None:
+        """Stop the background refresh"""
+        self._closed = True
+        if self._timer is not None:
+            self._timer.cancel()
+
+    def _ensure_fresh(self) -> None:
+        fetched_at = self.fetched_at
+        if fetched_at is not None and time.monotonic() - fetched_at < self.ttl:
+            return
+        if self.loader is None and self.async_loader is not None:
+            if fetched_at is None:
+                raise RuntimeError("Load the models with await client.get_models() first")
+            return
+        with self._lock:
+            if self.fetched_at is fetched_at:
+                self.refresh()
+
+    async def _load_async(self) -> List[AIModel]:
+        models, headers = await self.async_loader(dict(self._validators))
+        with self._lock:
+            self._apply(models, headers)
+            return self._models
+
+    def _apply(self, models: Optional[List[AIModel]], headers: Dict[str, str]) -> None:
+        if models is None:
+            self.revalidations += 1
+        else:
+            self._index(models)
+        self._validators = {}
+        if headers.get("ETag"):
+            self._validators["If-None-Match"] = headers["ETag"]
+        if headers.get("Last-Modified"):
+            self._validators["If-Modified-Since"] = headers["Last-Modified"]
+        self.fetched_at = time.monotonic()
+
+    def _index(self, models: List[AIModel]) -> None:
+        self._models = models
+        self._by_name = {model.name: model for model in models}
+        self._by_uuid = {model.uuid: model for model in models}
+        self._by_tag_id = {model.default_model_tag_id: model for model in models}
+
+    def _schedule_refresh(self, delay: float) -> None:
+        if self._closed:
+            return
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = threading.Timer(max(delay, 1.0), self._background_refresh)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _background_refresh(self) -> None:
+        try:
+            self.refresh()
+        except (RuntimeError, OSError):
+            # keep serving the known models, lookups reload on their own once the ttl passed
+            self._schedule_refresh(min(5.0, self.ttl / 2))
+
+
+__all__ = [
+    "ModelCatalog"
+]
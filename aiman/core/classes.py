@@ -1,9 +1,57 @@
 """Module providing different dataclasses"""
+import dataclasses
+import operator
 from dataclasses import dataclass
 from enum import Enum
-from typing import List, Optional
+from typing import Any, List, Optional, Tuple
 
+_KEEP = object()
 
+
+def _add_slots(cls: type) -> type:
+    """Recreate a dataclass with __slots__ (dataclass(slots=True) requires Python 3.10)
+
+    Slotted instances have no per instance __dict__, which roughly halves their size.
+    """
+    inherited = {name for base in cls.__mro__[1:] for name in getattr(base, "__slots__", ())}
+    field_names = tuple(field.name for field in dataclasses.fields(cls) if field.name not in inherited)
+    namespace = dict(cls.__dict__)
+    namespace["__slots__"] = field_names
+    for name in field_names + ("__dict__", "__weakref__"):
+        namespace.pop(name, None)
+    return type(cls)(cls.__name__, cls.__bases__, namespace)
+
+
+class _FieldMap:
+    """Table driven mapping between attributes and camelCase dict keys
+
+    Each entry is (attribute, key, default). from_dict uses the default for a missing
+    key, _KEEP leaves the attribute unchanged.
+    """
+
+    def __init__(self, *entries: Tuple[str, str, Any]) -> None:
+        self.entries = entries
+        self._keys = tuple(key for _, key, _ in entries)
+        self._values = operator.attrgetter(*(attribute for attribute, _, _ in entries))
+        self._kept = tuple(entry for entry in entries if entry[2] is _KEEP)
+        self._defaulted = tuple(entry for entry in entries if entry[2] is not _KEEP)
+
+    def dump(self, obj) -> dict:
+        """Get the dict of an instance, keyed by the dict keys of the table"""
+        return dict(zip(self._keys, self._values(obj)))
+
+    def load(self, obj, values: dict):
+        """Set the attributes of an instance from a dict and return the instance"""
+        get = values.get
+        for attribute, key, default in self._defaulted:
+            setattr(obj, attribute, get(key, default))
+        for attribute, key, _ in self._kept:
+            if key in values:
+                setattr(obj, attribute, values[key])
+        return obj
+
+
+@_add_slots
 @dataclass
 class AIModel:
 
@@ -19,36 +67,25 @@ class AIModel:
     required_memory: str = -1
     size: int = -1
 
+    _FIELDS = _FieldMap(
+        ("id",                   "id",                0),
+        ("uuid",                 "uuId",              ""),
+        ("name",                 "name",              ""),
+        ("short_description",    "shortDescription",  ""),
+        ("long_description",     "longDescription",   ""),
+        ("default_model_tag_id", "defaultModelTagId", 0),
+        ("amount_of_pulls",      "amountOfPulls",     ""),
+        ("amount_of_tags",       "amountOfTags",      0),
+        ("required_memory",      "requiredMemory",    ""),
+        ("size",                 "size",              0))
 
     def to_dict(self):
         """Parsing a AIModel Instance to a dict"""
-        return {
-            "id": self.id,
-            "uuId": self.uuid,
-            "name": self.name,
-            "shortDescription": self.short_description,
-            "longDescription": self.long_description,
-            "defaultModelTagId": self.default_model_tag_id,
-            "amountOfPulls": self.amount_of_pulls,
-            "amountOfTags": self.amount_of_tags,
-            "requiredMemory": self.required_memory,
-            "size": self.size
-        }
-
+        return self._FIELDS.dump(self)
 
     def from_dict(self, values: dict):
         """Parsing a dict to a AIModel Instance"""
-        self.id = 0 if "id" not in values else values["id"]
-        self.uuid = "" if "uuId" not in values else values["uuId"]
-        self.name = "" if "name" not in values else values["name"]
-        self.short_description = "" if "shortDescription" not in values else values["shortDescription"]
-        self.long_description = "" if "longDescription" not in values else values["longDescription"]
-        self.default_model_tag_id = 0 if "defaultModelTagId" not in values else values["defaultModelTagId"]
-        self.amount_of_pulls = "" if "amountOfPulls" not in values else values["amountOfPulls"]
-        self.amount_of_tags = 0 if "amountOfTags" not in values else values["amountOfTags"]
-        self.required_memory = "" if "requiredMemory" not in values else values["requiredMemory"]
-        self.size = 0 if "size" not in values else values["size"]
-        return self
+        return self._FIELDS.load(self, values)
 
 
 @dataclass
@@ -100,6 +137,7 @@ class Query:
         return self
 
 
+@_add_slots
 @dataclass
 class PromptOptions:
     """Represents prompt options"""
@@ -114,60 +152,44 @@ class PromptOptions:
     repeat_penalty: float = 1.1
     temperature: float = 0.8
     seed: int = 0
-    stop = None
     tfs_z: int = 1
     num_predict: int = 2048
     top_k: int = 40
     top_p: float = 0.9
     raw: bool = False
     keep_context: bool = True
+    stop: Optional[List[str]] = None
+
+    _FIELDS = _FieldMap(
+        ("mirostat",       "mirostat",       0),
+        ("mirostat_eta",   "mirostat_eta",   100),
+        ("mirostat_tau",   "mirostat_tau",   5),
+        ("num_ctx",        "num_ctx",        4096),
+        ("num_gqa",        "num_gqa",        8),
+        ("num_gpu",        "num_gpu",        0),
+        ("num_thread",     "num_thread",     0),
+        ("repeat_last_n",  "repeat_last_n",  64),
+        ("repeat_penalty", "repeat_penalty", 1.1),
+        ("temperature",    "temperature",    0.8),
+        ("seed",           "seed",           0),
+        ("stop",           "stop",           None),
+        ("tfs_z",          "tfs_z",          1),
+        ("num_predict",    "num_predict",    2048),
+        ("top_k",          "top_k",          40),
+        ("top_p",          "top_p",          0.9),
+        ("raw",            "raw",            False),
+        ("keep_context",   "keep_context",   True))
 
     def to_dict(self):
         """Parsing a Projcet Instance to a dict"""
-        return {
-            "mirostat":         self.mirostat,
-            "mirostat_eta":     self.mirostat_eta,
-            "mirostat_tau":     self.mirostat_tau,
-            "num_ctx":          self.num_ctx,
-            "num_gqa":          self.num_gqa,
-            "num_gpu":          self.num_gpu,
-            "num_thread":       self.num_thread,
-            "repeat_last_n":    self.repeat_last_n,
-            "repeat_penalty":   self.repeat_penalty,
-            "temperature":      self.temperature,
-            "seed":             self.seed,
-            "stop":             self.stop,
-            "tfs_z":            self.tfs_z,
-            "num_predict":      self.num_predict,
-            "top_k":            self.top_k,
-            "top_p":            self.top_p,
-            "raw":              self.raw,
-            "keep_context":     self.keep_context
-        }
+        return self._FIELDS.dump(self)
 
     def from_dict(self, values: dict):
         """Parsing a dict to a Projcet Instance"""
-        self.mirostat = 0 if "mirostat" not in values else values["mirostat"]
-        self.mirostat_eta = 100 if "mirostat_eta" not in values else values["mirostat_eta"]
-        self.mirostat_tau = 5 if "mirostat_tau" not in values else values["mirostat_tau"]
-        self.num_ctx = 4096 if "num_ctx" not in values else values["num_ctx"]
-        self.num_gqa = 8 if "num_gqa" not in values else values["num_gqa"]
-        self.num_gpu = 0 if "num_gpu" not in values else values["num_gpu"]
-        self.num_thread = 0 if "num_thread" not in values else values["num_thread"]
-        self.repeat_last_n = 64 if "repeat_last_n" not in values else values["repeat_last_n"]
-        self.repeat_penalty = 1.1 if "repeat_penalty" not in values else values["repeat_penalty"]
-        self.temperature = 0.8 if "temperature" not in values else values["temperature"]
-        self.seed = 0 if "seed" not in values else values["seed"]
-        self.stop = None if "stop" not in values else values["stop"]
-        self.tfs_z = 1 if "tfs_z" not in values else values["tfs_z"]
-        self.num_predict = 2048 if "num_predict" not in values else values["num_predict"]
-        self.top_k = 40 if "top_k" not in values else values["top_k"]
-        self.top_p = 0.9 if "top_p" not in values else values["top_p"]
-        self.raw = False if "raw" not in values else values["raw"]
-        self.keep_context = True if "keep_context" not in values else values["keep_context"]
-        return self
+        return self._FIELDS.load(self, values)
 
 
+@_add_slots
 @dataclass
 class Prompt:
     """Represents a prompt"""
@@ -184,40 +206,30 @@ class Prompt:
     keep_alive: str = "5m"
     datasource_id: int = 0
 
+    _FIELDS = _FieldMap(
+        ("prompt",         "prompt",       ""),
+        ("model_tag_id",   "modelTagId",   0),
+        ("raw",            "raw",          False),
+        ("stream",         "stream",       False),
+        ("project_id",     "projectId",    False),
+        ("project_tab_id", "projectTabId", 0),
+        ("user_id",        "userId",       0),
+        ("verbose",        "verbose",      True),
+        ("attachments",    "attachments",  None),
+        ("keep_context",   "keepContext",  True),
+        ("keep_alive",     "keepAlive",    "5m"),
+        ("datasource_id",  "datasourceId", 0))
+
     def to_dict(self):
         """Parsing a Prompt Instance to a dict"""
-        return {
-            "prompt":       self.prompt,
-            "modelTagId":   self.model_tag_id,
-            "raw":          self.raw,
-            "stream":       self.stream,
-            "projectId":    self.project_id,
-            "projectTabId": self.project_tab_id,
-            "userId":       self.user_id,
-            "verbose":      self.verbose,
-            "attachments":  self.attachments,
-            "keepContext":  self.keep_context,
-            "keepAlive":    self.keep_alive,
-            "datasourceId": self.datasource_id
-        }
+        return self._FIELDS.dump(self)
 
     def from_dict(self, values: dict):
         """Parsing a dict to a Prompt Instance"""
-        self.prompt = "" if "prompt" not in values else values["prompt"]
-        self.model_tag_id = 0 if "modelTagId" not in values else values["modelTagId"]
-        self.raw = False if "raw" not in values else values["raw"]
-        self.stream = False if "stream" not in values else values["stream"]
-        self.project_id = False if "projectId" not in values else values["projectId"]
-        self.project_tab_id = 0 if "projectTabId" not in values else values["projectTabId"]
-        self.user_id = 0 if "userId" not in values else values["userId"]
-        self.verbose = True if "verbose" not in values else values["verbose"]
-        self.attachments = None if "attachments" not in values else values["attachments"]
-        self.keep_context = True if "keepContext" not in values else values["keepContext"]
-        self.keep_alive = "5m" if "keepAlive" not in values else values["keepAlive"]
-        self.datasource_id = 0 if "datasourceId" not in values else values["datasourceId"]
-        return self
+        return self._FIELDS.load(self, values)
 
 
+@_add_slots
 @dataclass
 class DataSource:
     """Represents a prompt datasource (raging)"""
@@ -232,34 +244,25 @@ class DataSource:
     media_count: Optional[int] = -1
     owner_id: Optional[int] = -1
 
+    _FIELDS = _FieldMap(
+        ("name",           "name",          ""),
+        ("summary",        "summary",       ""),
+        ("id",             "id",            -1),
+        ("categories",     "categories",    None),
+        ("tags",           "tags",          None),
+        ("assoc_contexts", "assocContexts", None),
+        ("media",          "media",         None),
+        ("status",         "status",        -1),
+        ("media_count",    "mediaCount",    -1),
+        ("owner_id",       "ownerId",       -1))
+
     def to_dict(self):
         """Parsing a DataSource Instance to a dict"""
-        return {
-            "name":             self.name,
-            "summary":          self.summary,
-            "id":               self.categories,
-            "categories":       self.categories,
-            "tags":             self.tags,
-            "assocContexts":    self.assoc_contexts,
-            "media":            self.media,
-            "status":           self.status,
-            "mediaCount":       self.media_count,
-            "ownerId":          self.owner_id
-        }
+        return self._FIELDS.dump(self)
 
     def from_dict(self, values: dict):
-        """Parsing a dict to a DataSource Instance"""
-        self.name = values["name"]
-        self.summary = values["summary"]
-        self.id = values["id"]
-        self.categories = values["categories"]
-        self.tags = values["tags"]
-        self.assoc_contexts = values["assocContexts"]
-        self.media = values["media"]
-        self.status = values["status"]
-        self.media_count = values["mediaCount"]
-        self.owner_id = values["ownerId"]
-        return self
+        """Parsing a dict to a DataSource Instance (list payloads may omit e.g. the media list)"""
+        return self._FIELDS.load(self, values)
 
 
 @dataclass
@@ -277,6 +280,7 @@ class Media:
         return self
 
 
+@_add_slots
 @dataclass
 class Attachment:
     """Represents an prompt attachment"""
@@ -285,28 +289,80 @@ class Attachment:
     size: int = 0
     mime_type: str = ""
 
+    _FIELDS = _FieldMap(
+        ("base64",    "base64",    _KEEP),
+        ("name",      "name",      _KEEP),
+        ("size",      "size",      _KEEP),
+        ("mime_type", "mime_type", _KEEP))
+
     def to_dict(self):
         """Parsing a Media Instance to a dict"""
-        return {
-            "base64":   self.base64,
-            "name":     self.name,
-            "size":     self.size,
-            "mime_type":self.mime_type
-        }
+        return self._FIELDS.dump(self)
 
     def from_dict(self, values: dict):
         """Parsing a dict to a Media Instance"""
-        if values == {}:
-            return self
-        if "name" in values:
-            self.name = values["name"]
-        if "base64" in values:
-            self.base64 = values["base64"]
-        if "size" in values:
-            self.size = values["size"]
-        if "mime_type" in values:
-            self.mime_type = values["mime_type"]
-        return self
+        return self._FIELDS.load(self, values)
+
+
+@_add_slots
+@dataclass
+class UploadedAttachment(Attachment):
+    """Represents an attachment uploaded in parts beforehand, referenced by its upload id instead of base64"""
+    upload_id: str = ""
+
+    _FIELDS = _FieldMap(
+        ("upload_id", "uploadId",  _KEEP),
+        ("name",      "name",      _KEEP),
+        ("size",      "size",      _KEEP),
+        ("mime_type", "mime_type", _KEEP))
+
+    def to_dict(self):
+        """Parsing an UploadedAttachment Instance to a dict"""
+        return self._FIELDS.dump(self)
+
+    def from_dict(self, values: dict):
+        """Parsing a dict to an UploadedAttachment Instance"""
+        return self._FIELDS.load(self, values)
+
+
+@dataclass
+class PromptResult:
+    """Represents the outcome of a single prompt of a batch"""
+    index: int = -1
+    request: Optional[dict] = None
+    response: Optional[dict] = None
+    error: Optional[Exception] = None
+
+    @property
+    def ok(self) -> bool:
+        """True if the prompt was answered without an error"""
+        return self.error is None
+
+
+@dataclass
+class IngestionProgress:
+    """Represents the progress of a single document during a bulk ingestion"""
+    source: str = ""
+    status: str = ""
+    bytes: int = 0
+    files_done: int = 0
+    files_total: int = 0
+
+
+@dataclass
+class IngestionSummary:
+    """Represents the result of a bulk ingestion"""
+    files_total: int = 0
+    files_uploaded: int = 0
+    files_skipped: int = 0
+    chunks: int = 0
+    bytes_uploaded: int = 0
+    seconds: float = 0.0
+
+    @property
+    def bytes_per_second(self) -> float:
+        """The achieved upload rate of the encoded documents"""
+        return self.bytes_uploaded / self.seconds if self.seconds > 0 else 0.0
 
 
 class Route(Enum):
@@ -318,6 +374,7 @@ class Route(Enum):
     PROMPT = f'{BASE}prompts/model_tag'
     PROMPT_WITH_DATASOURCE = f'{BASE}prompts'
     DATA_SOURCE = f'{BASE}datasources'
+    UPLOADS = f'{BASE}uploads'
 
 
 class RequestType(Enum):
@@ -333,6 +390,10 @@ __all__ = [
     "Project",
     "Query",
     "Route",
+    "IngestionProgress",
+    "IngestionSummary",
     "Prompt",
+    "PromptResult",
+    "UploadedAttachment",
     "RequestType"
 ]
@@ -0,0 +1,87 @@
+"""Module providing pluggable json codecs"""
+import json
+from typing import Any, Callable, Dict, Optional, Union
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+
+class JsonCodec:
+    """Represents a json encoder and decoder working on bytes
+
+    Uses the fastest installed backend (orjson, msgspec, ujson) and falls back to the
+    standard library. Bodies are encoded to bytes once and sent as they are, responses
+    are decoded straight from the received bytes without an intermediate str.
+
+    dumps(obj) returns the json bytes, loads(data) decodes bytes or str.
+    """
+
+    BACKENDS = ("orjson", "msgspec", "ujson", "json")
+
+    def __init__(self, backend: Optional[str] = None) -> None:
+        """Instantiate a new codec
+
+        Args:
+            backend (Optional[str], optional): One of BACKENDS, None picks the fastest installed one.
+                Defaults to None.
+
+        Raises:
+            ValueError: If the backend is unknown or not installed
+        """
+        available = self.available_backends()
+        if backend is None:
+            backend = available[0]
+        if backend not in available:
+            raise ValueError(f"JSON backend {backend} is not available, installed: {', '.join(available)}")
+        self.backend = backend
+        functions = self._functions()[backend]
+        self.dumps: Callable[[Any], bytes] = functions[0]
+        self.loads: Callable[[Union[bytes, str]], Any] = functions[1]
+
+    @classmethod
+    def available_backends(cls) -> list:
+        """Get the installed backends, fastest first
+
+        Returns:
+            list: Names of the installed backends
+        """
+        modules = {"orjson": orjson, "msgspec": msgspec, "ujson": ujson, "json": json}
+        return [name for name in cls.BACKENDS if modules[name] is not None]
+
+    @classmethod
+    def _functions(cls) -> Dict[str, tuple]:
+        functions: Dict[str, tuple] = {"json": (cls._stdlib_dumps, json.loads)}
+        if orjson is not None:
+            functions["orjson"] = (orjson.dumps, orjson.loads)  # pylint: disable=no-member
+        if msgspec is not None:
+            functions["msgspec"] = (msgspec.json.encode, cls._msgspec_loads)
+        if ujson is not None:
+            dumps: Callable[..., str] = ujson.dumps
+            functions["ujson"] = (lambda obj: dumps(obj, ensure_ascii=False).encode("utf-8"), ujson.loads)
+        return functions
+
+    @staticmethod
+    def _msgspec_loads(data: Union[bytes, str]) -> Any:
+        try:
+            return msgspec.json.decode(data)
+        except msgspec.DecodeError as error:
+            # callers expect the ValueError of the other backends
+            raise ValueError(str(error)) from error
+
+    @staticmethod
+    def _stdlib_dumps(obj: Any) -> bytes:
+        return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+
+__all__ = [
+    "JsonCodec"
+]
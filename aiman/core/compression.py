@@ -0,0 +1,151 @@
+"""Module providing the compression of request bodies"""
+import threading
+import zlib
+from dataclasses import dataclass
+from typing import Callable, Iterable, Iterator, Optional
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+@dataclass
+class TransferRecord:
+    """Represents the size of a single request body before and on the wire"""
+    method: str = ""
+    route: str = ""
+    content_encoding: Optional[str] = None
+    raw_bytes: int = 0
+    wire_bytes: int = 0
+
+    @property
+    def ratio(self) -> float:
+        """raw_bytes / wire_bytes, 1.0 for uncompressed bodies"""
+        return self.raw_bytes / self.wire_bytes if self.wire_bytes else 1.0
+
+
+@dataclass
+class TransferStats:
+    """Represents the accumulated body sizes of all requests of a client"""
+    requests: int = 0
+    compressed_requests: int = 0
+    raw_bytes: int = 0
+    wire_bytes: int = 0
+
+    @property
+    def bytes_saved(self) -> int:
+        """Bytes not sent thanks to the compression"""
+        return self.raw_bytes - self.wire_bytes
+
+
+@dataclass
+class CompressionOptions:
+    """Represents the compression of request bodies
+
+    Bodies of POST and PUT requests of at least threshold bytes are sent with a
+    Content-Encoding of gzip or zstd (requires zstandard). Streamed attachment bodies
+    are compressed chunk by chunk, so memory stays flat. If the server answers 415
+    (Unsupported Media Type) the request is repeated uncompressed and compression
+    stays off for the client. on_transfer is called with a TransferRecord per request.
+    """
+    algorithm: str = "gzip"
+    level: int = 6
+    threshold: int = 16 * 1024
+    on_transfer: Optional[Callable[[TransferRecord], None]] = None
+
+    def __post_init__(self) -> None:
+        if self.algorithm not in ("gzip", "zstd"):
+            raise ValueError(f"Unsupported compression algorithm: {self.algorithm}")
+        if self.algorithm == "zstd" and zstandard is None:
+            raise ValueError("zstd compression requires zstandard: pip install aiman-client[zstd]")
+
+    def applies(self, size: int) -> bool:
+        """Check if a body of the given size is compressed"""
+        return size >= self.threshold
+
+    def compress(self, body: bytes) -> bytes:
+        """Compress a complete body
+
+        Args:
+            body (bytes): The body
+
+        Returns:
+            bytes: The compressed body
+        """
+        return b"".join(self.compress_chunks([body]))
+
+    def compress_chunks(self, chunks: Iterable[bytes]) -> Iterator[bytes]:
+        """Compress a body chunk by chunk
+
+        Args:
+            chunks (Iterable[bytes]): The body chunks
+
+        Returns:
+            Iterator[bytes]: The compressed chunks
+        """
+        if self.algorithm == "zstd":
+            compressor = zstandard.ZstdCompressor(level=self.level).compressobj()
+        else:
+            compressor = zlib.compressobj(self.level, zlib.DEFLATED, 31)
+        for chunk in chunks:
+            compressed = compressor.compress(chunk)
+            if compressed:
+                yield compressed
+        yield compressor.flush()
+
+
+class CompressedBody:
+    """Represents a streamed request body which is compressed while sending
+
+    Can be iterated multiple times (e.g. for retries), wire_bytes holds the
+    compressed size of the last iteration.
+    """
+
+    def __init__(self, body: Iterable[bytes], options: CompressionOptions) -> None:
+        """Instantiate a new compressed body
+
+        Args:
+            body (Iterable[bytes]): The uncompressed body, e.g. a StreamingJsonBody
+            options (CompressionOptions): The compression options
+        """
+        self.body = body
+        self.options = options
+        self.wire_bytes = 0
+
+    def __iter__(self) -> Iterator[bytes]:
+        self.wire_bytes = 0
+        for chunk in self.options.compress_chunks(self.body):
+            self.wire_bytes += len(chunk)
+            yield chunk
+
+
+class TransferMeter:
+    """Accumulates the TransferRecords of a client (thread-safe)"""
+
+    def __init__(self) -> None:
+        self.totals = TransferStats()
+        self._lock = threading.Lock()
+
+    def record(self, record: TransferRecord, options: Optional[CompressionOptions] = None) -> None:
+        """Add a record and pass it to the on_transfer callback"""
+        with self._lock:
+            self.totals.requests += 1
+            self.totals.compressed_requests += 1 if record.content_encoding else 0
+            self.totals.raw_bytes += record.raw_bytes
+            self.totals.wire_bytes += record.wire_bytes
+        if options is not None and options.on_transfer is not None:
+            options.on_transfer(record)
+
+    def stats(self) -> TransferStats:
+        """Get a copy of the accumulated sizes"""
+        with self._lock:
+            return TransferStats(**vars(self.totals))
+
+
+__all__ = [
+    "CompressionOptions",
+    "CompressedBody",
+    "TransferMeter",
+    "TransferRecord",
+    "TransferStats"
+]
@@ -1,42 +1,99 @@
 """Module providing a Token Credential"""
 import json
-from typing import NamedTuple
-import jwt
+import threading
+from contextlib import nullcontext
+from typing import Optional
 import requests
 from aiman.core.util import Util
 from aiman.core.classes import Route
-
-
-class AccessToken(NamedTuple):
-    """Represents an OAuth access token"""
-    token: str
-    refresh_token: str
-    expires_on: int
-
-
-AccessToken.token.__doc__ = """The token string."""
-AccessToken.refresh_token.__doc__ = """The token need for refreshing current accestoken string."""
-AccessToken.expires_on.__doc__ = """The token's expiration time in Unix time."""
+from aiman.core.exceptions import AimanError
+from aiman.core.token_store import AccessToken, TokenStore
+from aiman.core.session import SessionOptions
 
 
 class TokenCredential():
-    """Represents an token credential"""
+    """Represents an token credential
+
+    The login happens on the first request. The credential can be shared between
+    threads. When the token is about to expire only one caller refreshes it while the
+    others wait for the new token. With background_refresh the token is renewed by a
+    timer thread before it expires. With a token_store a still valid token of an
+    earlier credential (e.g. of another process) is reused instead of logging in.
+    """
     api_host: str = None
 
-    def __init__(self, api_host_url: str, user_name: str, password: str, auto_refresh_token=True) -> None:
+    def __init__(self,
+                 api_host_url: str,
+                 user_name: str,
+                 password: str,
+                 auto_refresh_token=True,
+                 session: requests.Session = None,
+                 refresh_skew: float = 30.0,
+                 background_refresh: bool = False,
+                 token_store: Optional[TokenStore] = None) -> None:
+        """Instantiate a new credential, the login happens on first use
+
+        Args:
+            api_host_url (str): The API-Host example: https://aiman-api.brandcompete.com
+            user_name (str): The Username to login
+            password (str): The User related password
+            auto_refresh_token (bool, optional): Refresh expired tokens. Defaults to True.
+            session (requests.Session, optional): Pooled session to send requests with. Defaults to None.
+            refresh_skew (float, optional): Seconds before the expiration a token is refreshed. Defaults to 30.
+            background_refresh (bool, optional): Refresh the token in a timer thread, so requests never
+                wait for a refresh. Defaults to False.
+            token_store (Optional[TokenStore], optional): Keeps the tokens for other credentials of the same
+                host and user, e.g. a FileTokenStore shared by short-lived processes. Defaults to None.
+        """
         self.auto_refresh_token = auto_refresh_token
         self.api_host = Util.validate_url(api_host_url)
-        self.access = self.get_token(
-            api_host_url=api_host_url, user_name=user_name, password=password)
+        self.refresh_skew = refresh_skew
+        self.background_refresh = background_refresh and auto_refresh_token
+        self.token_store = token_store
+        self._owns_session = session is None
+        self.session = session if session is not None else SessionOptions().create_session()
+        self._user_name = user_name
+        self._password = password
+        self._lock = threading.RLock()
+        self._timer: Optional[threading.Timer] = None
+        self._closed = False
+        self._access: Optional[AccessToken] = None
+        self._reused = False
+
+    @property
+    def access(self) -> AccessToken:
+        """The current AccessToken, logs in if there is none yet"""
+        return self._access if self._access is not None else self.get_access_token()
+
+    def get_access_token(self) -> AccessToken:
+        """Get a valid AccessToken, login or refresh it if it expires within refresh_skew seconds
+
+        Concurrent callers share a single login or refresh request (single flight).
+
+        Returns:
+            AccessToken: AccessToken instance with expiration time in Unix time
+        """
+        access = self._access
+        if access is not None and (not self.auto_refresh_token or not self._needs_refresh(access)):
+            return access
+        with self._lock:
+            if self._access is access:
+                self._renew(access)
+            return self._access
 
     @classmethod
-    def get_token(cls, api_host_url: str, user_name: str, password: str) -> AccessToken:
+    def get_token(cls,
+                  api_host_url: str,
+                  user_name: str,
+                  password: str,
+                  session: requests.Session = None) -> AccessToken:
         """Generate an AccessToken 
 
         Args:
             api_host_url (str): The API-Host example: https://aiman-api.brandcompete.com
             user_name (str): The Username to login
             password (str): The User related password
+            session (requests.Session, optional): Pooled session to send the request with. Defaults to None.
 
         Raises:
             Exception: Raise if login was not successfully
@@ -51,17 +108,17 @@ class TokenCredential():
         }
         base_url = Util.validate_url(api_host_url)
         url = f"{base_url}{Route.AUTH.value}"
-        response = requests.post(
+        http = session if session is not None else requests
+        response = http.post(
             url=url, headers=headers, json=data, allow_redirects=True, timeout=120)
         if response.status_code != 200:
-            raise RuntimeError(
-                f"[{response.status_code}] Reason: {response.reason}")
+            raise AimanError.from_status(
+                response.status_code, f"[{response.status_code}] Reason: {response.reason}")
 
         return cls._to_access_token_object(response=response)
 
-    @classmethod
-    def refresh_access_token(cls) -> AccessToken:
-        """Refreshing an existing AccessToken object
+    def refresh_access_token(self) -> AccessToken:
+        """Refreshing an existing AccessToken object (thread-safe)
 
         Raises:
             Exception: Raise if refresh was not successfully
@@ -69,18 +126,106 @@ class TokenCredential():
         Returns:
             AccessToken: AccessToken instance with expiration time in Unix time
         """
-        data = {}
-        response = requests.post(
-            url=f"{cls.api_host}{Route.AUTH_REFRESH.value}",
+        with self._lock:
+            self._renew(self._access)
+            return self._access
+
+    def discard_reused(self) -> bool:
+        """Drop a token taken from the token store after the server rejected it (401)
+
+        Returns:
+            bool: True if the token was reused, so the next request logs in again
+        """
+        with self._lock:
+            if not self._reused:
+                return False
+            with self._store_lock():
+                if self.token_store.load(self._store_key()) == self._access:
+                    self.token_store.delete(self._store_key())
+            self._access, self._reused = None, False
+            return True
+
+    def close(self) -> None:
+        """Stop the background refresh and close the session if it was created by the credential"""
+        self._closed = True
+        if self._timer is not None:
+            self._timer.cancel()
+        if self._owns_session:
+            self.session.close()
+
+    def _renew(self, current: Optional[AccessToken]) -> None:
+        """Warning. This method is private and should not be called manually
+           Takes a newer token from the token store, refreshes the current one or logs in
+        """
+        with self._store_lock():
+            stored = self.token_store.load(self._store_key()) if self.token_store is not None else None
+            if stored is not None and stored != current and not self._needs_refresh(stored):
+                self._set_access(stored, reused=True)
+                return
+            refreshable = current if current is not None else stored if self.auto_refresh_token else None
+            if refreshable is not None:
+                try:
+                    access = self._refresh(refreshable)
+                except AimanError:
+                    # the server rejected the refresh token, a new login replaces it
+                    access = self._login()
+            else:
+                access = self._login()
+            if self.token_store is not None:
+                self.token_store.save(self._store_key(), access)
+            self._set_access(access, reused=False)
+
+    def _login(self) -> AccessToken:
+        return self.get_token(api_host_url=self.api_host, user_name=self._user_name,
+                              password=self._password, session=self.session)
+
+    def _refresh(self, current: AccessToken) -> AccessToken:
+        data = {"refresh_token": current.refresh_token}
+        response = self.session.post(
+            url=f"{self.api_host}{Route.AUTH_REFRESH.value}",
             json=data,
             allow_redirects=True, timeout=120)
 
         if response.status_code != 200:
-            raise RuntimeError(
-                f"[{response.status_code}] Reason: {response.reason}")
-
-        cls.access = cls._to_access_token_object(response=response)
-        return cls.access
+            raise AimanError.from_status(
+                response.status_code, f"[{response.status_code}] Reason: {response.reason}")
+
+        return self._to_access_token_object(response=response)
+
+    def _set_access(self, access: AccessToken, reused: bool) -> None:
+        self._access, self._reused = access, reused
+        if self.background_refresh and self._timer is None:
+            self._schedule_refresh()
+
+    def _store_key(self) -> str:
+        return TokenStore.key_for(self.api_host, self._user_name)
+
+    def _store_lock(self):
+        return self.token_store.locked() if self.token_store is not None else nullcontext()
+
+    def _needs_refresh(self, access: AccessToken) -> bool:
+        return Util.is_token_expired(access.expires_on - self.refresh_skew)
+
+    def _schedule_refresh(self, delay: Optional[float] = None) -> None:
+        if self._closed:
+            return
+        if delay is None:
+            delay = self._access.expires_on - self.refresh_skew - Util.get_current_unix_time()
+        self._timer = threading.Timer(max(delay, 1.0), self._background_refresh)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _background_refresh(self) -> None:
+        with self._lock:
+            # the timer has fired, the next new token schedules the next refresh
+            self._timer = None
+            try:
+                self._renew(self._access)
+            except (requests.RequestException, RuntimeError):
+                # retry soon, requests refresh on their own once the token expired
+                remaining = self._access.expires_on - Util.get_current_unix_time() if self._access else 0
+                if remaining > 0:
+                    self._schedule_refresh(delay=min(5.0, remaining / 2))
 
     @classmethod
     def _to_access_token_object(cls, response: requests.Response) -> AccessToken:
@@ -93,6 +238,7 @@ class TokenCredential():
         Returns:
             AccessToken: AccessToken instance with expiration time in Unix time
         """
+        import jwt  # pylint: disable=import-outside-toplevel
         content = json.loads(response.content.decode('utf-8'))
         token = content['messageContent']['data']['access_token']
         refresh_token = content['messageContent']['data']['refresh_token']
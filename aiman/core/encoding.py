@@ -0,0 +1,161 @@
+"""Module providing memory bounded encoding of attachment request bodies"""
+import binascii
+import json
+import mmap
+import os
+import re
+import uuid
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
+
+
+class StreamingJsonBody:
+    """Represents a json request body whose file contents are base64 encoded while sending
+
+    The payload is serialized with placeholder strings in place of the base64 content.
+    Iterating the body yields the json bytes and encodes the referenced files in fixed
+    size chunks, so at no point a complete encoded file is held in memory. Content which
+    is encoded already (see encode_base64) is yielded as it is, without a str copy. The
+    body can be iterated multiple times (e.g. for retries) and knows its exact length.
+    """
+
+    CHUNK_SIZE = 3 * 256 * 1024
+
+    def __init__(self, payload: dict, files: Dict[str, Union[str, bytearray]], chunk_size: int = CHUNK_SIZE,
+                 dumps: Optional[Callable[[Any], bytes]] = None) -> None:
+        """Instantiate a new streaming body
+
+        Args:
+            payload (dict): The json payload containing placeholder strings
+            files (Dict[str, Union[str, bytearray]]): Mapping of placeholder to file path or encoded content
+            chunk_size (int, optional): Bytes read per chunk, rounded down to a multiple of 3.
+                Defaults to CHUNK_SIZE.
+            dumps (Optional[Callable[[Any], bytes]], optional): Encodes the payload to json bytes,
+                e.g. JsonCodec().dumps. Defaults to None (json.dumps).
+        """
+        self.payload = payload
+        self.files = files
+        self.chunk_size = max(3, chunk_size - chunk_size % 3)
+        skeleton = dumps(payload) if dumps is not None else json.dumps(payload).encode("utf-8")
+        if files:
+            pattern = re.compile(b"(" + b"|".join(re.escape(key.encode("ascii")) for key in files) + b")")
+            self._parts: List[bytes] = pattern.split(skeleton)
+        else:
+            self._parts = [skeleton]
+        self._length = sum(
+            self.content_size(self.files[part.decode("ascii")])
+            if index % 2 else len(part) for index, part in enumerate(self._parts))
+
+    @classmethod
+    def placeholder(cls) -> str:
+        """Create a unique placeholder string for a file"""
+        return f"__aiman_file_{uuid.uuid4().hex}__"
+
+    @classmethod
+    def encoded_size(cls, size: int) -> int:
+        """Get the base64 length of a given amount of bytes
+
+        Args:
+            size (int): Amount of raw bytes
+
+        Returns:
+            int: Amount of base64 characters
+        """
+        return 4 * ((size + 2) // 3)
+
+    @classmethod
+    def content_size(cls, content: Union[str, bytearray]) -> int:
+        """Get the base64 length of a file path or of encoded content
+
+        Args:
+            content (Union[str, bytearray]): The file path or the encoded content
+
+        Returns:
+            int: Amount of base64 characters
+        """
+        return cls.encoded_size(os.path.getsize(content)) if isinstance(content, str) else len(content)
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __iter__(self) -> Iterator[bytes]:
+        for index, part in enumerate(self._parts):
+            if index % 2:
+                content = self.files[part.decode("ascii")]
+                if isinstance(content, str):
+                    yield from self.iter_file(content)
+                else:
+                    yield memoryview(content)
+            elif part:
+                yield part
+
+    def iter_file(self, file_path: str) -> Iterator[bytes]:
+        """Read and base64 encode a file chunk by chunk
+
+        Args:
+            file_path (str): The file to encode
+
+        Returns:
+            Iterator[bytes]: Base64 encoded chunks
+        """
+        with map_file(file_path) as content:
+            for start in range(0, len(content), self.chunk_size):
+                yield binascii.b2a_base64(content[start:start + self.chunk_size], newline=False)
+
+
+@contextmanager
+def map_file(file_path: str) -> Iterator[memoryview]:
+    """Provide a read only memoryview of a memory mapped file
+
+    The pages are loaded by the os on access and are not part of the heap, so reading
+    a file this way does not hold a copy of it. Empty files get an empty view.
+
+    Args:
+        file_path (str): The file to map
+
+    Returns:
+        Iterator[memoryview]: The content of the file
+    """
+    with open(file_path, "rb") as file:
+        # an empty file can not be mapped
+        mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) if os.fstat(file.fileno()).st_size else None
+        content = memoryview(mapped if mapped is not None else b"")
+        try:
+            yield content
+        finally:
+            content.release()
+            if mapped is not None:
+                mapped.close()
+
+
+def encode_base64(file_path: str, window: int = StreamingJsonBody.CHUNK_SIZE) -> bytearray:
+    """Base64 encode a file into a buffer of the exact encoded size
+
+    The file is memory mapped and encoded window by window, so besides the result
+    only a window of encoded bytes is allocated (instead of the file content, its
+    encoding and a str copy of it).
+
+    Args:
+        file_path (str): The file to encode
+        window (int, optional): Bytes encoded per step, rounded down to a multiple of 3.
+            Defaults to StreamingJsonBody.CHUNK_SIZE.
+
+    Returns:
+        bytearray: The base64 encoded content
+    """
+    window = max(3, window - window % 3)
+    with map_file(file_path) as content:
+        encoded = bytearray(StreamingJsonBody.encoded_size(len(content)))
+        position = 0
+        for start in range(0, len(content), window):
+            chunk = binascii.b2a_base64(content[start:start + window], newline=False)
+            encoded[position:position + len(chunk)] = chunk
+            position += len(chunk)
+    return encoded
+
+
+__all__ = [
+    "StreamingJsonBody",
+    "encode_base64",
+    "map_file"
+]
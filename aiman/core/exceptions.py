@@ -0,0 +1,53 @@
+"""Module providing the exceptions raised by the clients"""
+from typing import Optional
+
+
+class AimanError(RuntimeError):
+    """Represents an unsuccessful response of the AIMan API"""
+
+    def __init__(self, message: str, status_code: int = -1, retry_after: Optional[float] = None) -> None:
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+    @classmethod
+    def from_status(cls, status_code: int, message: str, retry_after: Optional[float] = None) -> "AimanError":
+        """Create the matching error type of a response status
+
+        Args:
+            status_code (int): The response status code
+            message (str): The error message
+            retry_after (Optional[float], optional): Seconds to wait as requested by the server. Defaults to None.
+
+        Returns:
+            AimanError: AuthError, RateLimitedError, ServerError or AimanError
+        """
+        if status_code in (401, 403):
+            error_type = AuthError
+        elif status_code == 429:
+            error_type = RateLimitedError
+        elif status_code >= 500:
+            error_type = ServerError
+        else:
+            error_type = AimanError
+        return error_type(message, status_code=status_code, retry_after=retry_after)
+
+
+class AuthError(AimanError):
+    """Represents a failed authentication or a missing permission (401, 403)"""
+
+
+class RateLimitedError(AimanError):
+    """Represents a rejected request because of too many requests (429)"""
+
+
+class ServerError(AimanError):
+    """Represents a server side failure (5xx)"""
+
+
+__all__ = [
+    "AimanError",
+    "AuthError",
+    "RateLimitedError",
+    "ServerError"
+]
@@ -0,0 +1,54 @@
+"""Module providing the file helpers of the stores shared between processes"""
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+from typing import Iterator
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+@contextmanager
+def locked_file(path: str) -> Iterator[None]:
+    """Hold an exclusive lock on path.lock
+
+    The lock requires fcntl (POSIX), elsewhere nothing is locked.
+
+    Args:
+        path (str): The file guarded by the lock
+    """
+    if fcntl is None:
+        yield
+        return
+    with open(f"{path}.lock", "a", encoding="utf-8") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def write_json(path: str, content: object) -> None:
+    """Replace a json file atomically, the new file is readable by its owner only
+
+    Args:
+        path (str): The json file
+        content (object): The json serializable content
+    """
+    directory, name = os.path.split(os.path.abspath(path))
+    descriptor, temporary = tempfile.mkstemp(prefix=f"{name}.", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(descriptor, "w", encoding="utf-8") as file:
+            json.dump(content, file)
+        os.replace(temporary, path)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+
+
+__all__ = [
+    "locked_file",
+    "write_json"
+]
@@ -0,0 +1,149 @@
+"""Module providing hedged requests, which cut the latency tail of prompts"""
+import math
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, List, Optional
+from aiman.core.cache import ResponseCache
+from aiman.core.classes import RequestType, Route
+
+
+@dataclass
+class HedgePolicy:
+    """Represents when a second identical prompt request is sent
+
+    If a prompt did not return after the percentile of the recent prompt latencies,
+    the same request is sent again and the first response wins. As the server may
+    process both, only prompts which give the same answer twice (temperature 0 and a
+    fixed seed, see ResponseCache.cacheable) are hedged. Until min_samples latencies
+    are known, initial_delay is used. budget limits the hedged share of the calls,
+    so a slow service is not flooded with duplicates.
+    """
+    percentile: float = 0.95
+    initial_delay: float = 1.0
+    min_delay: float = 0.01
+    max_delay: float = 30.0
+    min_samples: int = 20
+    window: int = 200
+    budget: float = 0.1
+
+    def applies(self, request_type: RequestType, route: str, options: Optional[dict]) -> bool:
+        """Check if a request may be hedged
+
+        Args:
+            request_type (RequestType): The request type
+            route (str): The api route
+            options (Optional[dict]): The prompt options of the payload
+
+        Returns:
+            bool: True for deterministic prompts and prompts on datasources
+        """
+        # the prefix of both prompt routes
+        return request_type == RequestType.POST and route.startswith(Route.PROMPT_WITH_DATASOURCE.value) \
+            and ResponseCache.cacheable(options)
+
+
+@dataclass
+class HedgeStats:
+    """Represents the outcome of the hedged calls of a client"""
+    calls: int = 0
+    hedged: int = 0
+    hedge_wins: int = 0
+    saved_seconds: float = 0.0
+
+
+class HedgeTracker:
+    """Keeps the recent latencies and the statistics of a HedgePolicy
+
+    saved_seconds adds up how much sooner a winning hedge returned than the request
+    it raced. If the loser ran to its end (with a session the sync client can not
+    abort requests of, see RequestHandle) the saving is measured, for an aborted or
+    cancelled loser it is estimated as its elapsed time minus the latency of the hedge.
+    """
+
+    def __init__(self, policy: HedgePolicy) -> None:
+        self.policy = policy
+        self._latencies: Deque[float] = deque(maxlen=policy.window)
+        self._stats = HedgeStats()
+        self._lock = threading.Lock()
+
+    def delay(self) -> Optional[float]:
+        """Start a call and get the seconds after which it is hedged
+
+        Returns:
+            Optional[float]: The delay or None if the budget is used up
+        """
+        with self._lock:
+            self._stats.calls += 1
+            if self._stats.hedged >= self.policy.budget * self._stats.calls:
+                return None
+            if len(self._latencies) < self.policy.min_samples:
+                return self.policy.initial_delay
+            latencies = sorted(self._latencies)
+            rank = min(len(latencies), max(1, math.ceil(self.policy.percentile * len(latencies))))
+            return min(self.policy.max_delay, max(self.policy.min_delay, latencies[rank - 1]))
+
+    def record(self, seconds: float) -> None:
+        """Add the latency of a finished request
+
+        Args:
+            seconds (float): The duration of the request
+        """
+        with self._lock:
+            self._latencies.append(seconds)
+
+    def hedged(self, hedge_won: bool) -> None:
+        """Count a call which sent a hedge
+
+        Args:
+            hedge_won (bool): If the hedge returned first
+        """
+        with self._lock:
+            self._stats.hedged += 1
+            self._stats.hedge_wins += int(hedge_won)
+
+    def saved(self, seconds: float) -> None:
+        """Add the time a winning hedge saved
+
+        Args:
+            seconds (float): How much later the losing request returned (or its estimate)
+        """
+        with self._lock:
+            self._stats.saved_seconds += max(0.0, seconds)
+
+    def stats(self) -> HedgeStats:
+        """Get a snapshot of the statistics
+
+        Returns:
+            HedgeStats: The statistics
+        """
+        with self._lock:
+            return HedgeStats(**vars(self._stats))
+
+
+def race_winner(done: List[Any], settled: bool) -> Optional[Any]:
+    """Pick the winner of a hedged call
+
+    Args:
+        done (List[Any]): The finished futures of the requests in the order they finished
+        settled (bool): If all requests finished
+
+    Returns:
+        Optional[Any]: The future of the first response below 500, None to wait for the
+            other request. Once all finished, the first response or the first error.
+    """
+    for future in done:
+        if future.exception() is None and future.result().status_code < 500:
+            return future
+    if not settled:
+        return None
+    responses = [future for future in done if future.exception() is None]
+    return responses[0] if responses else done[0]
+
+
+__all__ = [
+    "race_winner",
+    "HedgePolicy",
+    "HedgeStats",
+    "HedgeTracker"
+]
@@ -0,0 +1,190 @@
+"""Module providing the routing of requests across several AIMan API hosts"""
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Set
+from aiman.core.util import Util
+
+LEAST_OUTSTANDING = "least_outstanding"
+"""Send to the host with the fewest requests in flight, ties go to the faster host"""
+LATENCY_WEIGHTED = "latency_weighted"
+"""Send to the host with the lowest latency average weighted by its requests in flight"""
+
+
+@dataclass
+class HostStats:
+    """Represents the state of a host of a HostPool"""
+    url: str = ""
+    outstanding: int = 0
+    latency: Optional[float] = None
+    requests: int = 0
+    failures: int = 0
+    consecutive_failures: int = 0
+    ejections: int = 0
+    ejected_until: float = 0.0
+    probing: bool = False
+
+    @property
+    def ejected(self) -> bool:
+        """If the host is taken out of the rotation (it may still be probed)"""
+        return self.ejected_until > 0.0
+
+
+class HostPool:
+    """Represents a set of equivalent API hosts with passive health tracking
+
+    Every request goes to the best available host according to the strategy. A host
+    failing failure_threshold times in a row (connection errors and 5xx responses) is
+    ejected for eject_seconds. Afterwards a single request probes it: a success puts it
+    back into the rotation, a failure ejects it again. If all hosts are ejected, the
+    one whose ejection ends first is used anyway.
+    """
+
+    def __init__(self,
+                 hosts: Iterable[str],
+                 strategy: str = LEAST_OUTSTANDING,
+                 failure_threshold: int = 3,
+                 eject_seconds: float = 30.0,
+                 smoothing: float = 0.3) -> None:
+        """Instantiate a new host pool
+
+        Args:
+            hosts (Iterable[str]): The base urls of the hosts
+            strategy (str, optional): LEAST_OUTSTANDING or LATENCY_WEIGHTED. Defaults to LEAST_OUTSTANDING.
+            failure_threshold (int, optional): Failures in a row which eject a host. Defaults to 3.
+            eject_seconds (float, optional): Seconds until an ejected host is probed. Defaults to 30.
+            smoothing (float, optional): Weight of a new sample in the latency average. Defaults to 0.3.
+
+        Raises:
+            ValueError: If there is no host or the strategy is unknown
+        """
+        self.hosts: Dict[str, HostStats] = {}
+        for host in hosts:
+            url = Util.validate_url(host)
+            self.hosts[url] = HostStats(url=url)
+        if not self.hosts:
+            raise ValueError("A host pool needs at least one host")
+        if strategy not in (LEAST_OUTSTANDING, LATENCY_WEIGHTED):
+            raise ValueError(f"Unknown strategy: {strategy}")
+        self.strategy = strategy
+        self.failure_threshold = failure_threshold
+        self.eject_seconds = eject_seconds
+        self.smoothing = smoothing
+        self._lock = threading.Lock()
+        self._turn = 0
+
+    @property
+    def urls(self) -> List[str]:
+        """The base urls of all hosts"""
+        return list(self.hosts)
+
+    def choose(self, exclude: Optional[Set[str]] = None) -> str:
+        """Pick the host of the next request and count it as outstanding
+
+        Args:
+            exclude (Optional[Set[str]], optional): Hosts which failed this call already, used only
+                if no other host is left. Defaults to None.
+
+        Returns:
+            str: The base url of the host, pass it to finish() once the request is done
+        """
+        with self._lock:
+            now = time.monotonic()
+            candidates = [host for host in self.hosts.values() if not exclude or host.url not in exclude]
+            available = [host for host in candidates or self.hosts.values() if self._available(host, now)]
+            if available:
+                # rotate the start, so ties are spread over the hosts
+                self._turn += 1
+                start = self._turn % len(available)
+                host = min(available[start:] + available[:start], key=self._score)
+                if host.ejected:
+                    host.probing = True
+            else:
+                host = min(self.hosts.values(), key=lambda stats: stats.ejected_until)
+            host.outstanding += 1
+            host.requests += 1
+            return host.url
+
+    def finish(self, url: str, seconds: float, failed: bool) -> None:
+        """Record the outcome of a request
+
+        Args:
+            url (str): The host returned by choose()
+            seconds (float): The duration of the request
+            failed (bool): If the request failed with a connection error or a 5xx response
+        """
+        with self._lock:
+            host = self.hosts[url]
+            host.outstanding -= 1
+            host.probing = False
+            if failed:
+                host.failures += 1
+                host.consecutive_failures += 1
+                if host.ejected or host.consecutive_failures >= self.failure_threshold:
+                    host.ejections += 1
+                    host.ejected_until = time.monotonic() + self.eject_seconds
+                return
+            host.consecutive_failures = 0
+            host.ejected_until = 0.0
+            host.latency = seconds if host.latency is None else (
+                self.smoothing * seconds + (1 - self.smoothing) * host.latency)
+
+    def stats(self) -> List[HostStats]:
+        """Get a snapshot of the state of all hosts
+
+        Returns:
+            List[HostStats]: The hosts
+        """
+        with self._lock:
+            return [HostStats(**vars(host)) for host in self.hosts.values()]
+
+    @staticmethod
+    def _available(host: HostStats, now: float) -> bool:
+        return not host.ejected or (host.ejected_until <= now and not host.probing)
+
+    def _score(self, host: HostStats) -> tuple:
+        latency = host.latency if host.latency is not None else 0.0
+        if self.strategy == LATENCY_WEIGHTED:
+            return (latency * (host.outstanding + 1),)
+        return (host.outstanding, latency)
+
+
+class HostAttempt:
+    """Context manager routing one attempt of a request to a host of the pool
+
+    host is None without a pool. Set status_code once the response arrived, an
+    exception or a 5xx status counts as a failure of the host, which is then
+    excluded from the following attempts of the same call.
+    """
+
+    def __init__(self, pool: Optional[HostPool], tried: Optional[Set[str]] = None) -> None:
+        self.pool = pool
+        self.tried = tried if tried is not None else set()
+        self.host: Optional[str] = None
+        self.status_code: Optional[int] = None
+        self._started = 0.0
+
+    def __enter__(self) -> "HostAttempt":
+        if self.pool is not None:
+            self.host = self.pool.choose(self.tried)
+            self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if self.host is None:
+            return
+        # a cancelled or interrupted request says nothing about the health of the host
+        failed = (exc_type is not None and issubclass(exc_type, Exception)) or (
+            self.status_code is not None and self.status_code >= 500)
+        self.pool.finish(self.host, time.perf_counter() - self._started, failed)
+        if failed:
+            self.tried.add(self.host)
+
+
+__all__ = [
+    "LATENCY_WEIGHTED",
+    "LEAST_OUTSTANDING",
+    "HostAttempt",
+    "HostPool",
+    "HostStats"
+]
@@ -0,0 +1,274 @@
+"""Module providing timing and metrics hooks of the clients"""
+import importlib
+import re
+import time
+from dataclasses import dataclass, field
+from types import ModuleType
+from typing import Dict, List, Optional, Tuple
+
+_ROUTE_IDS = (
+    (re.compile(r"^(/api/v1/prompts/)\d+$"), r"\1{model_tag_id}"),
+    (re.compile(r"/\d+(?=/|$)"), "/{id}"),
+)
+
+
+@dataclass
+class RequestEvent:
+    """Represents the timings of a single client call
+
+    phases holds (name, offset, seconds) tuples relative to started; a phase
+    occurring in several attempts is listed once per attempt. Known phases are
+    token (getting or refreshing the access token), encode (json encoding and
+    compression of the body), ttfb (sending until the response headers arrived),
+    download (reading the response body), send (ttfb and download where they can
+    not be told apart), backoff (waiting between retries) and decode (parsing the
+    json response).
+    """
+    method: str = ""
+    route: str = ""
+    status_code: int = 0
+    attempts: int = 0
+    request_bytes: int = 0
+    response_bytes: int = 0
+    error: Optional[BaseException] = None
+    started: float = 0.0
+    started_ns: int = 0
+    duration: float = 0.0
+    phases: List[Tuple[str, float, float]] = field(default_factory=list)
+
+    @classmethod
+    def start(cls, method: str, route: str) -> "RequestEvent":
+        """Create an event starting now"""
+        return cls(method=method, route=route, started=time.perf_counter(), started_ns=time.time_ns())
+
+    @property
+    def route_template(self) -> str:
+        """The route with ids replaced by placeholders, a label of bounded cardinality"""
+        route = self.route
+        for pattern, replacement in _ROUTE_IDS:
+            route = pattern.sub(replacement, route)
+        return route
+
+    @property
+    def model_tag_id(self) -> Optional[int]:
+        """The model tag id of a prompt route or None"""
+        match = _ROUTE_IDS[0][0].match(self.route)
+        return int(self.route.rsplit("/", 1)[1]) if match else None
+
+    def phase(self, name: str, started: float, ended: Optional[float] = None) -> float:
+        """Add a phase which started at the given perf_counter() time
+
+        Args:
+            name (str): The phase name
+            started (float): perf_counter() at the start of the phase
+            ended (Optional[float], optional): perf_counter() at the end, None for now. Defaults to None.
+
+        Returns:
+            float: The end time, usable as start of the next phase
+        """
+        ended = time.perf_counter() if ended is None else ended
+        self.phases.append((name, started - self.started, ended - started))
+        return ended
+
+    def seconds(self, name: str) -> float:
+        """Get the total seconds of a phase over all attempts"""
+        return sum(phase[2] for phase in self.phases if phase[0] == name)
+
+    def child(self) -> "RequestEvent":
+        """Create the event of a concurrent request of this call, e.g. a hedge, timed relative to this one"""
+        return RequestEvent(method=self.method, route=self.route, started=self.started, started_ns=self.started_ns)
+
+    def merge(self, children: List["RequestEvent"]) -> None:
+        """Add the attempts, request bytes and phases of the concurrent requests of this call
+
+        Args:
+            children (List[RequestEvent]): The events created with child(), one per request sent
+        """
+        for child in children:
+            self.attempts += child.attempts
+            self.request_bytes += child.request_bytes
+            # a request still running in another thread may append further phases
+            self.phases.extend(list(child.phases))
+        self.phases.sort(key=lambda phase: phase[1])
+
+    def finish(self, error: Optional[BaseException] = None) -> "RequestEvent":
+        """Set the outcome and the total duration"""
+        self.status_code = self.status_code or getattr(error, "status_code", 0) or 0
+        self.error = error
+        self.duration = time.perf_counter() - self.started
+        return self
+
+
+class RequestScope:
+    """Context manager passing the event of a call to the observer once the call finished"""
+
+    def __init__(self, observer: "Observer", event: RequestEvent) -> None:
+        self.observer = observer
+        self.event = event
+
+    def __enter__(self) -> RequestEvent:
+        return self.event
+
+    def __exit__(self, error_type, error, traceback) -> bool:
+        self.observer.request_finished(self.event.finish(error))
+        return False
+
+
+class Observer:
+    """Receives the timings of the client calls
+
+    Subclass and override the methods of interest. The clients only measure
+    while an observer is set, without one instrumentation costs a None check.
+    """
+
+    def request_finished(self, event: RequestEvent) -> None:
+        """Called once per call after the response was parsed or the call failed
+
+        Args:
+            event (RequestEvent): The timings and labels of the call
+        """
+
+    def operation_finished(self, name: str, seconds: float, labels: Dict[str, str]) -> None:
+        """Called after a client side operation outside of a request, e.g. encode_attachments
+
+        Args:
+            name (str): The operation name
+            seconds (float): The duration
+            labels (Dict[str, str]): Additional labels
+        """
+
+
+class MultiObserver(Observer):
+    """Passes the events to several observers"""
+
+    def __init__(self, *observers: Observer) -> None:
+        self.observers = observers
+
+    def request_finished(self, event: RequestEvent) -> None:
+        for observer in self.observers:
+            observer.request_finished(event)
+
+    def operation_finished(self, name: str, seconds: float, labels: Dict[str, str]) -> None:
+        for observer in self.observers:
+            observer.operation_finished(name, seconds, labels)
+
+
+def _optional_module(name: str) -> Optional[ModuleType]:
+    """Warning. This method is private and should not be called manually
+       Imports an optional dependency when an observer is created, None if it is not installed
+    """
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        return None
+
+
+class PrometheusObserver(Observer):
+    """Records the calls as Prometheus counters and histograms
+
+    Metrics (with the default namespace):
+        aiman_requests_total{method, route, status, model_tag_id}
+        aiman_request_duration_seconds{method, route, model_tag_id}
+        aiman_request_phase_seconds{method, route, phase}
+        aiman_request_retries_total{method, route}
+        aiman_request_body_bytes_total{method, route}
+        aiman_operation_duration_seconds{operation}
+    """
+
+    def __init__(self, registry: "prometheus_client.CollectorRegistry" = None, namespace: str = "aiman") -> None:
+        """Instantiate a new Prometheus observer
+
+        Args:
+            registry (prometheus_client.CollectorRegistry, optional): The registry. Defaults to the global REGISTRY.
+            namespace (str, optional): The metric name prefix. Defaults to "aiman".
+
+        Raises:
+            ImportError: If prometheus_client is not installed
+        """
+        prometheus_client = _optional_module("prometheus_client")
+        if prometheus_client is None:
+            raise ImportError("The Prometheus observer requires prometheus_client: pip install prometheus-client")
+        registry = registry if registry is not None else prometheus_client.REGISTRY
+        options = {"namespace": namespace, "registry": registry}
+        self.requests = prometheus_client.Counter(
+            "requests", "Client calls", ["method", "route", "status", "model_tag_id"], **options)
+        self.duration = prometheus_client.Histogram(
+            "request_duration_seconds", "Duration of client calls", ["method", "route", "model_tag_id"], **options)
+        self.phases = prometheus_client.Histogram(
+            "request_phase_seconds", "Duration of the phases of client calls", ["method", "route", "phase"], **options)
+        self.retries = prometheus_client.Counter(
+            "request_retries", "Repeated requests", ["method", "route"], **options)
+        self.body_bytes = prometheus_client.Counter(
+            "request_body_bytes", "Request body bytes on the wire", ["method", "route"], **options)
+        self.operations = prometheus_client.Histogram(
+            "operation_duration_seconds", "Duration of client side operations", ["operation"], **options)
+
+    def request_finished(self, event: RequestEvent) -> None:
+        route = event.route_template
+        model_tag_id = str(event.model_tag_id or "")
+        self.requests.labels(event.method, route, str(event.status_code), model_tag_id).inc()
+        self.duration.labels(event.method, route, model_tag_id).observe(event.duration)
+        for name, _, seconds in event.phases:
+            self.phases.labels(event.method, route, name).observe(seconds)
+        if event.attempts > 1:
+            self.retries.labels(event.method, route).inc(event.attempts - 1)
+        if event.request_bytes:
+            self.body_bytes.labels(event.method, route).inc(event.request_bytes)
+
+    def operation_finished(self, name: str, seconds: float, labels: Dict[str, str]) -> None:
+        self.operations.labels(name).observe(seconds)
+
+
+class OpenTelemetryObserver(Observer):
+    """Records every call as an OpenTelemetry span with a child span per phase"""
+
+    def __init__(self, tracer: "opentelemetry.trace.Tracer" = None) -> None:
+        """Instantiate a new OpenTelemetry observer
+
+        Args:
+            tracer (opentelemetry.trace.Tracer, optional): The tracer. Defaults to the tracer "aiman".
+
+        Raises:
+            ImportError: If opentelemetry-api is not installed
+        """
+        self._trace = _optional_module("opentelemetry.trace")
+        if self._trace is None:
+            raise ImportError("The OpenTelemetry observer requires opentelemetry-api: pip install opentelemetry-api")
+        self.tracer = tracer if tracer is not None else self._trace.get_tracer("aiman")
+
+    def request_finished(self, event: RequestEvent) -> None:
+        attributes = {
+            "http.request.method": event.method,
+            "http.route": event.route_template,
+            "http.response.status_code": event.status_code,
+            "aiman.attempts": event.attempts,
+            "aiman.request_bytes": event.request_bytes,
+        }
+        if event.model_tag_id is not None:
+            attributes["aiman.model_tag_id"] = event.model_tag_id
+        span = self.tracer.start_span(
+            f"{event.method} {event.route_template}", start_time=event.started_ns, attributes=attributes)
+        context = self._trace.set_span_in_context(span)
+        for name, offset, seconds in event.phases:
+            start = event.started_ns + int(offset * 1e9)
+            child = self.tracer.start_span(name, context=context, start_time=start)
+            child.end(end_time=start + int(seconds * 1e9))
+        if event.error is not None:
+            span.record_exception(event.error)
+            span.set_status(self._trace.Status(self._trace.StatusCode.ERROR, str(event.error)))
+        span.end(end_time=event.started_ns + int(event.duration * 1e9))
+
+    def operation_finished(self, name: str, seconds: float, labels: Dict[str, str]) -> None:
+        end = time.time_ns()
+        span = self.tracer.start_span(name, start_time=end - int(seconds * 1e9), attributes=labels)
+        span.end(end_time=end)
+
+
+__all__ = [
+    "MultiObserver",
+    "Observer",
+    "OpenTelemetryObserver",
+    "PrometheusObserver",
+    "RequestEvent",
+    "RequestScope"
+]
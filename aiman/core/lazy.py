@@ -0,0 +1,30 @@
+"""Module providing lazily imported package exports"""
+import importlib
+import sys
+from typing import Any, Callable, Dict
+
+
+def lazy_exports(package: str, modules: Dict[str, str]) -> Callable[[str], Any]:
+    """Build the module __getattr__ of a package which imports its exports on first access
+
+    Args:
+        package (str): The name of the package
+        modules (Dict[str, str]): The (relative) module of each exported name
+
+    Returns:
+        Callable[[str], Any]: The __getattr__ function, an export is cached in the package once loaded
+    """
+    def __getattr__(name: str) -> Any:
+        module = modules.get(name)
+        if module is None:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(module, package), name)
+        setattr(sys.modules[package], name, value)
+        return value
+
+    return __getattr__
+
+
+__all__ = [
+    "lazy_exports"
+]
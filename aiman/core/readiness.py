@@ -0,0 +1,140 @@
+"""Module providing the tracking of datasources until they are ready for prompting"""
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+from aiman.core.classes import DataSource
+
+READY = 2
+"""Status of a datasource which is indexed and ready for prompting"""
+
+
+class ReadinessTracker:
+    """Represents the datasources a client waits for
+
+    All pending datasources are checked with one listing request per poll. The poll
+    interval starts at poll_interval and grows by multiplier up to max_poll_interval
+    while nothing changes; it starts over as soon as any status changed, since
+    datasources of one upload tend to finish close to each other.
+    """
+
+    def __init__(self,
+                 datasource_ids: Union[int, Iterable[int]],
+                 timeout: Optional[float] = 600.0,
+                 poll_interval: float = 1.0,
+                 max_poll_interval: float = 30.0,
+                 multiplier: float = 1.5) -> None:
+        """Instantiate a new tracker
+
+        Args:
+            datasource_ids (Union[int, Iterable[int]]): The datasource id(s)
+            timeout (Optional[float], optional): Seconds until TimeoutError, None to wait forever. Defaults to 600.
+            poll_interval (float, optional): Seconds between the first polls. Defaults to 1.
+            max_poll_interval (float, optional): Upper bound of the poll interval. Defaults to 30.
+            multiplier (float, optional): Growth of the interval per unchanged poll. Defaults to 1.5.
+        """
+        ids = [datasource_ids] if isinstance(datasource_ids, int) else list(datasource_ids)
+        self.statuses: Dict[int, int] = dict.fromkeys(ids, -1)
+        self.deadline = time.monotonic() + timeout if timeout is not None else None
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.multiplier = multiplier
+        self.interval = poll_interval
+        self.polls = 0
+        self._changed = False
+
+    @property
+    def pending(self) -> List[int]:
+        """The ids of the datasources which are not ready yet"""
+        return list(self.statuses)
+
+    def update(self, summaries: List[dict]) -> Tuple[List[DataSource], List[int]]:
+        """Take the statuses of a datasource listing
+
+        Args:
+            summaries (List[dict]): The entries of the datasource listing
+
+        Returns:
+            Tuple[List[DataSource], List[int]]: The datasources which became ready and the pending
+                ids the listing holds no status of (to be fetched one by one)
+        """
+        self.polls += 1
+        by_id = {summary.get("id"): summary for summary in summaries}
+        ready, unknown = [], []
+        for datasource_id in self.pending:
+            summary = by_id.get(datasource_id)
+            if summary is None or summary.get("status") is None:
+                unknown.append(datasource_id)
+                continue
+            datasource = self.record(datasource_id, DataSource().from_dict(summary))
+            if datasource is not None:
+                ready.append(datasource)
+        return ready, unknown
+
+    def record(self, datasource_id: int, datasource: Optional[DataSource]) -> Optional[DataSource]:
+        """Take the status of a single datasource
+
+        Args:
+            datasource_id (int): The datasource id
+            datasource (Optional[DataSource]): The datasource, None if it does not exist
+
+        Raises:
+            ValueError: If the datasource does not exist
+
+        Returns:
+            Optional[DataSource]: The datasource if it became ready
+        """
+        if datasource is None:
+            raise ValueError(f"Datasource {datasource_id} does not exist")
+        if datasource.status != self.statuses[datasource_id]:
+            self._changed = True
+        if datasource.status == READY:
+            del self.statuses[datasource_id]
+            return datasource
+        self.statuses[datasource_id] = datasource.status
+        return None
+
+    def next_delay(self) -> float:
+        """Get the seconds until the next poll
+
+        Raises:
+            TimeoutError: If the timeout passed
+
+        Returns:
+            float: The delay
+        """
+        if self._changed:
+            self.interval = self.poll_interval
+        delay = self.interval
+        self.interval = min(self.max_poll_interval, self.interval * self.multiplier)
+        self._changed = False
+        if self.deadline is not None:
+            remaining = self.deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(f"Datasources not ready in time: {self.pending} (statuses {self.statuses})")
+            delay = min(delay, remaining)
+        return delay
+
+
+def settle(futures: Dict[int, Any], datasource: Optional[DataSource] = None,
+           error: Optional[BaseException] = None) -> None:
+    """Resolve the future of a ready datasource or fail all pending futures with the error
+
+    Args:
+        futures (Dict[int, Any]): The concurrent.futures or asyncio futures by datasource id
+        datasource (Optional[DataSource], optional): The ready datasource. Defaults to None.
+        error (Optional[BaseException], optional): The error of the polling. Defaults to None.
+    """
+    if datasource is not None:
+        future = futures.get(datasource.id)
+        if future is not None and not future.done():
+            future.set_result(datasource)
+        return
+    for future in futures.values():
+        if not future.done():
+            future.set_exception(error)
+
+
+__all__ = [
+    "READY",
+    "ReadinessTracker",
+    "settle"
+]
@@ -0,0 +1,93 @@
+"""Module providing retry policies for transient failures"""
+import random
+import time
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+from typing import FrozenSet, Optional
+from aiman.core.classes import RequestType, Route
+
+
+@dataclass
+class RetryPolicy:
+    """Represents when and how often a failed request is sent again
+
+    Idempotent requests (GET, PUT and DELETE) are retried on connection errors and
+    on the configured status codes. Prompts are only retried with retry_prompts.
+    The delay grows exponentially with full jitter, a Retry-After header of the
+    server is honored. deadline limits the total time spent on one call.
+    """
+    max_attempts: int = 3
+    backoff_factor: float = 0.5
+    max_backoff: float = 30.0
+    retry_statuses: FrozenSet[int] = field(default_factory=lambda: frozenset({429, 502, 503, 504}))
+    retry_methods: FrozenSet[RequestType] = field(
+        default_factory=lambda: frozenset({RequestType.GET, RequestType.PUT, RequestType.DELETE}))
+    retry_prompts: bool = False
+    respect_retry_after: bool = True
+    deadline: Optional[float] = None
+
+    @classmethod
+    def disabled(cls) -> "RetryPolicy":
+        """A policy which never retries"""
+        return cls(max_attempts=1)
+
+    def allows(self, request_type: RequestType, route: str) -> bool:
+        """Check if a request may be sent more than once
+
+        Args:
+            request_type (RequestType): The request type
+            route (str): The api route
+
+        Returns:
+            bool: retryable or not
+        """
+        if self.max_attempts <= 1:
+            return False
+        if request_type in self.retry_methods:
+            return True
+        return self.retry_prompts and request_type == RequestType.POST \
+            and route.startswith(Route.PROMPT_WITH_DATASOURCE.value)
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Get the delay before the next attempt
+
+        Args:
+            attempt (int): The number of the failed attempt (starting at 1)
+            retry_after (Optional[float], optional): Seconds requested by the server. Defaults to None.
+
+        Returns:
+            float: Delay in seconds
+        """
+        if retry_after is not None and self.respect_retry_after:
+            return max(0.0, retry_after)
+        return random.uniform(0, min(self.max_backoff, self.backoff_factor * (2 ** (attempt - 1))))
+
+    def deadline_from(self, started: float) -> Optional[float]:
+        """Get the monotonic time at which no further attempt is started"""
+        return None if self.deadline is None else started + self.deadline
+
+    @classmethod
+    def parse_retry_after(cls, value: Optional[str]) -> Optional[float]:
+        """Parse a Retry-After header (seconds or http date)
+
+        Args:
+            value (Optional[str]): The header value
+
+        Returns:
+            Optional[float]: Seconds to wait or None
+        """
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+
+__all__ = [
+    "RetryPolicy"
+]
@@ -0,0 +1,183 @@
+"""Module providing pooled keep-alive HTTP sessions"""
+import socket
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Optional, Union
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.retry import Retry
+
+_in_flight = threading.local()
+
+
+class RequestHandle:
+    """Represents a request of one thread which another thread may abort
+
+    Entered on the thread which sends the request. The pooled connection the request
+    is sent on is known to the handle until the handle is left or the connection sends
+    the request of another handle, abort() shuts its socket down and the blocked send
+    fails with a ConnectionError at once. Only the sessions of SessionOptions track
+    their connections: with other sessions (or a proxy) abort() marks the handle only
+    and the request runs to its end.
+    """
+
+    def __init__(self, on_dispatch: Optional[Callable[[], Any]] = None) -> None:
+        self.aborted = False
+        self._on_dispatch = on_dispatch
+        self._connection = None
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "RequestHandle":
+        _in_flight.handle = self
+        return self
+
+    def __exit__(self, *args) -> None:
+        _in_flight.handle = None
+        with self._lock:
+            self._connection = None
+
+    @staticmethod
+    def current() -> Optional["RequestHandle"]:
+        """Get the handle entered on the calling thread
+
+        Returns:
+            Optional[RequestHandle]: The handle or None
+        """
+        return getattr(_in_flight, "handle", None)
+
+    def dispatched(self) -> None:
+        """Call on_dispatch once, when the request is handed to the session"""
+        callback, self._on_dispatch = self._on_dispatch, None
+        if callback is not None:
+            callback()
+
+    def abort(self) -> None:
+        """Stop the request, a connection in use is shut down"""
+        with self._lock:
+            self.aborted = True
+            _shutdown(self._connection)
+
+    def attach(self, connection) -> None:
+        """Warning. This method is private and should not be called manually"""
+        with self._lock:
+            self._connection = connection
+            if self.aborted:
+                _shutdown(connection)
+
+    def release(self, connection) -> bool:
+        """Warning. This method is private and should not be called manually
+
+        Returns:
+            bool: If the connection was shut down by abort() and must not be reused
+        """
+        with self._lock:
+            if self._connection is connection:
+                self._connection = None
+            return self.aborted
+
+
+def _shutdown(connection) -> None:
+    """Shut the socket of a connection down, which wakes a thread blocked on it"""
+    sock = getattr(connection, "sock", None)
+    if sock is not None:
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+
+def _track(connection) -> None:
+    """Hand a connection over from the handle of its last request to the handle of the calling thread
+
+    A connection still known to an aborted handle may have been shut down after it went
+    back to the pool, it is closed and reconnects when the request is sent.
+    """
+    previous = getattr(connection, "aiman_handle", None)
+    if previous is not None and previous.release(connection):
+        connection.close()
+    connection.aiman_handle = RequestHandle.current()
+    if connection.aiman_handle is not None:
+        connection.aiman_handle.attach(connection)
+
+
+class _TrackedHTTPConnection(HTTPConnection):
+    """HTTP connection which tells the RequestHandle of the thread that it sends its request"""
+
+    def request(self, *args, **kwargs):
+        _track(self)
+        return super().request(*args, **kwargs)
+
+
+class _TrackedHTTPSConnection(HTTPSConnection):
+    """HTTPS connection which tells the RequestHandle of the thread that it sends its request"""
+
+    def request(self, *args, **kwargs):
+        _track(self)
+        # urllib3 binds HTTPSConnection to a dummy class without ssl, its request is the one of HTTPConnection
+        return HTTPConnection.request(self, *args, **kwargs)
+
+
+class _TrackedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TrackedHTTPConnection
+
+
+class _TrackedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TrackedHTTPSConnection
+
+
+class _PooledAdapter(HTTPAdapter):
+    """Transport adapter whose connections can be aborted by a RequestHandle"""
+
+    def init_poolmanager(self, *args, **kwargs) -> None:
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _TrackedHTTPConnectionPool,
+            "https": _TrackedHTTPSConnectionPool
+        }
+
+
+@dataclass
+class SessionOptions:
+    """Represents the connection pool settings of a client session
+
+    A single session keeps TCP/TLS connections alive between calls and is safe to
+    share between threads: every thread borrows a connection from the pool and
+    returns it once the response was read. max_retries are the urllib3 retries of
+    the adapter, a client accepts them only if its RetryPolicy is disabled.
+    """
+    pool_connections: int = 10
+    pool_maxsize: int = 10
+    max_retries: Union[int, Retry] = 0
+    pool_block: bool = False
+
+    def create_adapter(self) -> HTTPAdapter:
+        """Create a transport adapter with the configured pool settings
+
+        Returns:
+            HTTPAdapter: The transport adapter
+        """
+        return _PooledAdapter(
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            max_retries=self.max_retries,
+            pool_block=self.pool_block)
+
+    def create_session(self) -> requests.Session:
+        """Create a new pooled keep-alive session
+
+        Returns:
+            requests.Session: Session with pooled adapters mounted for http and https
+        """
+        session = requests.Session()
+        adapter = self.create_adapter()
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+
+__all__ = [
+    "RequestHandle",
+    "SessionOptions"
+]
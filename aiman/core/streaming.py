@@ -0,0 +1,116 @@
+"""Module providing the decoding of streamed prompt responses"""
+import codecs
+import json
+from typing import Any, Callable, List, Optional
+
+
+class StreamDecoder:
+    """Decodes a streamed prompt response into text deltas
+
+    Supports newline delimited json, server-sent events (``data: {...}``) and plain
+    text bodies. Chunks may end anywhere, incomplete lines are buffered until the
+    next chunk arrives.
+    """
+
+    TEXT_KEYS = ("responseText", "response", "delta", "content", "text", "token")
+
+    def __init__(self, content_type: Optional[str] = None, loads: Optional[Callable[[str], Any]] = None) -> None:
+        """Instantiate a new decoder
+
+        Args:
+            content_type (str, optional): The Content-Type header of the response. Defaults to None.
+            loads (Callable[[str], Any], optional): Decodes a json event, e.g. JsonCodec().loads.
+                Defaults to None (json.loads).
+        """
+        self.loads = loads if loads is not None else json.loads
+        self.plain_text = content_type is not None and content_type.lower().startswith("text/plain")
+        self.last_event: Any = None
+        self._buffer = b""
+        self._text_decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+    def feed(self, chunk: bytes) -> List[str]:
+        """Decode a received chunk
+
+        Args:
+            chunk (bytes): The received bytes
+
+        Returns:
+            List[str]: The text deltas of all completed lines
+        """
+        if self.plain_text:
+            return self._decode_plain(chunk)
+        self._buffer += chunk
+        *lines, self._buffer = self._buffer.split(b"\n")
+        return self._decode_lines(lines)
+
+    def flush(self) -> List[str]:
+        """Decode the remaining buffered bytes once the response was read completely
+
+        Returns:
+            List[str]: The remaining text deltas
+        """
+        if self.plain_text:
+            return self._decode_plain(b"", final=True)
+        lines, self._buffer = [self._buffer], b""
+        return self._decode_lines(lines)
+
+    def _decode_plain(self, chunk: bytes, final: bool = False) -> List[str]:
+        text = self._text_decoder.decode(chunk, final=final)
+        return [text] if text else []
+
+    def _decode_lines(self, lines: List[bytes]) -> List[str]:
+        deltas = []
+        for raw_line in lines:
+            line = raw_line.decode("utf-8").rstrip("\r")
+            if not line.strip() or line.startswith(":"):
+                continue
+            if line.startswith(("event:", "id:", "retry:")):
+                continue
+            if line.startswith("data:"):
+                line = line[6:] if line.startswith("data: ") else line[5:]
+                if line.strip() == "[DONE]":
+                    continue
+            try:
+                event = self.loads(line)
+            except ValueError:
+                deltas.append(line)
+                continue
+            self.last_event = event
+            text = self.extract_text(event)
+            if text:
+                deltas.append(text)
+        return deltas
+
+    @classmethod
+    def extract_text(cls, event: Any) -> Optional[str]:
+        """Extract the text delta of a single stream event
+
+        Args:
+            event (Any): The decoded json event
+
+        Returns:
+            Optional[str]: The text delta or None
+        """
+        if isinstance(event, str):
+            return event
+        if not isinstance(event, dict):
+            return None
+        if isinstance(event.get("messageContent"), dict):
+            return cls.extract_text(event["messageContent"].get("data"))
+        for key in cls.TEXT_KEYS:
+            value = event.get(key)
+            if isinstance(value, str):
+                return value
+            if isinstance(value, dict):
+                return cls.extract_text(value)
+        if isinstance(event.get("message"), dict):
+            return cls.extract_text(event["message"])
+        choices = event.get("choices")
+        if isinstance(choices, list) and choices:
+            return cls.extract_text(choices[0])
+        return None
+
+
+__all__ = [
+    "StreamDecoder"
+]
@@ -0,0 +1,352 @@
+"""Module providing client side request throttling"""
+import asyncio
+import json
+import os
+import threading
+import time
+import weakref
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, Callable, Dict, Iterator, List, Optional
+from aiman.core.classes import Route
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+class RateLimiter:
+    """Represents a thread-safe limiter which spaces requests evenly over time"""
+
+    def __init__(self, requests_per_second: float) -> None:
+        """Instantiate a new rate limiter
+
+        Args:
+            requests_per_second (float): Maximum amount of requests per second
+
+        Raises:
+            ValueError: If requests_per_second is not positive
+        """
+        if requests_per_second <= 0:
+            raise ValueError("requests_per_second needs to be greater than 0")
+        self.interval = 1.0 / requests_per_second
+        self._next_slot = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Block until the next request is allowed to be sent
+
+        Returns:
+            float: The time in seconds the caller waited
+        """
+        with self._lock:
+            now = time.monotonic()
+            slot = max(self._next_slot, now)
+            self._next_slot = slot + self.interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+
+BucketState = List[float]
+"""[tokens, updated, factor] of a token bucket"""
+
+
+def route_group(route: str) -> str:
+    """Get the group of an api route: prompts, datasources, models or default
+
+    Args:
+        route (str): The api route
+
+    Returns:
+        str: The group name
+    """
+    if route.startswith(Route.PROMPT_WITH_DATASOURCE.value):
+        return "prompts"
+    if route.startswith(Route.DATA_SOURCE.value):
+        return "datasources"
+    if route.startswith(Route.GET_MODELS.value):
+        return "models"
+    return "default"
+
+
+@dataclass
+class RateLimit:
+    """Represents the limits of a route group
+
+    rate is the sustained amount of requests per second, burst the amount which may be
+    sent at once after a pause (defaults to rate, at least 1). max_in_flight limits the
+    concurrent requests of the group within the process, None for no limit.
+    """
+    rate: Optional[float] = None
+    burst: Optional[float] = None
+    max_in_flight: Optional[int] = None
+
+    @property
+    def capacity(self) -> float:
+        """The size of the token bucket"""
+        return self.burst if self.burst is not None else max(self.rate or 0.0, 1.0)
+
+
+class LocalBucketBackend:
+    """Keeps the token buckets in memory, shared by the threads of a process"""
+
+    def __init__(self) -> None:
+        self._states: Dict[str, BucketState] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def clock() -> float:
+        """The time the buckets are refilled by"""
+        return time.monotonic()
+
+    def update(self, key: str, change: Callable[[Optional[BucketState]], BucketState]) -> BucketState:
+        """Replace the state of a bucket atomically
+
+        Args:
+            key (str): The bucket name
+            change (Callable[[Optional[BucketState]], BucketState]): Gets the current state (None if new)
+                and returns the new one
+
+        Returns:
+            BucketState: The new state
+        """
+        with self._lock:
+            state = self._states[key] = change(self._states.get(key))
+            return state
+
+
+class FileBucketBackend(LocalBucketBackend):
+    """Keeps the token buckets in a json file guarded by an exclusive file lock
+
+    All processes on a host using the same path share the buckets and with them
+    one global quota. Requires fcntl (POSIX).
+    """
+
+    def __init__(self, path: str) -> None:
+        """Instantiate a new file backend
+
+        Args:
+            path (str): The state file, created if missing
+
+        Raises:
+            RuntimeError: If file locks are not supported on this platform
+        """
+        if fcntl is None:
+            raise RuntimeError("The file bucket backend requires fcntl (POSIX)")
+        super().__init__()
+        self.path = path
+
+    @staticmethod
+    def clock() -> float:
+        # the wall clock is the one clock all processes agree on
+        return time.time()
+
+    def update(self, key: str, change: Callable[[Optional[BucketState]], BucketState]) -> BucketState:
+        with self._lock, open(self.path, "a+", encoding="utf-8") as file:
+            fcntl.flock(file, fcntl.LOCK_EX)
+            try:
+                file.seek(0)
+                content = file.read()
+                states = json.loads(content) if content else {}
+                state = states[key] = change(states.get(key))
+                file.seek(0)
+                file.truncate()
+                file.write(json.dumps(states))
+                file.flush()
+                os.fsync(file.fileno())
+                return state
+            finally:
+                fcntl.flock(file, fcntl.LOCK_UN)
+
+
+class RouteLimiter:
+    """Represents a token bucket rate limiter with a concurrency limit per route group
+
+    Requests take a token from the bucket of their group (prompts, datasources,
+    models or default) and wait while it is empty. A 429 halves the rate of the
+    group (down to min_factor) and empties the bucket for Retry-After seconds,
+    every successful request raises it again by recovery of the configured rate
+    (additive increase, multiplicative decrease). With a FileBucketBackend the
+    buckets are shared by all processes using the same file; max_in_flight always
+    applies per process.
+    """
+
+    def __init__(self,
+                 limits: Optional[Dict[str, RateLimit]] = None,
+                 default: Optional[RateLimit] = None,
+                 backend: Optional[LocalBucketBackend] = None,
+                 adaptive: bool = True,
+                 min_factor: float = 0.05,
+                 recovery: float = 0.02) -> None:
+        """Instantiate a new route limiter
+
+        Args:
+            limits (Optional[Dict[str, RateLimit]], optional): Limits by route group. Defaults to None.
+            default (Optional[RateLimit], optional): Limit of the groups without own limits. Defaults to None.
+            backend (Optional[LocalBucketBackend], optional): Storage of the buckets.
+                Defaults to LocalBucketBackend().
+            adaptive (bool, optional): Lower the rate on 429 responses. Defaults to True.
+            min_factor (float, optional): Lowest share of the configured rate. Defaults to 0.05.
+            recovery (float, optional): Share of the configured rate regained per success. Defaults to 0.02.
+        """
+        self.limits = dict(limits or {})
+        self.default = default or RateLimit()
+        self.backend = backend if backend is not None else LocalBucketBackend()
+        self.adaptive = adaptive
+        self.min_factor = min_factor
+        self.recovery = recovery
+        self.throttled = 0
+        self._factors: Dict[str, float] = {}
+        self._slots: Dict[str, threading.BoundedSemaphore] = {}
+        # asyncio semaphores bind to the loop which first waits on them, so every loop has its own
+        self._async_slots: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]]" = \
+            weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def limit_for(self, group: str) -> RateLimit:
+        """Get the limit of a route group"""
+        return self.limits.get(group, self.default)
+
+    def factor(self, group: str) -> float:
+        """Get the current share of the configured rate of a route group, lowered by 429 responses"""
+        return self._factors.get(group, 1.0)
+
+    def reserve(self, route: str) -> float:
+        """Take a token for a request
+
+        Args:
+            route (str): The api route
+
+        Returns:
+            float: Seconds to wait before sending the request
+        """
+        group = route_group(route)
+        limit = self.limit_for(group)
+        if not limit.rate:
+            return 0.0
+
+        def take(state: Optional[BucketState]) -> BucketState:
+            now = self.backend.clock()
+            tokens, updated, factor = state if state is not None else (limit.capacity, now, 1.0)
+            tokens = min(limit.capacity, tokens + max(now - updated, 0.0) * limit.rate * factor)
+            return [tokens - 1.0, now, factor]
+
+        tokens, _, factor = self.backend.update(group, take)
+        self._factors[group] = factor
+        if tokens >= 0:
+            return 0.0
+        self.throttled += 1
+        return -tokens / (limit.rate * factor)
+
+    def feedback(self, route: str, status_code: int, retry_after: Optional[float] = None) -> None:
+        """Adapt the rate to a response
+
+        Args:
+            route (str): The api route
+            status_code (int): The response status
+            retry_after (Optional[float], optional): Seconds of the Retry-After header. Defaults to None.
+        """
+        group = route_group(route)
+        limit = self.limit_for(group)
+        if not self.adaptive or not limit.rate:
+            return
+        if status_code == 429:
+            def decrease(state: Optional[BucketState]) -> BucketState:
+                now = self.backend.clock()
+                tokens, _, factor = state if state is not None else (limit.capacity, now, 1.0)
+                factor = max(self.min_factor, factor / 2)
+                # nobody sends before the server told us to
+                tokens = min(tokens, -(retry_after or 0.0) * limit.rate * factor)
+                return [tokens, now, factor]
+            self._factors[group] = self.backend.update(group, decrease)[2]
+        elif status_code < 400 and self.factor(group) < 1.0:
+            def increase(state: Optional[BucketState]) -> BucketState:
+                now = self.backend.clock()
+                tokens, updated, factor = state if state is not None else (limit.capacity, now, 1.0)
+                return [tokens, updated, min(1.0, factor + self.recovery)]
+            self._factors[group] = self.backend.update(group, increase)[2]
+
+    @contextmanager
+    def acquire(self, route: str) -> Iterator[None]:
+        """Wait for a token and a free slot of the route group, the slot is held within the block
+
+        Args:
+            route (str): The api route
+        """
+        wait = self.reserve(route)
+        if wait > 0:
+            time.sleep(wait)
+        slot = self._slot(route_group(route))
+        if slot is None:
+            yield
+            return
+        with slot:
+            yield
+
+    @asynccontextmanager
+    async def acquire_async(self, route: str) -> AsyncIterator[None]:
+        """Like acquire() without blocking the event loop
+
+        Args:
+            route (str): The api route
+        """
+        group = route_group(route)
+        if self.limit_for(group).rate:
+            # a FileBucketBackend blocks on its file lock and fsync
+            wait = await asyncio.get_running_loop().run_in_executor(None, self.reserve, route)
+            if wait > 0:
+                await asyncio.sleep(wait)
+        limit = self.limit_for(group).max_in_flight
+        if limit is None:
+            yield
+            return
+        slots = self._async_slots.get(asyncio.get_running_loop())
+        if slots is None:
+            with self._lock:
+                slots = self._async_slots.setdefault(asyncio.get_running_loop(), {})
+        slot = slots.get(group)
+        if slot is None:
+            slot = slots.setdefault(group, asyncio.Semaphore(limit))
+        async with slot:
+            yield
+
+    def _slot(self, group: str) -> Optional[threading.BoundedSemaphore]:
+        limit = self.limit_for(group).max_in_flight
+        if limit is None:
+            return None
+        slot = self._slots.get(group)
+        if slot is None:
+            with self._lock:
+                slot = self._slots.setdefault(group, threading.BoundedSemaphore(limit))
+        return slot
+
+
+class _Unlimited:
+    """Stands in for the route limiter of clients without one"""
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *args) -> bool:
+        return False
+
+    async def __aenter__(self) -> None:
+        return None
+
+    async def __aexit__(self, *args) -> bool:
+        return False
+
+
+UNLIMITED = _Unlimited()
+
+
+__all__ = [
+    "FileBucketBackend",
+    "LocalBucketBackend",
+    "RateLimit",
+    "RateLimiter",
+    "RouteLimiter",
+    "route_group"
+]
@@ -0,0 +1,167 @@
+"""Module providing stores which keep access tokens beyond the lifetime of a process"""
+import json
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Dict, Iterator, NamedTuple, Optional
+from aiman.core.files import locked_file, write_json
+
+
+class AccessToken(NamedTuple):
+    """Represents an OAuth access token"""
+    token: str
+    refresh_token: str
+    expires_on: int
+
+
+AccessToken.token.__doc__ = """The token string."""
+AccessToken.refresh_token.__doc__ = """The token need for refreshing current accestoken string."""
+AccessToken.expires_on.__doc__ = """The token's expiration time in Unix time."""
+
+
+class TokenStore(ABC):
+    """Represents a store of access tokens keyed by api host and user name
+
+    Base class of the token stores. A credential with a store reuses a still valid
+    token (or refreshes it with its refresh token) instead of logging in again. The
+    credential holds locked() while it logs in, so with a store shared by several
+    processes only one of them logs in and the others take its token.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def key_for(api_host: str, user_name: str) -> str:
+        """Get the key of the tokens of a user
+
+        Args:
+            api_host (str): The validated api host url
+            user_name (str): The user name
+
+        Returns:
+            str: The key
+        """
+        return f"{api_host}|{user_name}"
+
+    @contextmanager
+    def locked(self) -> Iterator[None]:
+        """Hold the lock of the store (reentrant)"""
+        with self._lock:
+            yield
+
+    @abstractmethod
+    def load(self, key: str) -> Optional[AccessToken]:
+        """Get the stored token of a key
+
+        Args:
+            key (str): The key (see key_for)
+
+        Returns:
+            Optional[AccessToken]: The token or None
+        """
+
+    @abstractmethod
+    def save(self, key: str, access: AccessToken) -> None:
+        """Store the token of a key
+
+        Args:
+            key (str): The key (see key_for)
+            access (AccessToken): The token
+        """
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Remove the token of a key
+
+        Args:
+            key (str): The key (see key_for)
+        """
+
+
+class MemoryTokenStore(TokenStore):
+    """Represents a token store shared by the credentials of one process"""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._tokens: Dict[str, AccessToken] = {}
+
+    def load(self, key: str) -> Optional[AccessToken]:
+        with self._lock:
+            return self._tokens.get(key)
+
+    def save(self, key: str, access: AccessToken) -> None:
+        with self._lock:
+            self._tokens[key] = access
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._tokens.pop(key, None)
+
+
+class FileTokenStore(TokenStore):
+    """Represents a token store in a json file readable by its owner only
+
+    Processes using the same path share their tokens. The file is replaced atomically
+    and guarded by an exclusive lock on path.lock, which requires fcntl (POSIX);
+    elsewhere only the threads of a process are synchronized. Expired tokens are
+    kept, as their refresh token may still be valid: an entry is only removed by
+    delete() or replaced by the next login once the server rejected its refresh.
+    """
+
+    def __init__(self, path: str) -> None:
+        """Instantiate a new file token store
+
+        Args:
+            path (str): The token file, created if missing
+        """
+        super().__init__()
+        self.path = path
+        self._depth = 0
+
+    @contextmanager
+    def locked(self) -> Iterator[None]:
+        with self._lock:
+            self._depth += 1
+            try:
+                if self._depth > 1:
+                    yield
+                    return
+                with locked_file(self.path):
+                    yield
+            finally:
+                self._depth -= 1
+
+    def load(self, key: str) -> Optional[AccessToken]:
+        entry = self._read().get(key)
+        return AccessToken(*entry) if entry is not None else None
+
+    def save(self, key: str, access: AccessToken) -> None:
+        with self.locked():
+            tokens = self._read()
+            tokens[key] = list(access)
+            self._write(tokens)
+
+    def delete(self, key: str) -> None:
+        with self.locked():
+            tokens = self._read()
+            if tokens.pop(key, None) is not None:
+                self._write(tokens)
+
+    def _read(self) -> dict:
+        try:
+            with open(self.path, "r", encoding="utf-8") as file:
+                return json.load(file)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _write(self, tokens: dict) -> None:
+        write_json(self.path, tokens)
+
+
+__all__ = [
+    "AccessToken",
+    "TokenStore",
+    "MemoryTokenStore",
+    "FileTokenStore"
+]
@@ -0,0 +1,209 @@
+"""Module providing resumable uploads of large files in parts"""
+import hashlib
+import json
+import math
+import os
+import threading
+import time
+from contextlib import nullcontext
+from dataclasses import dataclass
+from typing import Callable, Dict, Generator, List, Optional, Tuple
+from aiman.core.classes import RequestType, Route
+from aiman.core.exceptions import AimanError
+from aiman.core.files import locked_file, write_json
+
+UploadRequest = Tuple[RequestType, str, object]
+"""(request type, route, payload) of a single request of an upload"""
+
+
+@dataclass
+class UploadProgress:
+    """Represents the progress of a chunked upload after each acknowledged part"""
+    name: str = ""
+    upload_id: str = ""
+    part: int = 0
+    parts: int = 0
+    bytes_sent: int = 0
+    resumed_at: int = 0
+
+
+@dataclass
+class ChunkedUploadOptions:
+    """Represents the chunked upload of large attachments and documents
+
+    Files of at least threshold bytes are not embedded as base64 into the json body
+    but uploaded as raw parts of part_size bytes beforehand and referenced by their
+    upload id. Each part is a PUT of its own and retried according to the retry
+    policy of the client. The upload ids are kept in a journal (a json file with
+    journal_path, in memory otherwise), so an interrupted upload resumes after the
+    last part the server acknowledged, also from another process, and a completed
+    upload is referenced again. Entries are dropped journal_ttl seconds after they
+    were stored, which keeps the journal small and should not exceed the time the
+    server keeps its uploads.
+
+    The server side protocol:
+        POST /api/v1/uploads {name, size, mime_type, partSize} -> {upload: {id, parts, complete}}
+        GET  /api/v1/uploads/{id} -> {upload: {id, parts, complete}}
+        PUT  /api/v1/uploads/{id}/parts/{index} (raw bytes, X-Content-SHA256) -> {upload: {...}}
+        POST /api/v1/uploads/{id}/complete {parts} -> {upload: {...}}
+    """
+    part_size: int = 8 * 1024 * 1024
+    threshold: int = 64 * 1024 * 1024
+    journal_path: Optional[str] = None
+    journal_ttl: float = 24 * 60 * 60
+    on_part: Optional[Callable[[UploadProgress], None]] = None
+
+    def __post_init__(self) -> None:
+        if self.part_size <= 0:
+            raise ValueError("part_size needs to be greater than 0")
+
+    def applies(self, size: int) -> bool:
+        """Check if a file of the given size is uploaded in parts"""
+        return size >= self.threshold
+
+
+class UploadPart:
+    """Represents the raw body of a part, sent as application/octet-stream"""
+    __slots__ = ("content", "headers")
+
+    def __init__(self, content: bytes) -> None:
+        self.content = content
+        self.headers = {
+            "Content-Type": "application/octet-stream",
+            "X-Content-SHA256": hashlib.sha256(content).hexdigest()}
+
+    def __len__(self) -> int:
+        return len(self.content)
+
+
+class UploadJournal:
+    """Maps files (path, size and modification time) to the ids of their uploads (thread-safe)
+
+    A journal file is shared by all clients and processes using the same path: every
+    change is merged into the current file content under an exclusive lock on
+    path.lock (fcntl, POSIX only) and the file is replaced atomically. A missing or
+    unreadable file counts as an empty journal. Each entry keeps its expiration time
+    (Unix time), expired entries are ignored and removed by the next change.
+    """
+
+    def __init__(self, path: Optional[str] = None, ttl: float = 24 * 60 * 60) -> None:
+        """Instantiate a new journal
+
+        Args:
+            path (Optional[str], optional): The json file, None to keep the journal in memory. Defaults to None.
+            ttl (float, optional): Seconds an entry is kept. Defaults to one day.
+        """
+        self.path = path
+        self.ttl = ttl
+        self._entries: Dict[str, List] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(file_path: str) -> str:
+        """Get the journal key of a file, a changed file gets a new key"""
+        stat = os.stat(file_path)
+        return f"{os.path.abspath(file_path)}:{stat.st_size}:{stat.st_mtime_ns}"
+
+    def get(self, key: str) -> Optional[str]:
+        """Get the upload id of a file key"""
+        with self._lock:
+            if self.path is not None:
+                self._entries = self._read()
+            entry = self._entries.get(key)
+            return entry[0] if entry is not None and entry[1] > time.time() else None
+
+    def set(self, key: str, upload_id: Optional[str]) -> None:
+        """Set (or with None remove) the upload id of a file key"""
+        with self._lock, locked_file(self.path) if self.path is not None else nullcontext():
+            if self.path is not None:
+                self._entries = self._read()
+            now = time.time()
+            self._entries = {other: entry for other, entry in self._entries.items() if entry[1] > now}
+            if upload_id is None:
+                self._entries.pop(key, None)
+            else:
+                self._entries[key] = [upload_id, now + self.ttl]
+            if self.path is not None:
+                self._write(self._entries)
+
+    def _read(self) -> Dict[str, List]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as file:
+                entries = json.load(file)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(entries, dict):
+            return {}
+        # entries without an expiration time (older journals) count as expired
+        return {key: entry if isinstance(entry, list) and len(entry) == 2 else [entry, 0]
+                for key, entry in entries.items()}
+
+    def _write(self, entries: Dict[str, List]) -> None:
+        write_json(self.path, entries)
+
+
+class ChunkedUpload:
+    """Represents the upload of a single file in parts
+
+    requests() yields the requests of the upload and receives their response data
+    (errors are thrown into it), so the sync and the async client drive the same
+    upload logic. Its return value is the upload id.
+    """
+
+    def __init__(self, file_path: str, name: str, mime_type: str,
+                 options: ChunkedUploadOptions, journal: UploadJournal) -> None:
+        self.file_path = file_path
+        self.name = name
+        self.mime_type = mime_type
+        self.options = options
+        self.journal = journal
+        self.size = os.path.getsize(file_path)
+
+    def requests(self) -> Generator[UploadRequest, dict, str]:
+        """Yield the requests of the upload
+
+        Returns:
+            Generator[UploadRequest, dict, str]: Gets the response data of each request, returns the upload id
+        """
+        route = Route.UPLOADS.value
+        key = self.journal.key(self.file_path)
+        upload, upload_id = None, self.journal.get(key)
+        if upload_id is not None:
+            try:
+                upload = (yield RequestType.GET, f"{route}/{upload_id}", None)["upload"]
+            except AimanError as error:
+                # expired or unknown, start over
+                if error.status_code != 404:
+                    raise
+        if upload is None:
+            payload = {"name": self.name, "size": self.size, "mime_type": self.mime_type,
+                       "partSize": self.options.part_size}
+            upload = (yield RequestType.POST, route, payload)["upload"]
+            upload_id = upload["id"]
+            self.journal.set(key, upload_id)
+        if upload.get("complete"):
+            return upload_id
+
+        part_size = upload.get("partSize", self.options.part_size)
+        parts = max(1, math.ceil(self.size / part_size))
+        resumed_at = upload.get("parts", 0)
+        with open(self.file_path, "rb") as file:
+            file.seek(resumed_at * part_size)
+            for index in range(resumed_at, parts):
+                part = UploadPart(file.read(part_size))
+                yield RequestType.PUT, f"{route}/{upload_id}/parts/{index}", part
+                if self.options.on_part is not None:
+                    self.options.on_part(UploadProgress(
+                        name=self.name, upload_id=upload_id, part=index + 1, parts=parts,
+                        bytes_sent=min(self.size, (index + 1) * part_size), resumed_at=resumed_at))
+        yield RequestType.POST, f"{route}/{upload_id}/complete", {"parts": parts}
+        return upload_id
+
+
+__all__ = [
+    "ChunkedUpload",
+    "ChunkedUploadOptions",
+    "UploadJournal",
+    "UploadPart",
+    "UploadProgress"
+]
@@ -28,7 +28,7 @@ class Util:
                 return url
             if not url.lower().startswith('http'):
                 url = "https://" + url
-            if url.lower().startswith("http://"):
+            if url.lower().startswith("http://") and not cls.is_loopback_url(url):
                 url = url.replace("http://", "https://")
             if url.lower().endswith("/"):
                 url = url[:-1]
@@ -62,6 +62,19 @@ class Util:
             return True
         return False
 
+    @classmethod
+    def is_loopback_url(cls, url:str) -> bool:
+        """Check if given url points to the local host (local development and test servers)
+
+        Args:
+            url (str): url
+
+        Returns:
+            bool: loopback url or not
+        """
+        host = urlparse(url).hostname
+        return host in {"localhost", "127.0.0.1", "::1"}
+
     @classmethod
     def get_current_unix_time(cls) -> int:
         """Get the current unix timestamp
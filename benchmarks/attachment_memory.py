@@ -0,0 +1,88 @@
+"""Benchmark of the peak memory used to encode an attachment and build a prompt body with it
+
+"read + b64encode" is the former encoding of a file (read, encode, decode into a str),
+"mmap windows" the current one (memory mapped, encoded window by window into one buffer).
+The "in-memory body" embeds the str into the json payload, the "encoded body" sends the
+buffer as it is (the default of AimanClient) and the "streaming body" encodes while sending.
+
+Usage: python -m benchmarks.attachment_memory [size in MB]
+"""
+import base64
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from aiman.client._base_client import BaseClient
+from aiman.core.encoding import StreamingJsonBody, encode_base64
+
+
+def encode_read(file_path: str) -> int:
+    """Read the whole file, base64 encode it and decode the result into a str"""
+    with open(file_path, "rb") as file:
+        return len(base64.b64encode(file.read()).decode())
+
+
+def encode_mmap(file_path: str) -> int:
+    """Encode the memory mapped file window by window and decode the result into a str"""
+    return len(encode_base64(file_path).decode("ascii"))
+
+
+def encode_mmap_bytes(file_path: str) -> int:
+    """Encode the memory mapped file window by window, without a str copy"""
+    return len(encode_base64(file_path))
+
+
+def build_in_memory(file_path: str) -> int:
+    """Encode the attachment into the payload and serialize it like requests' json= argument"""
+    _, prompt_dict = BaseClient()._build_prompt_request(  # pylint: disable=protected-access
+        {"model_tag_id": 1, "query": "summarize", "attachments": [file_path]})
+    return len(json.dumps(prompt_dict).encode("utf-8"))
+
+
+def build_body(file_path: str, stream_attachments: bool = False) -> int:
+    """Encode the attachment beforehand (or chunk by chunk) while 'sending' the body"""
+    files = {}
+    client = BaseClient()
+    client.stream_attachments = stream_attachments
+    _, prompt_dict = client._build_prompt_request(  # pylint: disable=protected-access
+        {"model_tag_id": 1, "query": "summarize", "attachments": [file_path]}, files=files)
+    return sum(len(chunk) for chunk in StreamingJsonBody(prompt_dict, files))
+
+
+def build_streaming(file_path: str) -> int:
+    """Encode the attachment chunk by chunk while 'sending' the body"""
+    return build_body(file_path, stream_attachments=True)
+
+
+def measure(func, file_path: str) -> tuple:
+    """Run func and return body size, peak traced memory and duration"""
+    tracemalloc.start()
+    started = time.perf_counter()
+    size = func(file_path)
+    duration = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size, peak, duration
+
+
+def main(size_mb: int = 64) -> None:
+    """Run the benchmark"""
+    with tempfile.TemporaryDirectory() as directory:
+        file_path = os.path.join(directory, "attachment.pdf")
+        with open(file_path, "wb") as file:
+            for _ in range(size_mb):
+                file.write(os.urandom(1024 * 1024))
+        print(f"attachment: {size_mb} MB")
+        for name, func in [("read + b64encode", encode_read), ("mmap windows", encode_mmap),
+                           ("mmap windows (bytes)", encode_mmap_bytes), ("in-memory body", build_in_memory),
+                           ("encoded body", build_body), ("streaming body", build_streaming)]:
+            body_size, peak, duration = measure(func, file_path)
+            print(f"{name:20} size={body_size / 2**20:8.1f} MB  peak={peak / 2**20:8.1f} MB "
+                  f"({peak / (size_mb * 2**20):4.2f}x file)  time={duration:6.3f}s "
+                  f"({duration * 1000 / size_mb:5.2f} ms/MB)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 64)
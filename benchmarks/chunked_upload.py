@@ -0,0 +1,77 @@
+"""Benchmark of chunked uploads of a large file against the local fake AIMan server
+
+Reports the throughput of a complete upload and of an upload which fails at 95% and
+is resumed, compared with sending the whole file again (estimated from the complete
+upload). Files up to 256 MB are also sent inline (base64 in the json body) for
+comparison, larger ones would take several times their size in memory.
+
+Usage: python -m benchmarks.chunked_upload [size in MB] [part size in MB]
+"""
+import math
+import os
+import sys
+import tempfile
+import time
+from aiman.client import AimanClient
+from aiman.core.exceptions import AimanError
+from aiman.core.retry import RetryPolicy
+from aiman.core.upload import ChunkedUploadOptions
+from tests.aiman.fake_server import FakeAimanServer
+
+INLINE_LIMIT_MB = 256
+
+
+def upload(server: FakeAimanServer, file_path: str, options: ChunkedUploadOptions,
+           retry_policy: RetryPolicy = None) -> float:
+    """Attach the file to a prompt and return the duration"""
+    with AimanClient(host_url=server.url, user_name="user", password="pw",
+                     chunked_upload=options, retry_policy=retry_policy) as client:
+        started = time.perf_counter()
+        client.prompt(model_tag_id=10, query="summarize", attachments=[file_path])
+        return time.perf_counter() - started
+
+
+def main(size_mb: int = 1024, part_mb: int = 8) -> None:
+    """Run the benchmark"""
+    part_size = part_mb * 1024 * 1024
+    parts = math.ceil(size_mb / part_mb)
+    with tempfile.TemporaryDirectory() as directory, FakeAimanServer() as server:
+        file_path = os.path.join(directory, "document.pdf")
+        with open(file_path, "wb") as file:
+            block = os.urandom(1024 * 1024)
+            for _ in range(size_mb):
+                file.write(block)
+        print(f"file: {size_mb} MB in {parts} parts of {part_mb} MB")
+
+        options = ChunkedUploadOptions(part_size=part_size, threshold=0)
+        duration = upload(server, file_path, options)
+        print(f"{'chunked':16} {size_mb / duration:8.1f} MB/s  time={duration:7.2f}s")
+
+        # fail at 95%, then resume from the journal of the first attempt
+        failed_at = max(1, int(parts * 0.95))
+        options = ChunkedUploadOptions(part_size=part_size, threshold=0,
+                                       journal_path=os.path.join(directory, "uploads.json"))
+        server.fail_next(500, path=f"/api/v1/uploads/upload-2/parts/{failed_at}")
+        started = time.perf_counter()
+        try:
+            upload(server, file_path, options, RetryPolicy.disabled())
+        except AimanError:
+            pass
+        failed = time.perf_counter() - started
+        resumed = upload(server, file_path, options)
+        resent = (parts - failed_at) / parts * size_mb
+        print(f"{'resume at 95%':16} {size_mb / (failed + resumed):8.1f} MB/s  time={failed + resumed:7.2f}s  "
+              f"(resume {resumed:.2f}s, re-sent {resent:.0f} MB instead of {size_mb} MB)")
+        restarted = failed + duration
+        print(f"{'restart at 95%':16} {size_mb / restarted:8.1f} MB/s  time={restarted:7.2f}s  "
+              f"(estimated, re-sent {size_mb} MB)")
+
+        if size_mb <= INLINE_LIMIT_MB:
+            duration = upload(server, file_path, None)
+            print(f"{'inline (base64)':16} {size_mb / duration:8.1f} MB/s  time={duration:7.2f}s")
+        else:
+            print(f"{'inline (base64)':16} skipped above {INLINE_LIMIT_MB} MB")
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:3]])
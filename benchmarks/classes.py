@@ -0,0 +1,107 @@
+"""Benchmark of the memory and (de)serialization time of the model classes
+
+Compares the slotted, table driven classes with plain dataclasses using per field
+branches, as the classes were implemented before.
+
+Usage: python -m benchmarks.classes [amount of objects]
+"""
+import sys
+import time
+import tracemalloc
+from dataclasses import fields, make_dataclass
+from aiman.core.classes import AIModel, DataSource
+
+MODEL = {"id": 7, "uuId": "5b0f0d9e", "name": "llama3", "shortDescription": "Meta Llama 3",
+         "longDescription": "", "defaultModelTagId": 70, "amountOfPulls": "1M", "amountOfTags": 4,
+         "requiredMemory": "8GB", "size": 4}
+DATASOURCE = {"id": 3, "name": "handbook", "summary": "employee handbook", "categories": [], "tags": [],
+              "assocContexts": [], "media": [], "status": 2, "mediaCount": 0, "ownerId": 1}
+
+
+def legacy_model_to_dict(self):
+    """AIModel.to_dict before the field table"""
+    return {"id": self.id, "uuId": self.uuid, "name": self.name,
+            "shortDescription": self.short_description, "longDescription": self.long_description,
+            "defaultModelTagId": self.default_model_tag_id, "amountOfPulls": self.amount_of_pulls,
+            "amountOfTags": self.amount_of_tags, "requiredMemory": self.required_memory, "size": self.size}
+
+
+def legacy_model_from_dict(self, values: dict):
+    """AIModel.from_dict before the field table"""
+    self.id = 0 if "id" not in values else values["id"]
+    self.uuid = "" if "uuId" not in values else values["uuId"]
+    self.name = "" if "name" not in values else values["name"]
+    self.short_description = "" if "shortDescription" not in values else values["shortDescription"]
+    self.long_description = "" if "longDescription" not in values else values["longDescription"]
+    self.default_model_tag_id = 0 if "defaultModelTagId" not in values else values["defaultModelTagId"]
+    self.amount_of_pulls = "" if "amountOfPulls" not in values else values["amountOfPulls"]
+    self.amount_of_tags = 0 if "amountOfTags" not in values else values["amountOfTags"]
+    self.required_memory = "" if "requiredMemory" not in values else values["requiredMemory"]
+    self.size = 0 if "size" not in values else values["size"]
+    return self
+
+
+def legacy_datasource_to_dict(self):
+    """DataSource.to_dict before the field table"""
+    return {"name": self.name, "summary": self.summary, "id": self.id, "categories": self.categories,
+            "tags": self.tags, "assocContexts": self.assoc_contexts, "media": self.media,
+            "status": self.status, "mediaCount": self.media_count, "ownerId": self.owner_id}
+
+
+def legacy_datasource_from_dict(self, values: dict):
+    """DataSource.from_dict before the field table"""
+    self.name = "" if "name" not in values else values["name"]
+    self.summary = "" if "summary" not in values else values["summary"]
+    self.id = -1 if "id" not in values else values["id"]
+    self.categories = None if "categories" not in values else values["categories"]
+    self.tags = None if "tags" not in values else values["tags"]
+    self.assoc_contexts = None if "assocContexts" not in values else values["assocContexts"]
+    self.media = None if "media" not in values else values["media"]
+    self.status = -1 if "status" not in values else values["status"]
+    self.media_count = -1 if "mediaCount" not in values else values["mediaCount"]
+    self.owner_id = -1 if "ownerId" not in values else values["ownerId"]
+    return self
+
+
+def legacy_class(cls: type, to_dict, from_dict) -> type:
+    """A plain dataclass (with __dict__) with the fields of cls and per field branches"""
+    return make_dataclass(
+        f"Legacy{cls.__name__}", [(field.name, field.type, field.default) for field in fields(cls)],
+        namespace={"to_dict": to_dict, "from_dict": from_dict})
+
+
+def memory(cls, values: dict, amount: int) -> float:
+    """Traced bytes per object of amount parsed objects"""
+    tracemalloc.start()
+    objects = [cls().from_dict(values) for _ in range(amount)]
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objects
+    return current / amount
+
+
+def round_trip(cls, values: dict, amount: int, repeat: int = 5) -> float:
+    """Best microseconds per from_dict and to_dict of several runs"""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(amount):
+            cls().from_dict(values).to_dict()
+        best = min(best, time.perf_counter() - started)
+    return best / amount * 1e6
+
+
+def main(amount: int = 100000) -> None:
+    """Run the benchmark"""
+    print(f"objects: {amount}")
+    legacy_model = legacy_class(AIModel, legacy_model_to_dict, legacy_model_from_dict)
+    legacy_datasource = legacy_class(DataSource, legacy_datasource_to_dict, legacy_datasource_from_dict)
+    for name, legacy, current, values in [("AIModel", legacy_model, AIModel, MODEL),
+                                          ("DataSource", legacy_datasource, DataSource, DATASOURCE)]:
+        for label, cls in [("dataclass", legacy), ("slotted", current)]:
+            print(f"{name:10} {label:9} size={memory(cls, values, amount):6.0f} B/object  "
+                  f"round-trip={round_trip(cls, values, amount):5.2f} us")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,170 @@
+"""Benchmark of the client calls against the local fake AIMan server
+
+Every scenario runs the given amount of calls with the given concurrency and reports
+the p50/p95/p99 latency, the calls per second, failed calls and the peak RSS of the
+process (which includes the in-process fake server). With --output the results are
+written as json, --compare reports the change against such a file and exits with 1
+if a scenario got slower than the tolerance.
+
+Usage:
+    python -m benchmarks.client --output baseline.json
+    python -m benchmarks.client --latency 0.005 --error-rate 0.01 --compare baseline.json
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+from aiman.client import AimanClient
+from aiman.client._base_client import BaseClient
+from aiman.core.retry import RetryPolicy
+from tests.aiman.fake_server import FakeAimanServer
+try:
+    import resource
+except ImportError:
+    resource = None
+
+SCENARIOS = ("prompt", "prompt_on_datasource", "fetch_all_datasources", "add_documents", "encode_attachments")
+
+
+def percentile(values: List[float], share: float) -> float:
+    """Nearest-rank percentile of the values"""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, math.ceil(share * len(ordered)) - 1))
+    return ordered[index]
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of the process in MB, None where unknown"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # linux reports kilobytes, macOS bytes
+    return peak / 2**20 if sys.platform == "darwin" else peak / 1024
+
+
+def run(call: Callable[[int], None], calls: int, concurrency: int) -> dict:
+    """Run the calls and summarize the latencies"""
+    latencies: List[float] = []
+    errors: List[Exception] = []
+
+    def timed(index: int) -> None:
+        started = time.perf_counter()
+        try:
+            call(index)
+        except (RuntimeError, OSError, ValueError) as error:
+            errors.append(error)
+            return
+        latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(timed, range(calls)))
+    duration = time.perf_counter() - started
+    return {
+        "calls": calls,
+        "errors": len(errors),
+        "p50_ms": percentile(latencies, 0.50) * 1000 if latencies else None,
+        "p95_ms": percentile(latencies, 0.95) * 1000 if latencies else None,
+        "p99_ms": percentile(latencies, 0.99) * 1000 if latencies else None,
+        "rps": calls / duration,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def scenarios(client: AimanClient, server: FakeAimanServer, attachment: str) -> Dict[str, Callable[[int], None]]:
+    """Build the benchmarked calls"""
+    datasource_id = server.add_datasource(name="documents")
+    for index in range(50):
+        server.add_datasource(name=f"source {index}", media=[{"name": "doc.pdf", "size": 1}])
+    encoder = BaseClient()
+    return {
+        "prompt": lambda index: client.prompt(model_tag_id=10, query=f"query {index}", use_cache=False),
+        "prompt_on_datasource": lambda index: client.prompt_on_datasource(
+            datasource_id=datasource_id, model_tag_id=10, query=f"query {index}", use_cache=False),
+        "fetch_all_datasources": lambda index: client.fetch_all_datasources(),
+        "add_documents": lambda index: client.add_documents(datasource_id, [attachment]),
+        "encode_attachments": lambda index: encoder._build_prompt_request(  # pylint: disable=protected-access
+            {"model_tag_id": 10, "query": "summarize", "attachments": [attachment]}),
+    }
+
+
+def compare(results: dict, baseline_path: str, tolerance: float) -> bool:
+    """Print the change against a previous run, False if a scenario regressed"""
+    with open(baseline_path, "r", encoding="utf-8") as file:
+        baseline = json.load(file)["results"]
+    passed = True
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        changes = []
+        for metric in ("p50_ms", "p95_ms", "p99_ms", "rps"):
+            before, after = baseline[name].get(metric), result.get(metric)
+            if not before or after is None:
+                continue
+            change = (after - before) / before
+            # a higher latency and a lower throughput are regressions
+            worse = change > tolerance if metric != "rps" else -change > tolerance
+            passed = passed and not worse
+            changes.append(f"{metric}={change:+7.1%}{' !' if worse else '  '}")
+        print(f"{name:22} {' '.join(changes)}")
+    return passed
+
+
+def report(results: dict, args: argparse.Namespace) -> int:
+    """Write the results with --output and compare them with --compare, 1 on a regression"""
+    if args.output:
+        content = {"meta": {"python": platform.python_version(), "platform": platform.platform(),
+                            "options": vars(args)}, "results": results}
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(content, file, indent=2)
+    if args.compare:
+        return 0 if compare(results, args.compare, args.tolerance) else 1
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the benchmark"""
+    parser = argparse.ArgumentParser(description="Benchmark the client against a local fake AIMan server")
+    parser.add_argument("--calls", type=int, default=200, help="calls per scenario")
+    parser.add_argument("--concurrency", type=int, default=8, help="concurrent calls")
+    parser.add_argument("--latency", type=float, default=0.0, help="server latency in seconds")
+    parser.add_argument("--payload-size", type=int, default=1024, help="characters of a prompt answer")
+    parser.add_argument("--attachment-kb", type=int, default=256, help="size of the attachment")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with 503")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the injected errors")
+    parser.add_argument("--scenario", action="append", choices=SCENARIOS, help="run only these scenarios")
+    parser.add_argument("--output", help="write the results as json")
+    parser.add_argument("--compare", help="json results of a previous run")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="allowed relative regression")
+    args = parser.parse_args(argv)
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory, FakeAimanServer(
+            latency=args.latency, payload_size=args.payload_size,
+            error_rate=args.error_rate, seed=args.seed) as server:
+        attachment = os.path.join(directory, "attachment.csv")
+        with open(attachment, "w", encoding="utf-8") as file:
+            file.writelines(f"{index},value {index}\n" for index in range(args.attachment_kb * 64))
+        client = AimanClient(host_url=server.url, user_name="user", password="pw",
+                             retry_policy=RetryPolicy(max_attempts=5, backoff_factor=0.001, retry_prompts=True))
+        calls = scenarios(client, server, attachment)
+        for name in args.scenario or SCENARIOS:
+            calls[name](0)
+            results[name] = run(calls[name], args.calls, args.concurrency)
+            result = results[name]
+            print(f"{name:22} p50={result['p50_ms'] or 0:8.2f} ms  p95={result['p95_ms'] or 0:8.2f} ms  "
+                  f"p99={result['p99_ms'] or 0:8.2f} ms  {result['rps']:9.1f}/s  errors={result['errors']}  "
+                  f"rss={result['peak_rss_mb'] or 0:7.1f} MB")
+        client.close()
+
+    return report(results, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
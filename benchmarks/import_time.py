@@ -0,0 +1,93 @@
+"""Benchmark of the cold start of the package, measured with python -X importtime
+
+Every statement runs in fresh interpreters. The reported time is the cumulative import
+time of all modules the statement imports beyond a bare interpreter, the slowest of them
+are listed by their own import time. With --output the results are written as json,
+--compare reports the change against such a file and exits with 1 on a regression.
+
+Usage:
+    python -m benchmarks.import_time --output baseline.json
+    python -m benchmarks.import_time --runs 20 --compare baseline.json
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+from benchmarks.client import percentile, report
+
+STATEMENTS = {
+    "import aiman": "import aiman",
+    "sync client": "from aiman import AimanClient",
+    "async client": "from aiman import AsyncAimanClient",
+    "client setup": "from aiman import AimanClient\n"
+                    "AimanClient(host_url='http://127.0.0.1:9', user_name='user', password='pw').close()",
+}
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+"""The checkout the statements import the package from"""
+
+_LINE = re.compile(r"^import time:\s*(\d+)\s*\|\s*(\d+)\s*\|( *)(\S+)$")
+
+
+def parse(stderr: str) -> Dict[str, Tuple[int, int, int]]:
+    """Map the modules of -X importtime output to (self us, cumulative us, nesting level)"""
+    modules = {}
+    for line in stderr.splitlines():
+        match = _LINE.match(line)
+        if match is not None:
+            own, cumulative, indent, name = match.groups()
+            modules[name] = (int(own), int(cumulative), (len(indent) - 1) // 2)
+    return modules
+
+
+def import_times(statement: str) -> Dict[str, Tuple[int, int, int]]:
+    """Run the statement in a fresh interpreter and parse its import times"""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", statement],
+                            capture_output=True, text=True, check=True, cwd=ROOT)
+    return parse(result.stderr)
+
+
+def measure(statement: str, runs: int, baseline: set) -> dict:
+    """Summarize the import time of the statement over the runs"""
+    totals: List[float] = []
+    own: Dict[str, List[int]] = defaultdict(list)
+    for _ in range(runs):
+        modules = {name: times for name, times in import_times(statement).items() if name not in baseline}
+        totals.append(sum(cumulative for _, cumulative, level in modules.values() if level == 0) / 1000)
+        for name, times in modules.items():
+            own[name].append(times[0])
+    slowest = sorted(own, key=lambda name: percentile(own[name], 0.5), reverse=True)[:5]
+    return {
+        "runs": runs,
+        "modules": len(own),
+        "p50_ms": percentile(totals, 0.50),
+        "p95_ms": percentile(totals, 0.95),
+        "slowest": {name: percentile(own[name], 0.5) / 1000 for name in slowest},
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the benchmark"""
+    parser = argparse.ArgumentParser(description="Benchmark the import time of the package")
+    parser.add_argument("--runs", type=int, default=10, help="interpreters per statement")
+    parser.add_argument("--statement", action="append", choices=STATEMENTS, help="run only these statements")
+    parser.add_argument("--output", help="write the results as json")
+    parser.add_argument("--compare", help="json results of a previous run")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="allowed relative regression")
+    args = parser.parse_args(argv)
+
+    baseline = set(import_times("pass"))
+    results = {}
+    for name in args.statement or STATEMENTS:
+        result = results[name] = measure(STATEMENTS[name], args.runs, baseline)
+        slowest = ", ".join(f"{module} {seconds:.1f}" for module, seconds in result["slowest"].items())
+        print(f"{name:14} p50={result['p50_ms']:7.1f} ms  p95={result['p95_ms']:7.1f} ms  "
+              f"modules={result['modules']:4}  slowest: {slowest}")
+    return report(results, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,48 @@
+"""Benchmark of encoding prompt bodies and decoding responses with the json backends
+
+The baseline is what the client did before: requests' json= argument (json.dumps
+and encode) and json.loads(content.decode('utf-8')).
+
+Usage: python -m benchmarks.json_codec [attachment size in MB]
+"""
+import base64
+import json
+import os
+import sys
+import time
+from aiman.core.codec import JsonCodec
+
+
+def best_of(func, repeat: int = 5) -> float:
+    """Best duration of several runs in milliseconds"""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def main(size_mb: int = 16) -> None:
+    """Run the benchmark"""
+    attachment = base64.b64encode(os.urandom(size_mb * 1024 * 1024)).decode("ascii")
+    request = {"prompt": "summarize the attachment", "options": {"temperature": 0.2, "seed": 7},
+               "attachments": [{"name": "report.pdf", "base64": attachment, "size": len(attachment)}]}
+    answer = " ".join(f"token{index}" for index in range(200000))
+    response = json.dumps({"messageContent": {"data": {
+        "responseText": answer, "context": list(range(100000)), "modelTagId": 10}}}).encode("utf-8")
+    print(f"request: {size_mb} MB attachment, response: {len(response) / 2**20:.1f} MB")
+
+    baseline_encode = best_of(lambda: json.dumps(request).encode("utf-8"))
+    baseline_decode = best_of(lambda: json.loads(response.decode("utf-8")))
+    print(f"{'baseline':8} encode={baseline_encode:8.1f} ms  decode={baseline_decode:8.1f} ms")
+    for backend in JsonCodec.available_backends():
+        codec = JsonCodec(backend)
+        encode = best_of(lambda codec=codec: codec.dumps(request))
+        decode = best_of(lambda codec=codec: codec.loads(response))
+        print(f"{backend:8} encode={encode:8.1f} ms  decode={decode:8.1f} ms  "
+              f"({baseline_encode / encode:4.1f}x / {baseline_decode / decode:4.1f}x)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 16)
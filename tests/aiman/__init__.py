@@ -0,0 +1 @@
+"""aiman tests module"""
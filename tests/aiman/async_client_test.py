@@ -0,0 +1,90 @@
+"""async client test module"""
+import asyncio
+import json
+import time
+import unittest
+import jwt
+import httpx
+from aiman.client import AsyncAimanClient
+from aiman.core.async_credentials import AsyncTokenCredential
+from aiman.core.exceptions import ServerError
+
+
+def _token(expires_in: int) -> str:
+    return jwt.encode({"exp": int(time.time()) + expires_in}, "aiman-test-secret-with-32-bytes!!", algorithm="HS256")
+
+
+def _wrap(data: dict) -> dict:
+    return {"messageContent": {"data": data}}
+
+
+class AsyncClientTest(unittest.IsolatedAsyncioTestCase):
+    """_summary_
+
+    Args:
+        unittest (_type_): _description_
+    """
+    def setUp(self):
+        self.calls = []
+        self.token_expires_in = 3600
+        self.failures = 0
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        """Stand-in for the AIMan API"""
+        self.calls.append((request.method, request.url.path))
+        if request.url.path.endswith("auth/authenticate") or request.url.path.endswith("auth/refresh"):
+            tokens = {"access_token": _token(self.token_expires_in), "refresh_token": "refresh"}
+            return httpx.Response(200, json=_wrap(tokens))
+        if request.url.path.endswith("/models"):
+            if self.failures:
+                self.failures -= 1
+                return httpx.Response(503, headers={"Retry-After": "0"}, text="busy")
+            return httpx.Response(200, json=_wrap({"Models": [{"name": "llama", "defaultModelTagId": 7}]}))
+        if request.url.path.startswith("/api/v1/prompts/"):
+            body = json.loads(request.content)
+            return httpx.Response(200, json=_wrap({"responseText": body["prompt"].upper()}))
+        if request.method == "DELETE":
+            return httpx.Response(200)
+        return httpx.Response(500, text="unexpected")
+
+    def create_client(self) -> AsyncAimanClient:
+        """_summary_"""
+        transport = httpx.AsyncClient(transport=httpx.MockTransport(self.handler))
+        return AsyncAimanClient(host_url="https://aiman.test", user_name="user", password="pw", client=transport)
+
+    async def test_prompt_concurrently(self):
+        """_summary_"""
+        async with self.create_client() as client:
+            responses = await asyncio.gather(
+                *[client.prompt(model_tag_id=7, query=f"query {i}") for i in range(50)])
+        self.assertEqual(responses[3]["responseText"], "QUERY 3")
+        self.assertEqual(sum(1 for call in self.calls if call[1].endswith("authenticate")), 1)
+
+    async def test_models_and_delete(self):
+        """_summary_"""
+        async with self.create_client() as client:
+            models = await client.get_models()
+            self.assertEqual(models[0].default_model_tag_id, 7)
+            self.assertEqual(await client.delete_datasource(datasource_id=3), 200)
+
+    async def test_single_refresh(self):
+        """_summary_"""
+        self.token_expires_in = -10
+        transport = httpx.AsyncClient(transport=httpx.MockTransport(self.handler))
+        credential = AsyncTokenCredential("https://aiman.test", "user", "pw", client=transport)
+        await credential.get_access_token()
+        self.token_expires_in = 3600
+        await asyncio.gather(*[credential.get_access_token() for _ in range(20)])
+        self.assertEqual(sum(1 for call in self.calls if call[1].endswith("refresh")), 1)
+        await credential.aclose()
+
+    async def test_retry(self):
+        """_summary_"""
+        self.failures = 2
+        async with self.create_client() as client:
+            models = await client.get_models()
+            self.assertEqual(models[0].default_model_tag_id, 7)
+            self.failures = 3
+            with self.assertRaises(ServerError):
+                await client.get_models()
+        self.assertEqual(sum(1 for call in self.calls if call[1].endswith("/models")), 6)
@@ -0,0 +1,61 @@
+"""benchmark suite test module"""
+import json
+import os
+import tempfile
+import unittest
+from benchmarks import client as benchmark
+from benchmarks import import_time
+
+
+class BenchmarkTest(unittest.TestCase):
+    """_summary_
+
+    Args:
+        unittest (_type_): _description_
+    """
+    def test_percentile(self):
+        """_summary_"""
+        values = [float(value) for value in range(1, 101)]
+        self.assertEqual(benchmark.percentile(values, 0.50), 50.0)
+        self.assertEqual(benchmark.percentile(values, 0.99), 99.0)
+        self.assertEqual(benchmark.percentile([3.0], 0.95), 3.0)
+
+    def test_output_and_compare(self):
+        """_summary_"""
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, "baseline.json")
+            arguments = ["--calls", "5", "--concurrency", "2", "--attachment-kb", "4",
+                         "--scenario", "prompt", "--scenario", "add_documents"]
+            self.assertEqual(benchmark.main(arguments + ["--output", output]), 0)
+            with open(output, "r", encoding="utf-8") as file:
+                report = json.load(file)
+            self.assertEqual(set(report["results"]), {"prompt", "add_documents"})
+            self.assertEqual(report["results"]["prompt"]["errors"], 0)
+            for key in ("p50_ms", "p95_ms", "p99_ms", "rps"):
+                self.assertGreater(report["results"]["prompt"][key], 0)
+            report["results"]["prompt"]["p50_ms"] /= 100
+            with open(output, "w", encoding="utf-8") as file:
+                json.dump(report, file)
+            self.assertEqual(benchmark.main(arguments + ["--compare", output]), 1)
+
+    def test_import_time(self):
+        """_summary_"""
+        modules = import_time.import_times("import aiman")
+        self.assertIn("aiman", modules)
+        # the exports are loaded on first access, jwt only to decode a token
+        for name in ("requests", "httpx", "jwt", "aiman.client._ai_man_client"):
+            self.assertNotIn(name, modules)
+        modules = import_time.import_times("from aiman import AimanClient")
+        self.assertIn("requests", modules)
+        self.assertNotIn("jwt", modules)
+        self.assertNotIn("httpx", modules)
+
+    def test_import_time_output(self):
+        """_summary_"""
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, "imports.json")
+            self.assertEqual(import_time.main(["--runs", "1", "--statement", "import aiman", "--output", output]), 0)
+            with open(output, "r", encoding="utf-8") as file:
+                result = json.load(file)["results"]["import aiman"]
+            self.assertGreater(result["p50_ms"], 0)
+            self.assertIn("aiman", result["slowest"])
@@ -0,0 +1,83 @@
+"""cache test module"""
+import os
+import shutil
+import tempfile
+import unittest
+from aiman.client._base_client import BaseClient
+from aiman.core.cache import AttachmentCache
+
+
+class AttachmentCacheTest(unittest.TestCase):
+    """_summary_
+
+    Args:
+        unittest (_type_): _description_
+    """
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, True)
+        self.client = BaseClient()
+        self.client.attachment_cache = AttachmentCache(max_bytes=1000)
+
+    def write(self, name: str, content: bytes) -> str:
+        """_summary_"""
+        path = os.path.join(self.directory, name)
+        with open(path, "wb") as file:
+            file.write(content)
+        return path
+
+    def test_hits_and_misses(self):
+        """_summary_"""
+        policy = self.write("policy.pdf", b"x" * 300)
+        copy = self.write("copy.txt", b"x" * 300)
+        first = self.client._build_media_attachments([policy])[0]  # pylint: disable=protected-access
+        attachments = self.client._build_media_attachments([policy, copy])  # pylint: disable=protected-access
+        second, third = attachments[0], attachments[1]
+        self.assertEqual(first.base64, second.base64)
+        self.assertEqual((third.name, third.mime_type), ("copy.txt", "text/plain"))
+        stats = self.client.attachment_cache.stats()
+        self.assertEqual((stats.hits, stats.misses, stats.entries, stats.bytes), (2, 1, 1, 400))
+
+    def test_stale_entries(self):
+        """_summary_"""
+        path = self.write("prices.csv", b"a,b")
+        self.client._build_media_attachments([path])  # pylint: disable=protected-access
+        os.utime(path, ns=(0, 0))
+        self.write("prices.csv", b"a,b,c")
+        attachment = self.client._build_media_attachments([path])[0]  # pylint: disable=protected-access
+        self.assertEqual(attachment.base64, "YSxiLGM=")
+        self.assertEqual(self.client.attachment_cache.stats().misses, 2)
+
+    def test_size_eviction(self):
+        """_summary_"""
+        paths = [self.write(f"{index}.txt", bytes([index]) * 300) for index in range(4)]
+        self.client._build_media_attachments(paths)  # pylint: disable=protected-access
+        stats = self.client.attachment_cache.stats()
+        self.assertEqual((stats.entries, stats.evictions, stats.bytes), (2, 2, 800))
+        self.client._build_media_attachments(paths[-1:])  # pylint: disable=protected-access
+        self.assertEqual(self.client.attachment_cache.stats().hits, 1)
+
+    def test_path_limit(self):
+        """_summary_"""
+        cache = AttachmentCache(max_paths=2)
+        paths = [self.write(f"{index}.txt", b"same") for index in range(4)]
+        for path in paths:
+            cache.get(path, self.client._encode_file)  # pylint: disable=protected-access
+        self.assertEqual(len(cache._paths), 2)  # pylint: disable=protected-access
+        self.assertEqual(cache.stats().hits, 3)
+
+    def test_file_changed_while_encoding(self):
+        """_summary_"""
+        path = self.write("draft.txt", b"first")
+        cache = AttachmentCache()
+
+        def encode(file_path):
+            attachment = self.client._encode_file(file_path)  # pylint: disable=protected-access
+            self.write("draft.txt", b"second version")
+            return attachment
+
+        cache.get(path, encode)
+        # the encoded content may not match the digest, nothing is cached
+        self.assertEqual(cache.stats().entries, 0)
+        attachment = cache.get(path, self.client._encode_file)  # pylint: disable=protected-access
+        self.assertEqual(attachment.base64, "c2Vjb25kIHZlcnNpb24=")
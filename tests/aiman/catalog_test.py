@@ -0,0 +1,121 @@
+"""model catalog test module"""
+import asyncio
+import time
+import unittest
+from aiman.client import AimanClient, AsyncAimanClient
+from aiman.core.catalog import ModelCatalog
+from aiman.core.instrumentation import Observer, RequestEvent
+from tests.aiman.fake_server import FakeAimanServer
+
+
+class EventObserver(Observer):
+    """Keeps the received events"""
+
+    def __init__(self):
+        self.events = []
+
+    def request_finished(self, event: RequestEvent) -> None:
+        self.events.append(event)
+
+
+class ModelCatalogTest(unittest.TestCase):
+    """_summary_
+
+    Args:
+        unittest (_type_): _description_
+    """
+    def setUp(self):
+        self.server = FakeAimanServer().start()
+        self.addCleanup(self.server.close)
+
+    def create_client(self, catalog: ModelCatalog) -> AimanClient:
+        """_summary_"""
+        return AimanClient(host_url=self.server.url, user_name="user", password="pw", model_catalog=catalog)
+
+    def test_lookups(self):
+        """_summary_"""
+        with self.create_client(ModelCatalog(ttl=60)) as client:
+            self.assertEqual(client.model_catalog.by_name("mistral").default_model_tag_id, 20)
+            self.assertEqual(client.model_catalog.by_uuid("uuid-1").name, "llama3")
+            self.assertEqual(client.model_catalog.by_tag_id(20).uuid, "uuid-2")
+            self.assertIsNone(client.model_catalog.by_name("unknown"))
+            self.assertEqual(len(client.get_models()), 2)
+        self.assertEqual(self.server.count("GET", "/api/v1/models"), 1)
+
+    def test_conditional_revalidation(self):
+        """_summary_"""
+        with self.create_client(ModelCatalog(ttl=0.05)) as client:
+            client.get_models()
+            time.sleep(0.06)
+            self.assertEqual(client.model_catalog.by_name("llama3").id, 1)
+            self.assertEqual(client.model_catalog.revalidations, 1)
+            self.server.models = self.server.models + [
+                {"id": 3, "uuId": "uuid-3", "name": "phi", "defaultModelTagId": 30}]
+            time.sleep(0.06)
+            self.assertEqual(client.model_catalog.by_tag_id(30).name, "phi")
+            self.assertEqual(client.model_catalog.revalidations, 1)
+        self.assertEqual(self.server.count("GET", "/api/v1/models"), 3)
+
+    def test_without_etag(self):
+        """_summary_"""
+        self.server.models_etag = False
+        with self.create_client(ModelCatalog(ttl=0.05)) as client:
+            client.get_models()
+            time.sleep(0.06)
+            self.assertEqual(len(client.get_models()), 2)
+            self.assertEqual(client.model_catalog.revalidations, 0)
+        self.assertEqual(self.server.count("GET", "/api/v1/models"), 2)
+
+    def test_background_refresh(self):
+        """_summary_"""
+        with self.create_client(ModelCatalog(ttl=1.2, background_refresh=True)) as client:
+            client.get_models()
+            time.sleep(1.3)
+            self.assertEqual(client.model_catalog.revalidations, 1)
+            self.assertEqual(len(client.get_models()), 2)
+        self.assertEqual(self.server.count("GET", "/api/v1/models"), 2)
+
+    def test_observed(self):
+        """_summary_"""
+        observer = EventObserver()
+        with AimanClient(host_url=self.server.url, user_name="user", password="pw",
+                         model_catalog=ModelCatalog(ttl=0.05), observer=observer) as client:
+            client.get_models()
+            time.sleep(0.06)
+            client.get_models()
+        self.assertEqual([(event.route, event.status_code) for event in observer.events],
+                         [("/api/v1/models", 200), ("/api/v1/models", 304)])
+
+    def test_async(self):
+        """_summary_"""
+        observer = EventObserver()
+
+        async def run():
+            async with AsyncAimanClient(host_url=self.server.url, user_name="user", password="pw",
+                                        model_catalog=ModelCatalog(ttl=0.05), observer=observer) as client:
+                # concurrent calls share the first load
+                first, _ = await asyncio.gather(client.get_models(), client.get_models())
+                self.assertEqual(client.model_catalog.by_name("mistral").default_model_tag_id, 20)
+                await asyncio.sleep(0.06)
+                self.assertEqual(await client.get_models(), first)
+                return client.model_catalog.revalidations
+
+        self.assertEqual(asyncio.run(run()), 1)
+        self.assertEqual(self.server.count("GET", "/api/v1/models"), 2)
+        self.assertEqual([event.status_code for event in observer.events], [200, 304])
+
+    def test_async_lookup_before_load(self):
+        """_summary_"""
+        catalog = ModelCatalog()
+
+        async def run():
+            async with AsyncAimanClient(host_url=self.server.url, user_name="user", password="pw",
+                                        model_catalog=catalog):
+                catalog.by_name("llama3")
+
+        with self.assertRaises(RuntimeError):
+            asyncio.run(run())
+
+
+if __name__ == '__main__':
+    unittest.main()
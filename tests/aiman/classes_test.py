@@ -1,6 +1,8 @@
 """client test module"""
 import unittest
-from aiman.core.classes import AIModel, Prompt, PromptOptions
+import dataclasses
+import pickle
+from aiman.core.classes import AIModel, Attachment, DataSource, Prompt, PromptOptions
 
 class ClassesTest(unittest.TestCase):
     """_summary_
@@ -47,3 +49,24 @@ class ClassesTest(unittest.TestCase):
         self.assertEqual(po_dict["mirostat_tau"], 5)
         self.assertEqual(po_dict["raw"], False)
         self.assertEqual(po_dict["keep_context"], True)
+
+    def test_slots(self):
+        """_summary_"""
+        for cls in (AIModel, Attachment, DataSource, Prompt, PromptOptions):
+            instance = cls()
+            self.assertFalse(hasattr(instance, "__dict__"))
+            self.assertEqual(tuple(field.name for field in dataclasses.fields(cls)), getattr(cls, "__slots__"))
+            self.assertEqual(pickle.loads(pickle.dumps(instance)), instance)
+        with self.assertRaises(AttributeError):
+            AIModel().unknown = 1
+
+    def test_round_trip(self):
+        """_summary_"""
+        datasource = DataSource().from_dict({"id": 4, "name": "handbook", "mediaCount": 2})
+        self.assertEqual((datasource.id, datasource.status, datasource.media), (4, -1, None))
+        self.assertEqual(DataSource().from_dict(datasource.to_dict()), datasource)
+        self.assertEqual(PromptOptions().from_dict({}).mirostat_eta, 100)
+        self.assertEqual(PromptOptions(stop=["###"]).to_dict()["stop"], ["###"])
+        self.assertEqual(Prompt().from_dict({}).project_id, False)
+        attachment = Attachment(name="a.pdf", size=3).from_dict({"base64": "YWJj"})
+        self.assertEqual((attachment.name, attachment.base64, attachment.size), ("a.pdf", "YWJj", 3))
@@ -0,0 +1,74 @@
+"""client test module"""
+import time
+import unittest
+from aiman.client import AimanClient
+from aiman.core.classes import PromptOptions
+from aiman.core.session import SessionOptions
+from tests.aiman.fake_server import FakeAimanServer
+
+
+class ClientTest(unittest.TestCase):
+    """_summary_
+
+    Args:
+        unittest (_type_): _description_
+    """
+    def setUp(self):
+        self.server = FakeAimanServer().start()
+        self.addCleanup(self.server.close)
+        self.client = AimanClient(
+            host_url=self.server.url, user_name="user", password="pw",
+            session_options=SessionOptions(pool_maxsize=16))
+        self.addCleanup(self.client.close)
+
+    def test_prompt(self):
+        """_summary_"""
+        response = self.client.prompt(model_tag_id=10, query="hello")
+        self.assertEqual(response["responseText"], "echo: hello")
+        self.assertEqual(self.server.count("POST", "/api/v1/auth/authenticate"), 1)
+
+    def test_prompt_many_ordered(self):
+        """_summary_"""
+        self.server.fail_next(500, path="/api/v1/prompts")
+        queries = [f"query {i}" for i in range(40)]
+        results = list(self.client.prompt_many(
+            queries, max_concurrency=8, ordered=True, model_tag_id=10, prompt_options=PromptOptions()))
+        self.assertEqual([result.index for result in results], list(range(40)))
+        self.assertEqual(sum(1 for result in results if not result.ok), 1)
+        for result in results:
+            if result.ok:
+                self.assertEqual(result.response["responseText"], f"echo: {queries[result.index]}")
+            else:
+                self.assertIn("[500]", str(result.error))
+
+    def test_prompt_many_rate_limited(self):
+        """_summary_"""
+        started = time.monotonic()
+        prompts = [{"model_tag_id": 20, "query": f"query {i}"} for i in range(6)]
+        results = list(self.client.prompt_many(prompts, max_concurrency=6, requests_per_second=20))
+        self.assertGreaterEqual(time.monotonic() - started, 0.25)
+        self.assertEqual(sorted(result.index for result in results), list(range(6)))
+        self.assertTrue(all(result.response["modelTagId"] == 20 for result in results))
+
+    def test_fetch_all_datasources(self):
+        """_summary_"""
+        for index in range(12):
+            self.server.add_datasource(name=f"source {index}", status=2 if index % 3 else 1,
+                                       media=[{"name": "a.pdf", "size": 10}])
+        self.server.latency = 0.05
+        started = time.monotonic()
+        datasources = self.client.fetch_all_datasources(max_concurrency=12)
+        self.assertLess(time.monotonic() - started, 0.05 * 12)
+        self.assertEqual([source.name for source in datasources], [f"source {index}" for index in range(12)])
+        self.assertEqual(datasources[0].media, [{"name": "a.pdf", "size": 10}])
+
+        ready = self.client.fetch_all_datasources(status=2)
+        self.assertEqual(len(ready), 8)
+        self.assertTrue(all(source.status == 2 for source in ready))
+
+        calls = self.server.count("GET", "/api/v1/datasources/")
+        shallow = self.client.fetch_all_datasources(shallow=True, status=1)
+        self.assertEqual(self.server.count("GET", "/api/v1/datasources/"), calls)
+        self.assertEqual(len(shallow), 4)
+        self.assertIsNone(shallow[0].media)
+        self.assertEqual(shallow[0].media_count, 1)
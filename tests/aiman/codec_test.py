@@ -0,0 +1,67 @@
+"""json codec test module"""
+import base64
+import json
+import os
+import tempfile
+import unittest
+from aiman.client import AimanClient
+from aiman.core.codec import JsonCodec
+from aiman.core.encoding import StreamingJsonBody
+from aiman.core.streaming import StreamDecoder
+from tests.aiman.fake_server import FakeAimanServer
+
+
+class JsonCodecTest(unittest.TestCase):
+    """_summary_
+
+    Args:
+        unittest (_type_): _description_
+    """
+    def test_backends(self):
+        """_summary_"""
+        payload = {"prompt": "Grüße", "options": {"temperature": 0.2, "stop": None}, "attachments": [1, 2]}
+        self.assertEqual(JsonCodec.available_backends()[-1], "json")
+        for backend in JsonCodec.available_backends():
+            codec = JsonCodec(backend)
+            encoded = codec.dumps(payload)
+            self.assertIsInstance(encoded, bytes)
+            self.assertEqual(json.loads(encoded), payload)
+            self.assertEqual(codec.loads(encoded), payload)
+            self.assertEqual(codec.loads(encoded.decode("utf-8")), payload)
+            with self.assertRaises(ValueError):
+                codec.loads(b"not json")
+        self.assertEqual(JsonCodec().backend, JsonCodec.available_backends()[0])
+        with self.assertRaises(ValueError):
+            JsonCodec("simplejson")
+
+    def test_streaming_body(self):
+        """_summary_"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "file.bin")
+            with open(path, "wb") as file:
+                file.write(os.urandom(1000))
+            for backend in JsonCodec.available_backends():
+                placeholder = StreamingJsonBody.placeholder()
+                body = StreamingJsonBody({"media": [{"base64": placeholder}]}, {placeholder: path},
+                                         dumps=JsonCodec(backend).dumps)
+                encoded = b"".join(body)
+                self.assertEqual(len(encoded), len(body))
+                with open(path, "rb") as file:
+                    self.assertEqual(base64.b64decode(json.loads(encoded)["media"][0]["base64"]), file.read())
+
+    def test_stream_decoder(self):
+        """_summary_"""
+        decoder = StreamDecoder("application/x-ndjson", loads=JsonCodec().loads)
+        self.assertEqual(decoder.feed(b'{"responseText": "a"}\nplain\n'), ["a", "plain"])
+
+    def test_client(self):
+        """_summary_"""
+        for backend in JsonCodec.available_backends():
+            with FakeAimanServer() as server, AimanClient(
+                    host_url=server.url, user_name="user", password="pw", json_codec=JsonCodec(backend)) as client:
+                self.assertEqual(client.prompt(model_tag_id=10, query="Grüße")["responseText"], "echo: Grüße")
+                self.assertEqual(len(client.get_models()), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
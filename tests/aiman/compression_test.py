@@ -0,0 +1,108 @@
+"""request compression test module"""
+import gzip
+import os
+import shutil
+import tempfile
+import unittest
+from aiman.client import AimanClient, AsyncAimanClient
+from aiman.core import compression
+from aiman.core.compression import CompressionOptions, CompressedBody
+from tests.aiman.fake_server import FakeAimanServer
+
+
+class CompressionTest(unittest.TestCase):
+    """_summary_
+
+    Args:
+        unittest (_type_): _description_
+    """
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, True)
+        self.records = []
+        self.server = FakeAimanServer().start()
+        self.addCleanup(self.server.close)
+        self.client = AimanClient(
+            host_url=self.server.url, user_name="user", password="pw",
+            compression=CompressionOptions(threshold=1024, on_transfer=self.records.append))
+        self.addCleanup(self.client.close)
+        self.path = os.path.join(self.directory, "table.csv")
+        with open(self.path, "w", encoding="utf-8") as file:
+            file.writelines(f"{index},name {index},{index % 7}\n" for index in range(20000))
+
+    def test_prompt_compressed(self):
+        """_summary_"""
+        response = self.client.prompt(model_tag_id=10, query="summarize", attachments=[self.path])
+        self.assertEqual(response["attachments"], ["table.csv"])
+        self.client.prompt(model_tag_id=10, query="small")
+        encodings = [entry[2] for entry in self.server.received if entry[1].startswith("/api/v1/prompts")]
+        self.assertEqual(encodings, ["gzip", None])
+        record = self.records[0]
+        self.assertEqual((record.method, record.content_encoding), ("POST", "gzip"))
+        self.assertLess(record.wire_bytes * 2, record.raw_bytes)
+        stats = self.client.transfer_stats()
+        self.assertEqual((stats.requests, stats.compressed_requests), (2, 1))
+        self.assertEqual(stats.bytes_saved, record.raw_bytes - record.wire_bytes)
+
+    def test_streamed_attachments(self):
+        """_summary_"""
+        self.client.stream_attachments = True
+        datasource_id = self.server.add_datasource()
+        datasource = self.client.add_documents(datasource_id, [self.path])
+        self.assertEqual(len(datasource["datasource"]["media"]), 1)
+        record = self.records[-1]
+        self.assertEqual((record.method, record.content_encoding), ("PUT", "gzip"))
+        self.assertEqual(self.server.received[-1][3], record.wire_bytes)
+        self.assertLess(record.wire_bytes * 2, record.raw_bytes)
+
+    def test_fallback(self):
+        """_summary_"""
+        self.server.accept_encodings = set()
+        for _ in range(2):
+            response = self.client.prompt(model_tag_id=10, query="summarize", attachments=[self.path])
+            self.assertEqual(response["attachments"], ["table.csv"])
+        encodings = [entry[2] for entry in self.server.received if entry[1].startswith("/api/v1/prompts")]
+        self.assertEqual(encodings, ["gzip", None, None])
+        self.assertTrue(self.client.compression_rejected)
+        self.assertEqual(self.records[0].content_encoding, None)
+
+    def test_options(self):
+        """_summary_"""
+        options = CompressionOptions()
+        body = b"abc" * 10000
+        self.assertEqual(gzip.decompress(options.compress(body)), body)
+        streamed = CompressedBody([body[:5000], body[5000:]], options)
+        self.assertEqual(gzip.decompress(b"".join(streamed)), body)
+        self.assertEqual(gzip.decompress(b"".join(streamed)), body)
+        self.assertGreater(streamed.wire_bytes, 0)
+        with self.assertRaises(ValueError):
+            CompressionOptions(algorithm="brotli")
+
+    @unittest.skipIf(compression.zstandard is None, "zstandard is not installed")
+    def test_zstd(self):
+        """_summary_"""
+        self.client.compression = CompressionOptions(algorithm="zstd", threshold=1024)
+        response = self.client.prompt(model_tag_id=10, query="summarize", attachments=[self.path])
+        self.assertEqual(response["attachments"], ["table.csv"])
+        self.assertEqual(self.server.received[-1][2], "zstd")
+
+
+class AsyncCompressionTest(unittest.IsolatedAsyncioTestCase):
+    """_summary_
+
+    Args:
+        unittest (_type_): _description_
+    """
+    async def test_prompt_compressed(self):
+        """_summary_"""
+        with FakeAimanServer() as server:
+            async with AsyncAimanClient(host_url=server.url, user_name="user", password="pw",
+                                        compression=CompressionOptions(threshold=100)) as client:
+                response = await client.prompt(model_tag_id=10, query="compress me " * 100)
+                self.assertEqual(response["responseText"], "echo: " + "compress me " * 100)
+                self.assertEqual(client.transfer_stats().compressed_requests, 1)
+            self.assertEqual(server.received[-1][2], "gzip")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,242 @@
+"""credentials test module"""
+import asyncio
+import os
+import shutil
+import stat
+import tempfile
+import threading
+import time
+import unittest
+from aiman.client import AimanClient, AsyncAimanClient
+from aiman.core.credentials import TokenCredential
+from aiman.core.token_store import AccessToken, FileTokenStore, MemoryTokenStore, TokenStore
+from tests.aiman.fake_server import FakeAimanServer, create_token
+
+
+class ThreadRecordingStore(MemoryTokenStore):
+    """Remembers the threads which accessed the store"""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.threads = set()
+
+    def load(self, key: str):
+        self.threads.add(threading.current_thread())
+        return super().load(key)
+
+    def save(self, key: str, access: AccessToken) -> None:
+        self.threads.add(threading.current_thread())
+        super().save(key, access)
+
+    def delete(self, key: str) -> None:
+        self.threads.add(threading.current_thread())
+        super().delete(key)
+
+
+class TokenCredentialTest(unittest.TestCase):
+    """_summary_
+
+    Args:
+        unittest (_type_): _description_
+    """
+    def setUp(self):
+        self.server = FakeAimanServer().start()
+        self.addCleanup(self.server.close)
+
+    def test_single_flight_refresh(self):
+        """_summary_"""
+        self.server.token_expires_in = 10
+        credential = TokenCredential(self.server.url, "user", "pw", refresh_skew=30)
+        credential.get_access_token()
+        self.server.token_expires_in = 3600
+        self.server.latency = 0.2
+        barrier = threading.Barrier(32)
+        tokens = []
+
+        def worker():
+            barrier.wait()
+            tokens.append(credential.get_access_token().token)
+
+        threads = [threading.Thread(target=worker) for _ in range(32)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.server.count("POST", "/api/v1/auth/refresh"), 1)
+        self.assertEqual(len(set(tokens)), 1)
+        credential.close()
+
+    def test_background_refresh(self):
+        """_summary_"""
+        self.server.token_expires_in = 31
+        credential = TokenCredential(self.server.url, "user", "pw", refresh_skew=30, background_refresh=True)
+        first = credential.access
+        self.server.token_expires_in = 3600
+        time.sleep(1.5)
+        self.assertEqual(self.server.count("POST", "/api/v1/auth/refresh"), 1)
+        self.assertNotEqual(credential.access, first)
+        self.assertIs(credential.get_access_token(), credential.access)
+        credential.close()
+
+    def test_background_refresh_after_failure(self):
+        """_summary_"""
+        self.server.token_expires_in = 0
+        credential = TokenCredential(self.server.url, "user", "pw", refresh_skew=30, background_refresh=True)
+        self.addCleanup(credential.close)
+        credential.access  # pylint: disable=pointless-statement
+        self.server.fail_next(500, path="/api/v1/auth/refresh")
+        # the refresh of the timer fails after the token expired
+        time.sleep(1.5)
+        self.assertEqual(self.server.count("POST", "/api/v1/auth/refresh"), 1)
+        self.server.token_expires_in = 31
+        credential.get_access_token()
+        # the refresh on demand arms the timer again
+        time.sleep(1.5)
+        self.assertEqual(self.server.count("POST", "/api/v1/auth/refresh"), 3)
+
+
+class TokenStoreTest(unittest.TestCase):
+    """_summary_
+
+    Args:
+        unittest (_type_): _description_
+    """
+    def setUp(self):
+        self.server = FakeAimanServer().start()
+        self.addCleanup(self.server.close)
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, True)
+        self.path = os.path.join(self.directory, "tokens.json")
+
+    def logins(self) -> int:
+        """_summary_"""
+        return self.server.count("POST", "/api/v1/auth/authenticate")
+
+    def test_lazy_login(self):
+        """_summary_"""
+        with AimanClient(host_url=self.server.url, user_name="user", password="pw") as client:
+            self.assertEqual(self.logins(), 0)
+            client.get_models()
+            client.get_models()
+            self.assertEqual(self.logins(), 1)
+
+    def test_file_store(self):
+        """_summary_"""
+        for _ in range(3):
+            with AimanClient(host_url=self.server.url, user_name="user", password="pw",
+                             token_store=FileTokenStore(self.path)) as client:
+                client.get_models()
+        self.assertEqual(self.logins(), 1)
+        self.assertEqual(stat.S_IMODE(os.stat(self.path).st_mode), 0o600)
+        with AimanClient(host_url=self.server.url, user_name="other", password="pw",
+                         token_store=FileTokenStore(self.path)) as client:
+            client.get_models()
+        self.assertEqual(self.logins(), 2)
+
+    def test_file_store_keeps_expired_tokens(self):
+        """_summary_"""
+        store = FileTokenStore(self.path)
+        expired = AccessToken(create_token(expires_in=-10), "refresh", int(time.time()) - 10)
+        store.save(TokenStore.key_for(self.server.url, "other"), expired)
+        with AimanClient(host_url=self.server.url, user_name="user", password="pw",
+                         token_store=FileTokenStore(self.path)) as client:
+            client.get_models()
+        # the other user refreshes its stored token instead of logging in
+        self.assertEqual(store.load(TokenStore.key_for(self.server.url, "other")), expired)
+        with AimanClient(host_url=self.server.url, user_name="other", password="pw",
+                         token_store=FileTokenStore(self.path)) as client:
+            client.get_models()
+        self.assertEqual((self.logins(), self.server.count("POST", "/api/v1/auth/refresh")), (1, 1))
+        self.assertEqual(sorted(os.listdir(self.directory)), ["tokens.json", "tokens.json.lock"])
+
+    def test_single_login_of_concurrent_credentials(self):
+        """_summary_"""
+        self.server.latency = 0.1
+        barrier = threading.Barrier(8)
+        tokens = []
+
+        def worker():
+            credential = TokenCredential(self.server.url, "user", "pw", token_store=FileTokenStore(self.path))
+            barrier.wait()
+            tokens.append(credential.get_access_token())
+            credential.close()
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.logins(), 1)
+        self.assertEqual(len(set(tokens)), 1)
+
+    def test_refresh_stored_token(self):
+        """_summary_"""
+        store = MemoryTokenStore()
+        key = TokenStore.key_for(self.server.url, "user")
+        store.save(key, AccessToken(create_token(expires_in=10), "refresh", int(time.time()) + 10))
+        credential = TokenCredential(self.server.url, "user", "pw", token_store=store)
+        access = credential.get_access_token()
+        self.assertEqual((self.logins(), self.server.count("POST", "/api/v1/auth/refresh")), (0, 1))
+        self.assertEqual(store.load(key), access)
+        credential.close()
+
+    def test_rejected_refresh_token(self):
+        """_summary_"""
+        self.server.token_expires_in = 10
+        credential = TokenCredential(self.server.url, "user", "pw", refresh_skew=30)
+        credential.get_access_token()
+        self.server.token_expires_in = 3600
+        self.server.fail_next(401, path="/api/v1/auth/refresh")
+        # the refresh token expired, the credential logs in again
+        access = credential.get_access_token()
+        self.assertEqual((self.logins(), self.server.count("POST", "/api/v1/auth/refresh")), (2, 1))
+        self.assertGreater(access.expires_on, time.time() + 600)
+        credential.close()
+
+    def test_revoked_token(self):
+        """_summary_"""
+        store = MemoryTokenStore()
+        store.save(TokenStore.key_for(self.server.url, "user"),
+                   AccessToken(create_token(), "refresh", int(time.time()) + 3600))
+        self.server.fail_next(401, path="/api/v1/models")
+        with AimanClient(host_url=self.server.url, user_name="user", password="pw", token_store=store) as client:
+            self.assertEqual(len(client.get_models()), 2)
+        self.assertEqual((self.logins(), self.server.count("GET", "/api/v1/models")), (1, 2))
+
+    def test_async_reuse(self):
+        """_summary_"""
+        store = MemoryTokenStore()
+
+        async def main():
+            for _ in range(2):
+                async with AsyncAimanClient(host_url=self.server.url, user_name="user", password="pw",
+                                            token_store=store) as client:
+                    await client.get_models()
+
+        asyncio.run(main())
+        self.assertEqual(self.logins(), 1)
+
+    def test_async_revoked_token(self):
+        """_summary_"""
+        store = ThreadRecordingStore()
+        key = TokenStore.key_for(self.server.url, "user")
+        store.save(key, AccessToken(create_token(), "revoked", int(time.time()) + 3600))
+        store.threads.clear()
+        self.server.fail_next(401, path="/api/v1/models")
+
+        async def main():
+            async with AsyncAimanClient(host_url=self.server.url, user_name="user", password="pw",
+                                        token_store=store) as client:
+                return await client.get_models()
+
+        self.assertEqual(len(asyncio.run(main())), 2)
+        self.assertEqual(self.logins(), 1)
+        # the event loop never waits for the store
+        self.assertNotIn(threading.main_thread(), store.threads)
+        self.assertTrue(store.threads)
+        self.assertEqual(store.load(key).refresh_token, "refresh")
+
+    def test_abstract(self):
+        """_summary_"""
+        with self.assertRaises(TypeError):
+            TokenStore()  # pylint: disable=abstract-class-instantiated
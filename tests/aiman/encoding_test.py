@@ -0,0 +1,69 @@
+"""encoding test module"""
+import base64
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from aiman.client import AimanClient
+from aiman.core.encoding import StreamingJsonBody, encode_base64, map_file
+from tests.aiman.fake_server import FakeAimanServer
+
+
+class EncodingTest(unittest.TestCase):
+    """_summary_
+
+    Args:
+        unittest (_type_): _description_
+    """
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, True)
+        self.file_path = os.path.join(self.directory, "report.pdf")
+        with open(self.file_path, "wb") as file:
+            file.write(os.urandom(100_001))
+
+    def test_streaming_body(self):
+        """_summary_"""
+        placeholder = StreamingJsonBody.placeholder()
+        payload = {"prompt": "summarize \"this\"", "attachments": [{"name": "report.pdf", "base64": placeholder}]}
+        body = StreamingJsonBody(payload, {placeholder: self.file_path}, chunk_size=1000)
+        encoded = b"".join(body)
+        self.assertEqual(len(body), len(encoded))
+        self.assertEqual(b"".join(body), encoded)
+        with open(self.file_path, "rb") as file:
+            expected = base64.b64encode(file.read()).decode()
+        self.assertEqual(json.loads(encoded)["attachments"][0]["base64"], expected)
+        self.assertTrue(all(len(chunk) <= 1336 for chunk in body))
+
+    def test_client_streams_attachments(self):
+        """_summary_"""
+        with FakeAimanServer() as server:
+            with AimanClient(host_url=server.url, user_name="user", password="pw",
+                             stream_attachments=True) as client:
+                response = client.prompt(model_tag_id=10, query="summarize", attachments=[self.file_path])
+                self.assertEqual(response["attachments"], ["report.pdf"])
+
+    def test_encode_base64(self):
+        """_summary_"""
+        with open(self.file_path, "rb") as file:
+            expected = base64.b64encode(file.read())
+        for window in (3, 1000, 1001, 1 << 20):
+            self.assertEqual(encode_base64(self.file_path, window=window), expected)
+        empty = os.path.join(self.directory, "empty.txt")
+        with open(empty, "wb"):
+            pass
+        self.assertEqual(encode_base64(empty), bytearray())
+        with map_file(empty) as content:
+            self.assertEqual(len(content), 0)
+
+    def test_client_sends_encoded_attachments(self):
+        """_summary_"""
+        with FakeAimanServer() as server:
+            with AimanClient(host_url=server.url, user_name="user", password="pw") as client:
+                files = {}
+                _, prompt_dict = client._build_prompt_request(  # pylint: disable=protected-access
+                    {"model_tag_id": 10, "query": "summarize", "attachments": [self.file_path]}, files=files)
+                self.assertIsInstance(files[prompt_dict["attachments"][0]["base64"]], bytearray)
+                response = client.prompt(model_tag_id=10, query="summarize", attachments=[self.file_path])
+                self.assertEqual(response["attachments"], ["report.pdf"])
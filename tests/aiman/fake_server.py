@@ -0,0 +1,338 @@
+"""Local stand-in for the AIMan API used by the client tests and benchmarks"""
+import gzip
+import hashlib
+import itertools
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import jwt
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+SECRET = "aiman-test-secret-with-32-bytes!!"
+
+
+def create_token(expires_in: int = 3600) -> str:
+    """Create a signed access token which expires in the given amount of seconds"""
+    return jwt.encode({"exp": int(time.time()) + expires_in}, SECRET, algorithm="HS256")
+
+
+def read_chunked(rfile) -> bytes:
+    """Read a request body sent with Transfer-Encoding: chunked"""
+    chunks = []
+    while True:
+        size = int(rfile.readline().split(b";")[0].strip(), 16)
+        chunk = rfile.read(size)
+        rfile.readline()
+        if size == 0:
+            return b"".join(chunks)
+        chunks.append(chunk)
+
+
+class _Server(ThreadingHTTPServer):
+    """Threading server whose listen backlog takes many clients connecting at once"""
+    daemon_threads = True
+    request_queue_size = 128
+
+
+class FakeAimanServer:
+    """Serves auth, models, prompts and datasources on a random local port
+
+    latency delays every answer, payload_size pads prompt answers to at least that many
+    characters and error_rate answers the given share of requests (besides auth) with 503.
+    """
+
+    def __init__(self, latency: float = 0.0, payload_size: int = 0, error_rate: float = 0.0, seed: int = 0) -> None:
+        self.latency = latency
+        self.payload_size = payload_size
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.token_expires_in = 3600
+        self.stream_format = "ndjson"
+        self.stream_delay = 0.0
+        self.calls = []
+        self.models = [
+            {"id": 1, "uuId": "uuid-1", "name": "llama3", "defaultModelTagId": 10},
+            {"id": 2, "uuId": "uuid-2", "name": "mistral", "defaultModelTagId": 20}
+        ]
+        self.models_etag = True
+        self.accept_encodings = {"gzip", "zstd"}
+        self.received = []
+        self.datasources = {}
+        self.uploads = {}
+        self._upload_ids = itertools.count(1)
+        self.failures = []
+        self.delays = []
+        self.lock = threading.Lock()
+        self._next_id = 1
+        self._httpd = _Server(("127.0.0.1", 0), self._handler_class())
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        """The base url of the server"""
+        return f"http://127.0.0.1:{self._httpd.server_address[1]}"
+
+    def start(self) -> "FakeAimanServer":
+        """Serve requests on a background thread"""
+        self._thread.start()
+        return self
+
+    def close(self) -> None:
+        """Stop serving and release the port"""
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "FakeAimanServer":
+        return self.start()
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def fail_next(self, status: int, count: int = 1, path: str = "", headers: dict = None, method: str = None) -> None:
+        """Answer the next matching requests with an error status"""
+        with self.lock:
+            for _ in range(count):
+                self.failures.append((path, status, headers or {}, method))
+
+    def delay_next(self, seconds: float, count: int = 1, path: str = "") -> None:
+        """Answer the next matching requests seconds later"""
+        with self.lock:
+            self.delays.extend([(path, seconds)] * count)
+
+    def _take_delay(self, path: str) -> float:
+        with self.lock:
+            for delay in self.delays:
+                if path.startswith(delay[0]):
+                    self.delays.remove(delay)
+                    return delay[1]
+        return 0.0
+
+    def add_datasource(self, name: str = "source", status: int = 2, media: list = None) -> int:
+        """Add a datasource and return its id"""
+        with self.lock:
+            datasource_id = self._next_id
+            self._next_id += 1
+            self.datasources[datasource_id] = {
+                "id": datasource_id, "name": name, "summary": f"{name} summary", "categories": [], "tags": [],
+                "assocContexts": [], "media": media or [], "status": status, "mediaCount": len(media or []),
+                "ownerId": 1}
+        return datasource_id
+
+    def count(self, method: str, path: str = "") -> int:
+        """Count the received requests by method and path prefix"""
+        return sum(1 for call in self.calls if call[0] == method and call[1].startswith(path))
+
+    def _take_failure(self, method: str, path: str):
+        with self.lock:
+            for failure in self.failures:
+                if path.startswith(failure[0]) and failure[3] in (None, method):
+                    self.failures.remove(failure)
+                    return failure
+            if self.error_rate and "/auth/" not in path and self.random.random() < self.error_rate:
+                return path, 503, {"Retry-After": "0"}, method
+        return None
+
+    def handle(self, method: str, path: str, body) -> tuple:
+        """Dispatch a request and return status and data"""
+        if path.startswith("/api/v1/uploads"):
+            return self.handle_upload(method, path, body)
+        missing = self.missing_uploads(body)
+        if missing:
+            return 400, {"message": f"uploads not complete: {missing}"}
+        if path.endswith("/auth/authenticate") or path.endswith("/auth/refresh"):
+            return 200, {"access_token": create_token(self.token_expires_in), "refresh_token": "refresh"}
+        if path == "/api/v1/models":
+            return 200, {"Models": self.models}
+        match = re.fullmatch(r"/api/v1/prompts/(\d+)", path)
+        if match and method == "POST":
+            return 200, self.answer_prompt(int(match.group(1)), body)
+        if path == "/api/v1/datasources":
+            if method == "GET":
+                summaries = [{key: value for key, value in source.items() if key != "media"}
+                             for source in self.datasources.values()]
+                return 200, {"datasources": summaries}
+            datasource_id = self.add_datasource(name=body["name"], status=0)
+            return 201, {"datasource": self.datasources[datasource_id]}
+        match = re.fullmatch(r"/api/v1/datasources/(\d+)", path)
+        if match and int(match.group(1)) in self.datasources:
+            datasource = self.datasources[int(match.group(1))]
+            if method == "GET":
+                return 200, {"datasource": datasource}
+            if method == "DELETE":
+                del self.datasources[datasource["id"]]
+                return 200, {}
+            if method == "PUT":
+                with self.lock:
+                    datasource["media"] = datasource["media"] + [
+                        {"name": media["name"], "size": media["size"]} for media in body["media"]]
+                    datasource["mediaCount"] = len(datasource["media"])
+                return 200, {"datasource": datasource}
+        return 404, {"message": "not found"}
+
+    def handle_upload(self, method: str, path: str, body) -> tuple:
+        """Create, complete and report chunked uploads"""
+        if path == "/api/v1/uploads" and method == "POST":
+            with self.lock:
+                upload_id = f"upload-{next(self._upload_ids)}"
+                self.uploads[upload_id] = {
+                    "id": upload_id, "name": body["name"], "size": body["size"], "partSize": body["partSize"],
+                    "parts": 0, "bytes": 0, "complete": False, "digest": hashlib.sha256()}
+            return 201, {"upload": self.upload_state(upload_id)}
+        match = re.fullmatch(r"/api/v1/uploads/([\w-]+)(/complete)?", path)
+        if match is None or match.group(1) not in self.uploads:
+            return 404, {"message": "upload not found"}
+        upload = self.uploads[match.group(1)]
+        if match.group(2) and method == "POST":
+            if upload["parts"] != body["parts"] or upload["bytes"] != upload["size"]:
+                return 409, {"message": "upload incomplete"}
+            upload["complete"] = True
+        return 200, {"upload": self.upload_state(upload["id"])}
+
+    def receive_part(self, path: str, raw: bytes, checksum: str) -> tuple:
+        """Take a part of a chunked upload, parts need to arrive in order"""
+        upload_id, index = re.fullmatch(r"/api/v1/uploads/([\w-]+)/parts/(\d+)", path).groups()
+        upload = self.uploads.get(upload_id)
+        if upload is None:
+            return 404, {"message": "upload not found"}
+        if checksum != hashlib.sha256(raw).hexdigest():
+            return 400, {"message": "checksum mismatch"}
+        with self.lock:
+            if int(index) > upload["parts"]:
+                return 409, {"message": f"expected part {upload['parts']}"}
+            if int(index) == upload["parts"]:
+                upload["digest"].update(raw)
+                upload["parts"] += 1
+                upload["bytes"] += len(raw)
+        return 200, {"upload": self.upload_state(upload_id)}
+
+    def upload_state(self, upload_id: str) -> dict:
+        """The public state of an upload"""
+        upload = self.uploads[upload_id]
+        return {key: upload[key] for key in ("id", "name", "size", "partSize", "parts", "complete")}
+
+    def missing_uploads(self, body) -> list:
+        """The upload ids referenced by a prompt or datasource which are not complete"""
+        if not isinstance(body, dict):
+            return []
+        medias = (body.get("attachments") or []) + (body.get("media") or [])
+        return [media["uploadId"] for media in medias if isinstance(media, dict) and "uploadId" in media
+                and not self.uploads.get(media["uploadId"], {}).get("complete")]
+
+    def answer_prompt(self, model_tag_id: int, body: dict) -> dict:
+        """Build the answer of a prompt"""
+        attachments = body.get("attachments") or []
+        answer = f"echo: {body['prompt']}"
+        return {
+            "responseText": answer.ljust(self.payload_size, "."),
+            "modelTagId": model_tag_id,
+            "datasourceId": body.get("datasourceId"),
+            "attachments": [attachment["name"] for attachment in attachments]
+        }
+
+    def stream_events(self, body: dict) -> list:
+        """Split the answer of a streamed prompt into encoded chunks"""
+        words = f"echo: {body['prompt']}".split(" ")
+        deltas = [word if index == 0 else f" {word}" for index, word in enumerate(words)]
+        if self.stream_format == "text":
+            return [delta.encode("utf-8") for delta in deltas]
+        events = [{"responseText": delta, "done": False} for delta in deltas]
+        events.append({"responseText": "", "done": True})
+        if self.stream_format == "sse":
+            return [f"data: {json.dumps(event)}\n\n".encode("utf-8") for event in events] + [b"data: [DONE]\n\n"]
+        return [f"{json.dumps(event)}\n".encode("utf-8") for event in events]
+
+    def _handler_class(self):  # pylint: disable=too-many-statements
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            """Request handler delegating to the fake server"""
+            protocol_version = "HTTP/1.1"
+            # send headers and body in one segment, small writes would wait for delayed acks
+            wbufsize = -1
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):  # pylint: disable=arguments-differ
+                pass
+
+            def _dispatch(self):
+                raw = self._read_body()
+                path = self.path.split("?")[0]
+                encoding = self.headers.get("Content-Encoding")
+                with server.lock:
+                    server.calls.append((self.command, path))
+                    server.received.append((self.command, path, encoding, len(raw)))
+                if encoding is not None:
+                    if encoding not in server.accept_encodings:
+                        self._send(415, {"message": f"unsupported content encoding {encoding}"})
+                        return
+                    raw = gzip.decompress(raw) if encoding == "gzip" else zstandard.decompress(raw)
+                delay = server.latency + server._take_delay(path)  # pylint: disable=protected-access
+                if delay:
+                    time.sleep(delay)
+                failure = server._take_failure(self.command, path)  # pylint: disable=protected-access
+                if failure is not None:
+                    self._send(failure[1], {"message": "injected failure"}, failure[2])
+                    return
+                if "/parts/" in path and path.startswith("/api/v1/uploads/"):
+                    status, data = server.receive_part(path, raw, self.headers.get("X-Content-SHA256"))
+                    self._send(status, {"messageContent": {"data": data}})
+                    return
+                body = json.loads(raw) if raw else None
+                if self.command == "GET" and path == "/api/v1/models" and server.models_etag:
+                    self._send_models()
+                    return
+                if isinstance(body, dict) and body.get("stream") and path.startswith("/api/v1/prompts/"):
+                    self._send_chunked(server.stream_events(body))
+                    return
+                status, data = server.handle(self.command, path, body)
+                self._send(status, {"messageContent": {"data": data}})
+
+            def _read_body(self) -> bytes:
+                if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+                    return read_chunked(self.rfile)
+                length = int(self.headers.get("Content-Length") or 0)
+                return self.rfile.read(length) if length else b""
+
+            def _send(self, status: int, payload: dict, headers: dict = None):
+                encoded = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(encoded)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(encoded)
+
+            def _send_models(self):
+                payload = {"messageContent": {"data": {"Models": server.models}}}
+                etag = '"' + hashlib.sha256(json.dumps(payload).encode("utf-8")).hexdigest()[:16] + '"'
+                if self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+                self._send(200, payload, {"ETag": etag})
+
+            def _send_chunked(self, chunks: list):
+                content_types = {"sse": "text/event-stream", "text": "text/plain; charset=utf-8"}
+                self.send_response(200)
+                self.send_header("Content-Type", content_types.get(server.stream_format, "application/x-ndjson"))
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                for chunk in chunks:
+                    self.wfile.write(f"{len(chunk):x}\r\n".encode("ascii") + chunk + b"\r\n")
+                    self.wfile.flush()
+                    if server.stream_delay:
+                        time.sleep(server.stream_delay)
+                self.wfile.write(b"0\r\n\r\n")
+                self.wfile.flush()
+
+            do_GET = do_POST = do_PUT = do_DELETE = _dispatch
+
+        return Handler
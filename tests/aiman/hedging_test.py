@@ -0,0 +1,226 @@
+"""hedged request test module"""
+import asyncio
+import threading
+import time
+import unittest
+import requests
+from aiman.client import AimanClient, AsyncAimanClient
+from aiman.core.credentials import TokenCredential
+from aiman.core.classes import PromptOptions, RequestType
+from aiman.core.hedging import HedgePolicy, HedgeTracker
+from aiman.core.instrumentation import Observer, RequestEvent
+from tests.aiman.fake_server import FakeAimanServer
+
+PROMPTS = "/api/v1/prompts/"
+DETERMINISTIC = PromptOptions(temperature=0, seed=42)
+
+
+class EventObserver(Observer):
+    """Keeps the received events"""
+
+    def __init__(self):
+        self.events = []
+
+    def request_finished(self, event: RequestEvent) -> None:
+        self.events.append(event)
+
+
+class HedgeTrackerTest(unittest.TestCase):
+    """_summary_
+
+    Args:
+        unittest (_type_): _description_
+    """
+    def test_delay(self):
+        """_summary_"""
+        tracker = HedgeTracker(HedgePolicy(initial_delay=2.0, min_samples=10, percentile=0.9, budget=1.0))
+        self.assertEqual(tracker.delay(), 2.0)
+        for millis in range(1, 101):
+            tracker.record(millis / 1000)
+        self.assertAlmostEqual(tracker.delay(), 0.09)
+        # a single outlier barely moves the percentile
+        tracker.record(120.0)
+        self.assertAlmostEqual(tracker.delay(), 0.091)
+
+    def test_bounds_and_budget(self):
+        """_summary_"""
+        tracker = HedgeTracker(HedgePolicy(min_samples=1, min_delay=0.5, max_delay=1.0, budget=0.5))
+        tracker.record(0.1)
+        self.assertEqual(tracker.delay(), 0.5)
+        tracker.hedged(True)
+        # one of two calls was hedged already
+        self.assertIsNone(tracker.delay())
+        tracker.record(5.0)
+        tracker.record(5.0)
+        self.assertEqual(tracker.delay(), 1.0)
+        self.assertEqual(tracker.stats().calls, 3)
+
+    def test_applies(self):
+        """_summary_"""
+        policy = HedgePolicy()
+        options = DETERMINISTIC.to_dict()
+        self.assertTrue(policy.applies(RequestType.POST, "/api/v1/prompts/10", options))
+        self.assertFalse(policy.applies(RequestType.GET, "/api/v1/models", None))
+        self.assertFalse(policy.applies(RequestType.POST, "/api/v1/datasources", options))
+        # prompts which may answer differently are never sent twice
+        self.assertFalse(policy.applies(RequestType.POST, "/api/v1/prompts/10", PromptOptions().to_dict()))
+        self.assertFalse(policy.applies(RequestType.POST, "/api/v1/prompts/10", None))
+
+
+class HedgedClientTest(unittest.TestCase):
+    """_summary_
+
+    Args:
+        unittest (_type_): _description_
+    """
+    def setUp(self):
+        self.server = FakeAimanServer().start()
+        self.addCleanup(self.server.close)
+        self.policy = HedgePolicy(initial_delay=0.05, budget=1.0)
+
+    def client(self, policy: HedgePolicy = None, observer: Observer = None) -> AimanClient:
+        """Create a hedging client closed after the test"""
+        client = AimanClient(host_url=self.server.url, user_name="user", password="pw",
+                             hedge_policy=policy or self.policy, observer=observer)
+        self.addCleanup(client.close)
+        return client
+
+    def test_hedge_wins(self):
+        """_summary_"""
+        client = self.client()
+        self.server.delay_next(0.5, path=PROMPTS)
+        started = time.perf_counter()
+        response = client.prompt(model_tag_id=10, query="hello", prompt_options=DETERMINISTIC)
+        self.assertEqual(response["responseText"], "echo: hello")
+        self.assertLess(time.perf_counter() - started, 0.4)
+        self.assertEqual(self.server.count("POST", PROMPTS), 2)
+        stats = client.hedge_stats()
+        self.assertEqual((stats.calls, stats.hedged, stats.hedge_wins), (1, 1, 1))
+        # the slow request was aborted, it had run at least the hedge delay longer
+        self.assertGreaterEqual(stats.saved_seconds, 0.05)
+        self.assertLess(stats.saved_seconds, 0.5)
+
+    def test_loser_connection_is_released(self):
+        """_summary_"""
+        client = self.client()
+        self.server.delay_next(2.0, path=PROMPTS)
+        client.prompt(model_tag_id=10, query="hello", prompt_options=DETERMINISTIC)
+        # the pool holds no connection of the aborted request, the next calls do not wait for it
+        started = time.perf_counter()
+        for _ in range(3):
+            client.prompt(model_tag_id=10, query="hello", prompt_options=DETERMINISTIC)
+        self.assertLess(time.perf_counter() - started, 1.0)
+        self.assertEqual(client.hedge_stats().hedged, 1)
+
+    def test_session_without_abort(self):
+        """_summary_"""
+        session = requests.Session()
+        self.addCleanup(session.close)
+        credential = TokenCredential(api_host_url=self.server.url, user_name="user", password="pw", session=session)
+        client = AimanClient(token_credential=credential, hedge_policy=self.policy)
+        self.addCleanup(client.close)
+        self.server.delay_next(0.3, path=PROMPTS)
+        client.prompt(model_tag_id=10, query="hello", prompt_options=DETERMINISTIC)
+        # the request runs to its end, the hedge won by the time in between
+        stats = client.hedge_stats()
+        self.assertEqual(stats.hedge_wins, 1)
+        self.assertGreater(stats.saved_seconds, 0.1)
+
+    def test_not_deterministic_is_not_hedged(self):
+        """_summary_"""
+        client = self.client()
+        self.server.delay_next(0.2, path=PROMPTS)
+        client.prompt(model_tag_id=10, query="hello")
+        self.assertEqual(self.server.count("POST", PROMPTS), 1)
+        self.assertEqual(client.hedge_stats().calls, 0)
+
+    def test_queued_prompts_are_not_hedged(self):
+        """_summary_"""
+        client = self.client(HedgePolicy(initial_delay=0.45, budget=1.0))
+        self.server.latency = 0.3
+        threads = [threading.Thread(target=client.prompt, kwargs={
+            "model_tag_id": 10, "query": "hello", "prompt_options": DETERMINISTIC}) for _ in range(40)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(client.hedge_stats().hedged, 0)
+
+    def test_observed(self):
+        """_summary_"""
+        observer = EventObserver()
+        client = self.client(observer=observer)
+        self.server.delay_next(0.5, path=PROMPTS)
+        client.prompt(model_tag_id=10, query="hello", prompt_options=DETERMINISTIC)
+        event = observer.events[-1]
+        # both requests of the call count, the phases of the winner are known once it returns
+        self.assertEqual((event.status_code, event.attempts), (200, 2))
+        names = [phase[0] for phase in event.phases]
+        for name in ("encode", "ttfb", "download", "decode"):
+            self.assertIn(name, names)
+        self.assertEqual(event.phases, sorted(event.phases, key=lambda phase: phase[1]))
+
+    def test_fast_prompt_is_not_hedged(self):
+        """_summary_"""
+        client = self.client()
+        for _ in range(3):
+            client.prompt(model_tag_id=10, query="hello", prompt_options=DETERMINISTIC)
+        client.get_models()
+        self.assertEqual(self.server.count("POST", PROMPTS), 3)
+        stats = client.hedge_stats()
+        self.assertEqual((stats.calls, stats.hedged), (3, 0))
+
+    def test_datasource_prompt(self):
+        """_summary_"""
+        client = self.client()
+        datasource_id = self.server.add_datasource()
+        self.server.delay_next(0.5, path=PROMPTS)
+        client.prompt_on_datasource(
+            datasource_id=datasource_id, model_tag_id=10, query="hello", prompt_options=DETERMINISTIC)
+        self.assertEqual(client.hedge_stats().hedge_wins, 1)
+
+    def test_budget(self):
+        """_summary_"""
+        client = self.client(HedgePolicy(initial_delay=0.05, budget=0.0))
+        self.server.delay_next(0.2, path=PROMPTS)
+        client.prompt(model_tag_id=10, query="hello", prompt_options=DETERMINISTIC)
+        self.assertEqual(self.server.count("POST", PROMPTS), 1)
+        self.assertEqual(client.hedge_stats().hedged, 0)
+
+    def test_hedge_error_loses(self):
+        """_summary_"""
+        client = self.client()
+        self.server.delay_next(0.2, path=PROMPTS)
+        self.server.fail_next(500, path=PROMPTS)
+        # the slow request answers, the failing hedge does not win the race
+        response = client.prompt(model_tag_id=10, query="hello", prompt_options=DETERMINISTIC)
+        self.assertEqual(response["responseText"], "echo: hello")
+        stats = client.hedge_stats()
+        self.assertEqual((stats.hedged, stats.hedge_wins), (1, 0))
+
+    def test_without_policy(self):
+        """_summary_"""
+        with AimanClient(host_url=self.server.url, user_name="user", password="pw") as client:
+            client.prompt(model_tag_id=10, query="hello", prompt_options=DETERMINISTIC)
+            self.assertEqual(client.hedge_stats().calls, 0)
+
+    def test_async(self):
+        """_summary_"""
+        self.server.delay_next(0.5, path=PROMPTS)
+
+        observer = EventObserver()
+
+        async def run():
+            async with AsyncAimanClient(host_url=self.server.url, user_name="user", password="pw",
+                                        hedge_policy=self.policy, observer=observer) as client:
+                started = time.perf_counter()
+                result = await client.prompt(model_tag_id=10, query="hello", prompt_options=DETERMINISTIC)
+                return result, time.perf_counter() - started, client.hedge_stats()
+
+        result, seconds, stats = asyncio.run(run())
+        self.assertEqual(result["responseText"], "echo: hello")
+        self.assertLess(seconds, 0.4)
+        self.assertEqual((stats.hedged, stats.hedge_wins), (1, 1))
+        self.assertGreaterEqual(stats.saved_seconds, 0.05)
+        self.assertEqual(observer.events[-1].attempts, 2)
+        self.assertIn("send", [phase[0] for phase in observer.events[-1].phases])
@@ -0,0 +1,163 @@
+"""multi host client test module"""
+import asyncio
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from aiman.client import AimanClient, AsyncAimanClient
+from aiman.core.hosts import LATENCY_WEIGHTED, HostAttempt, HostPool
+from aiman.core.retry import RetryPolicy
+from tests.aiman.fake_server import FakeAimanServer
+
+MODELS = "/api/v1/models"
+AUTH = "/api/v1/auth/authenticate"
+FIRST, SECOND = "http://127.0.0.1:1", "http://127.0.0.1:2"
+
+
+def stopped_url() -> str:
+    """Get the url of a server which is not listening anymore"""
+    with FakeAimanServer() as server:
+        return server.url
+
+
+class HostPoolTest(unittest.TestCase):
+    """_summary_
+
+    Args:
+        unittest (_type_): _description_
+    """
+    def test_least_outstanding(self):
+        """_summary_"""
+        pool = HostPool([FIRST, SECOND])
+        first, second = pool.choose(), pool.choose()
+        self.assertNotEqual(first, second)
+        pool.finish(first, 0.01, False)
+        self.assertEqual(pool.choose(), first)
+
+    def test_latency_weighted(self):
+        """_summary_"""
+        pool = HostPool([FIRST, SECOND], strategy=LATENCY_WEIGHTED)
+        for url, seconds in ((FIRST, 0.1), (SECOND, 0.01)):
+            pool.finish(pool.choose({FIRST, SECOND} - {url}), seconds, False)
+        self.assertEqual([pool.choose() for _ in range(9)], [SECOND] * 9)
+        # the slow host is used once the fast one has about ten times as many requests in flight
+        self.assertIn(FIRST, {pool.choose(), pool.choose()})
+
+    def test_eject_and_probe(self):
+        """_summary_"""
+        pool = HostPool([FIRST, SECOND], failure_threshold=2, eject_seconds=0.05)
+        for _ in range(2):
+            with self.assertRaises(OSError), HostAttempt(pool, {SECOND}):
+                raise OSError("refused")
+        stats = {host.url: host for host in pool.stats()}
+        self.assertTrue(stats[FIRST].ejected)
+        self.assertEqual(stats[FIRST].ejections, 1)
+        self.assertEqual({pool.choose() for _ in range(3)}, {SECOND})
+        time.sleep(0.06)
+        # a single probe goes to the ejected host, a success reinstates it
+        self.assertEqual(pool.choose(), FIRST)
+        self.assertEqual(pool.choose(), SECOND)
+        pool.finish(FIRST, 0.01, False)
+        self.assertFalse(pool.stats()[0].ejected)
+
+    def test_failed_probe(self):
+        """_summary_"""
+        pool = HostPool([FIRST], failure_threshold=5, eject_seconds=0.05)
+        with HostAttempt(pool) as target:
+            target.status_code = 503
+        self.assertFalse(pool.stats()[0].ejected)
+        pool.hosts[FIRST].ejected_until = time.monotonic()
+        with HostAttempt(pool) as target:
+            target.status_code = 502
+        stats = pool.stats()[0]
+        self.assertTrue(stats.ejected)
+        self.assertEqual((stats.failures, stats.outstanding), (2, 0))
+
+    def test_invalid(self):
+        """_summary_"""
+        with self.assertRaises(ValueError):
+            HostPool([])
+        with self.assertRaises(ValueError):
+            HostPool([FIRST], strategy="random")
+
+
+class MultiHostClientTest(unittest.TestCase):
+    """_summary_
+
+    Args:
+        unittest (_type_): _description_
+    """
+    def setUp(self):
+        self.servers = [FakeAimanServer(latency=0.02).start() for _ in range(2)]
+        for server in self.servers:
+            self.addCleanup(server.close)
+
+    def test_spread_and_tokens(self):
+        """_summary_"""
+        with AimanClient(host_url=[server.url for server in self.servers], user_name="user",
+                         password="pw") as client:
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                results = list(executor.map(lambda _: client.get_models(), range(32)))
+        self.assertEqual(len(results), 32)
+        for server in self.servers:
+            self.assertGreater(server.count("GET", MODELS), 4)
+            # every host has its own token
+            self.assertEqual(server.count("POST", AUTH), 1)
+
+    def test_failover(self):
+        """_summary_"""
+        down = stopped_url()
+        pool = HostPool([down, self.servers[0].url], failure_threshold=1)
+        with AimanClient(host_url=pool, user_name="user", password="pw",
+                         retry_policy=RetryPolicy.disabled()) as client:
+            for _ in range(3):
+                # a prompt is not idempotent, it fails over because it never reached the down host
+                self.assertEqual(client.prompt(model_tag_id=10, query="hello")["responseText"], "echo: hello")
+            stats = {host.url: host for host in client.host_stats()}
+        self.assertTrue(stats[down].ejected)
+        self.assertEqual(stats[down].requests, 1)
+        self.assertEqual(self.servers[0].count("POST", "/api/v1/prompts/"), 3)
+
+    def test_eject_on_errors(self):
+        """_summary_"""
+        failing, healthy = self.servers
+        failing.fail_next(503, count=10, path=MODELS)
+        pool = HostPool([failing.url, healthy.url], failure_threshold=2, eject_seconds=60)
+        with AimanClient(host_url=pool, user_name="user", password="pw",
+                         retry_policy=RetryPolicy(backoff_factor=0)) as client:
+            for _ in range(6):
+                client.get_models()
+        self.assertEqual(failing.count("GET", MODELS), 2)
+        self.assertEqual(healthy.count("GET", MODELS), 6)
+        self.assertTrue(pool.stats()[0].ejected)
+
+    def test_latency_weighted(self):
+        """_summary_"""
+        slow, fast = self.servers
+        slow.latency, fast.latency = 0.05, 0.0
+        pool = HostPool([slow.url, fast.url], strategy=LATENCY_WEIGHTED)
+        with AimanClient(host_url=pool, user_name="user", password="pw") as client:
+            for _ in range(20):
+                client.get_models()
+        self.assertLessEqual(slow.count("GET", MODELS), 2)
+
+    def test_single_host(self):
+        """_summary_"""
+        with AimanClient(host_url=self.servers[0].url, user_name="user", password="pw") as client:
+            client.get_models()
+            self.assertIsNone(client.host_pool)
+            self.assertEqual(client.host_stats(), [])
+
+    def test_async(self):
+        """_summary_"""
+        down = stopped_url()
+
+        async def run():
+            pool = HostPool([down] + [server.url for server in self.servers], failure_threshold=1)
+            async with AsyncAimanClient(host_url=pool, user_name="user", password="pw") as client:
+                return await asyncio.gather(*[client.prompt(model_tag_id=7, query=f"q{i}") for i in range(24)])
+
+        results = asyncio.run(run())
+        self.assertEqual(len(results), 24)
+        for server in self.servers:
+            self.assertGreater(server.count("POST", "/api/v1/prompts/"), 0)
+            self.assertEqual(server.count("POST", AUTH), 1)
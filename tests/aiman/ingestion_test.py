@@ -0,0 +1,66 @@
+"""ingestion test module"""
+import os
+import shutil
+import tempfile
+import unittest
+from aiman.client import AimanClient
+from tests.aiman.fake_server import FakeAimanServer
+
+
+class IngestionTest(unittest.TestCase):
+    """_summary_
+
+    Args:
+        unittest (_type_): _description_
+    """
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, True)
+        self.paths = []
+        for index in range(6):
+            path = os.path.join(self.directory, f"document_{index}.txt")
+            with open(path, "wb") as file:
+                file.write(os.urandom(999))
+            self.paths.append(path)
+        self.server = FakeAimanServer().start()
+        self.addCleanup(self.server.close)
+        self.client = AimanClient(host_url=self.server.url, user_name="user", password="pw")
+        self.addCleanup(self.client.close)
+        self.datasource_id = self.server.add_datasource(media=[{"name": "document_0.txt", "size": 1}])
+
+    def test_chunked_ingestion(self):
+        """_summary_"""
+        events = []
+        summary = self.client.ingest_documents(
+            self.datasource_id, self.paths + ["https://www.brandcompete.com"],
+            max_chunk_bytes=3000, progress=events.append)
+        self.assertEqual((summary.files_total, summary.files_skipped, summary.files_uploaded), (7, 1, 6))
+        self.assertEqual(summary.chunks, 3)
+        self.assertEqual(summary.bytes_uploaded, 5 * 1332)
+        self.assertGreater(summary.bytes_per_second, 0)
+        self.assertEqual(self.server.count("PUT"), 3)
+        self.assertEqual([event.status for event in events].count("uploaded"), 6)
+        self.assertEqual(events[-1].files_done, 7)
+        self.assertEqual(len(self.server.datasources[self.datasource_id]["media"]), 7)
+
+    def test_resume_after_failure(self):
+        """_summary_"""
+        self.server.fail_next(500, path="/api/v1/datasources/", method="PUT")
+        with self.assertRaises(RuntimeError):
+            self.client.ingest_documents(self.datasource_id, self.paths, max_chunk_bytes=3000)
+        summary = self.client.ingest_documents(self.datasource_id, self.paths, max_chunk_bytes=3000)
+        self.assertEqual((summary.files_skipped, summary.files_uploaded), (1, 5))
+        summary = self.client.ingest_documents(self.datasource_id, self.paths)
+        self.assertEqual((summary.files_skipped, summary.files_uploaded, summary.chunks), (6, 0, 0))
+
+    def test_process_pool(self):
+        """_summary_"""
+        datasource_id = self.server.add_datasource()
+        summary = self.client.ingest_documents(datasource_id, self.paths, max_workers=2, use_processes=True)
+        self.assertEqual((summary.files_uploaded, summary.chunks), (6, 1))
+
+    def test_unsupported_file_type(self):
+        """_summary_"""
+        with self.assertRaises(ValueError):
+            self.client.ingest_documents(self.datasource_id, self.paths + ["setup.exe"])
+        self.assertEqual(self.server.count("PUT"), 0)
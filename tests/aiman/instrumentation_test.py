@@ -0,0 +1,144 @@
+"""instrumentation test module"""
+import os
+import tempfile
+import unittest
+import httpx
+from aiman.client import AimanClient, AsyncAimanClient
+from aiman.core.exceptions import ServerError
+from aiman.core.instrumentation import (
+    MultiObserver, Observer, OpenTelemetryObserver, PrometheusObserver, RequestEvent)
+from aiman.core.retry import RetryPolicy
+from tests.aiman.fake_server import FakeAimanServer, create_token
+try:
+    import prometheus_client
+except ImportError:
+    prometheus_client = None
+try:
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+    from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+except ImportError:
+    TracerProvider = None
+
+
+class RecordingObserver(Observer):
+    """Keeps the received events"""
+
+    def __init__(self):
+        self.events = []
+        self.operations = []
+
+    def request_finished(self, event: RequestEvent) -> None:
+        self.events.append(event)
+
+    def operation_finished(self, name: str, seconds: float, labels: dict) -> None:
+        self.operations.append((name, labels))
+
+
+class InstrumentationTest(unittest.TestCase):
+    """_summary_
+
+    Args:
+        unittest (_type_): _description_
+    """
+    def setUp(self):
+        self.observer = RecordingObserver()
+        self.server = FakeAimanServer().start()
+        self.addCleanup(self.server.close)
+        self.client = AimanClient(
+            host_url=self.server.url, user_name="user", password="pw", observer=self.observer,
+            retry_policy=RetryPolicy(backoff_factor=0.01, retry_prompts=True))
+        self.addCleanup(self.client.close)
+
+    def test_prompt_phases(self):
+        """_summary_"""
+        self.client.prompt(model_tag_id=10, query="hello")
+        event = self.observer.events[-1]
+        self.assertEqual((event.method, event.status_code, event.attempts), ("POST", 200, 1))
+        self.assertEqual(event.route_template, "/api/v1/prompts/{model_tag_id}")
+        self.assertEqual(event.model_tag_id, 10)
+        names = [phase[0] for phase in event.phases]
+        for name in ("token", "encode", "ttfb", "download", "decode"):
+            self.assertIn(name, names)
+        self.assertGreater(event.request_bytes, 0)
+        self.assertGreater(event.response_bytes, 0)
+        self.assertGreaterEqual(event.duration, event.seconds("ttfb"))
+
+    def test_route_template(self):
+        """_summary_"""
+        self.assertEqual(RequestEvent(route="/api/v1/datasources/42").route_template, "/api/v1/datasources/{id}")
+        self.assertIsNone(RequestEvent(route="/api/v1/datasources/42").model_tag_id)
+
+    def test_retries_and_errors(self):
+        """_summary_"""
+        self.server.fail_next(503, path="/api/v1/prompts")
+        self.client.prompt(model_tag_id=10, query="hello")
+        event = self.observer.events[-1]
+        self.assertEqual((event.status_code, event.attempts), (200, 2))
+        self.assertEqual(len([phase for phase in event.phases if phase[0] == "backoff"]), 1)
+        self.server.fail_next(503, count=3, path="/api/v1/prompts")
+        with self.assertRaises(ServerError):
+            self.client.prompt(model_tag_id=10, query="hello")
+        event = self.observer.events[-1]
+        self.assertEqual((event.status_code, event.attempts), (503, 3))
+        self.assertIsInstance(event.error, ServerError)
+
+    def test_encode_attachments(self):
+        """_summary_"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "notes.txt")
+            with open(path, "w", encoding="utf-8") as file:
+                file.write("notes")
+            self.client.prompt(model_tag_id=10, query="summarize", attachments=[path])
+        self.assertEqual(self.observer.operations, [("encode_attachments", {"files": "1", "streamed": "false"})])
+
+    @unittest.skipIf(prometheus_client is None, "prometheus_client is not installed")
+    def test_prometheus(self):
+        """_summary_"""
+        registry = prometheus_client.CollectorRegistry()
+        self.client.observer = MultiObserver(self.observer, PrometheusObserver(registry=registry))
+        self.client.prompt(model_tag_id=10, query="hello")
+        self.client.get_models()
+        labels = {"method": "POST", "route": "/api/v1/prompts/{model_tag_id}", "status": "200", "model_tag_id": "10"}
+        self.assertEqual(registry.get_sample_value("aiman_requests_total", labels), 1.0)
+        labels = {"method": "GET", "route": "/api/v1/models", "phase": "ttfb"}
+        self.assertEqual(registry.get_sample_value("aiman_request_phase_seconds_count", labels), 1.0)
+        self.assertEqual(len(self.observer.events), 2)
+
+    @unittest.skipIf(TracerProvider is None, "opentelemetry-sdk is not installed")
+    def test_opentelemetry(self):
+        """_summary_"""
+        exporter = InMemorySpanExporter()
+        provider = TracerProvider()
+        provider.add_span_processor(SimpleSpanProcessor(exporter))
+        self.client.observer = OpenTelemetryObserver(tracer=provider.get_tracer("test"))
+        self.client.prompt(model_tag_id=10, query="hello")
+        spans = {span.name: span for span in exporter.get_finished_spans()}
+        parent = spans["POST /api/v1/prompts/{model_tag_id}"]
+        self.assertEqual(parent.attributes["http.response.status_code"], 200)
+        self.assertEqual(spans["ttfb"].parent.span_id, parent.context.span_id)
+        self.assertGreaterEqual(spans["ttfb"].start_time, parent.start_time)
+
+
+class AsyncInstrumentationTest(unittest.IsolatedAsyncioTestCase):
+    """_summary_
+
+    Args:
+        unittest (_type_): _description_
+    """
+    async def test_prompt(self):
+        """_summary_"""
+        def handler(request: httpx.Request) -> httpx.Response:
+            if request.url.path.endswith("auth/authenticate"):
+                tokens = {"access_token": create_token(), "refresh_token": "refresh"}
+                return httpx.Response(200, json={"messageContent": {"data": tokens}})
+            return httpx.Response(200, json={"messageContent": {"data": {"responseText": "ok"}}})
+
+        observer = RecordingObserver()
+        transport = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        async with AsyncAimanClient(host_url="https://aiman.test", user_name="user", password="pw",
+                                    client=transport, observer=observer) as client:
+            await client.prompt(model_tag_id=7, query="hello")
+        event = observer.events[-1]
+        self.assertEqual((event.method, event.status_code, event.model_tag_id), ("POST", 200, 7))
+        self.assertIn("encode", [phase[0] for phase in event.phases])
@@ -0,0 +1,99 @@
+"""datasource readiness test module"""
+import asyncio
+import threading
+import time
+import unittest
+import httpx
+from aiman.client import AimanClient, AsyncAimanClient
+from aiman.core.exceptions import AimanError
+from aiman.core.readiness import ReadinessTracker
+from tests.aiman.fake_server import FakeAimanServer, create_token
+
+
+class ReadinessTest(unittest.TestCase):
+    """_summary_
+
+    Args:
+        unittest (_type_): _description_
+    """
+    def setUp(self):
+        self.server = FakeAimanServer().start()
+        self.addCleanup(self.server.close)
+        self.client = AimanClient(host_url=self.server.url, user_name="user", password="pw")
+        self.addCleanup(self.client.close)
+
+    def ready_later(self, datasource_id: int, delay: float):
+        """Set the status of a datasource to ready after the delay"""
+        def update():
+            self.server.datasources[datasource_id]["status"] = 2
+        timer = threading.Timer(delay, update)
+        timer.start()
+        self.addCleanup(timer.cancel)
+
+    def test_iter_ready(self):
+        """_summary_"""
+        first = self.server.add_datasource(status=0)
+        second = self.server.add_datasource(status=1)
+        ready = self.server.add_datasource(status=2)
+        self.ready_later(second, 0.05)
+        self.ready_later(first, 0.25)
+        datasources = list(self.client.iter_ready([first, second, ready], poll_interval=0.02, max_poll_interval=0.1))
+        self.assertEqual([source.id for source in datasources], [ready, second, first])
+        self.assertEqual(self.server.count("GET", "/api/v1/datasources/"), 0)
+
+    def test_wait_until_ready(self):
+        """_summary_"""
+        first = self.server.add_datasource(status=0)
+        second = self.server.add_datasource(status=0)
+        self.ready_later(first, 0.05)
+        futures = self.client.wait_until_ready([first, second], timeout=0.3, poll_interval=0.02)
+        self.assertEqual(futures[first].result(timeout=2).status, 2)
+        with self.assertRaises(TimeoutError):
+            futures[second].result(timeout=2)
+
+    def test_unknown_datasource(self):
+        """_summary_"""
+        with self.assertRaises(AimanError):
+            list(self.client.iter_ready(4711, poll_interval=0.01))
+
+    def test_adaptive_interval(self):
+        """_summary_"""
+        tracker = ReadinessTracker([1, 2], poll_interval=1.0, max_poll_interval=3.0, multiplier=2.0)
+        tracker.update([{"id": 1, "status": 0}, {"id": 2, "status": 0}])
+        self.assertEqual([tracker.next_delay() for _ in range(3)], [1.0, 2.0, 3.0])
+        ready, unknown = tracker.update([{"id": 1, "status": 2}])
+        self.assertEqual(([source.id for source in ready], unknown), ([1], [2]))
+        self.assertEqual(tracker.next_delay(), 1.0)
+        tracker.deadline = time.monotonic() - 1
+        with self.assertRaises(TimeoutError):
+            tracker.next_delay()
+
+
+class AsyncReadinessTest(unittest.IsolatedAsyncioTestCase):
+    """_summary_
+
+    Args:
+        unittest (_type_): _description_
+    """
+    async def test_wait_until_ready(self):
+        """_summary_"""
+        statuses = {1: 0, 2: 2}
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            if request.url.path.endswith("auth/authenticate"):
+                data = {"access_token": create_token(), "refresh_token": "refresh"}
+            else:
+                data = {"datasources": [{"id": key, "name": "source", "status": value}
+                                        for key, value in statuses.items()]}
+                statuses[1] = 2
+            return httpx.Response(200, json={"messageContent": {"data": data}})
+
+        transport = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        async with AsyncAimanClient(host_url="https://aiman.test", user_name="user", password="pw",
+                                    client=transport) as client:
+            ready = [source.id async for source in client.iter_ready([1, 2], poll_interval=0.01)]
+            self.assertEqual(ready, [2, 1])
+            statuses[1] = 0
+            futures = client.wait_until_ready([1, 2], poll_interval=0.01)
+            datasources = await asyncio.gather(*futures.values())
+            self.assertEqual([source.status for source in datasources], [2, 2])
@@ -0,0 +1,116 @@
+"""response cache test module"""
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from aiman.client import AimanClient
+from aiman.core.cache import MemoryResponseCache, ResponseCache, SQLiteResponseCache
+from aiman.core.classes import PromptOptions
+from tests.aiman.fake_server import FakeAimanServer
+
+DETERMINISTIC = PromptOptions(temperature=0, seed=42)
+
+
+class ResponseCacheTest(unittest.TestCase):
+    """_summary_
+
+    Args:
+        unittest (_type_): _description_
+    """
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, True)
+        self.server = FakeAimanServer().start()
+        self.addCleanup(self.server.close)
+        self.client = AimanClient(
+            host_url=self.server.url, user_name="user", password="pw",
+            response_cache=MemoryResponseCache(ttl=60))
+        self.addCleanup(self.client.close)
+
+    def test_repeated_prompt(self):
+        """_summary_"""
+        options = PromptOptions(temperature=0, seed=42)
+        first = self.client.prompt(model_tag_id=10, query="hello", prompt_options=options)
+        second = self.client.prompt(
+            model_tag_id=10, query="hello", prompt_options=PromptOptions(temperature=0, seed=42))
+        self.assertNotIn("fromCache", first)
+        self.assertTrue(second["fromCache"])
+        self.assertEqual(second["responseText"], first["responseText"])
+        self.assertEqual(self.server.count("POST", "/api/v1/prompts"), 1)
+        self.client.prompt(model_tag_id=10, query="hello", prompt_options=PromptOptions(temperature=0, seed=7))
+        self.client.prompt(model_tag_id=10, query="hello", prompt_options=options, use_cache=False)
+        self.assertEqual(self.server.count("POST", "/api/v1/prompts"), 3)
+        stats = self.client.response_cache.stats()
+        self.assertEqual((stats.hits, stats.misses, stats.entries), (1, 2, 2))
+        self.assertGreater(stats.bytes_saved, 0)
+
+    def test_sampling_prompt(self):
+        """_summary_"""
+        for options in (PromptOptions(), PromptOptions(temperature=0), PromptOptions(seed=42)):
+            for _ in range(2):
+                self.assertNotIn("fromCache", self.client.prompt(
+                    model_tag_id=10, query="hello", prompt_options=options))
+        self.assertEqual(self.server.count("POST", "/api/v1/prompts"), 6)
+        self.assertEqual(self.client.response_cache.stats().misses, 0)
+        # an explicit opt in caches a sampling prompt too
+        self.client.prompt(model_tag_id=10, query="hello", use_cache=True)
+        self.assertTrue(self.client.prompt(model_tag_id=10, query="hello", use_cache=True)["fromCache"])
+
+    def test_attachment_digest(self):
+        """_summary_"""
+        path = os.path.join(self.directory, "notes.txt")
+        with open(path, "w", encoding="utf-8") as file:
+            file.write("first")
+        arguments = {"model_tag_id": 10, "query": "summarize", "attachments": [path],
+                     "prompt_options": DETERMINISTIC}
+        self.client.prompt(**arguments)
+        self.client.stream_attachments = True
+        self.assertTrue(self.client.prompt(**arguments)["fromCache"])
+        with open(path, "w", encoding="utf-8") as file:
+            file.write("second")
+        self.assertNotIn("fromCache", self.client.prompt(**arguments))
+
+    def test_datasource_prompt(self):
+        """_summary_"""
+        datasource_id = self.server.add_datasource()
+        for _ in range(3):
+            self.client.prompt_on_datasource(datasource_id=datasource_id, model_tag_id=10, query="hello",
+                                             prompt_options=DETERMINISTIC)
+        self.assertEqual(self.server.count("POST", "/api/v1/prompts"), 1)
+
+    def test_abstract(self):
+        """_summary_"""
+        with self.assertRaises(TypeError):
+            ResponseCache()  # pylint: disable=abstract-class-instantiated
+
+    def test_memory_ttl_and_lru(self):
+        """_summary_"""
+        cache = MemoryResponseCache(ttl=0.05, max_entries=2)
+        for key in ("a", "b", "c"):
+            cache.set(key, {"responseText": key})
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.get("c"), {"responseText": "c"})
+        time.sleep(0.06)
+        self.assertIsNone(cache.get("c"))
+        stats = cache.stats()
+        self.assertEqual((stats.hits, stats.misses, stats.evictions, stats.entries), (1, 2, 1, 1))
+
+    def test_sqlite_persists(self):
+        """_summary_"""
+        path = os.path.join(self.directory, "responses.db")
+        cache = SQLiteResponseCache(path, max_entries=2)
+        for key in ("a", "b", "c"):
+            cache.set(key, {"responseText": key})
+        cache.close()
+        cache = SQLiteResponseCache(path)
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.get("b"), {"responseText": "b"})
+        self.assertEqual(cache.stats().entries, 2)
+        cache.clear()
+        self.assertEqual(cache.stats().entries, 0)
+        cache.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+"""retry test module"""
+import time
+import unittest
+from aiman.client import AimanClient
+from aiman.core.classes import RequestType
+from aiman.core.exceptions import AimanError, AuthError, RateLimitedError, ServerError
+from aiman.core.retry import RetryPolicy
+from tests.aiman.fake_server import FakeAimanServer
+
+
+class RetryTest(unittest.TestCase):
+    """_summary_
+
+    Args:
+        unittest (_type_): _description_
+    """
+    def setUp(self):
+        self.server = FakeAimanServer().start()
+        self.addCleanup(self.server.close)
+        self.client = AimanClient(
+            host_url=self.server.url, user_name="user", password="pw",
+            retry_policy=RetryPolicy(backoff_factor=0.01))
+        self.addCleanup(self.client.close)
+
+    def test_get_is_retried(self):
+        """_summary_"""
+        self.server.fail_next(503, count=2, path="/api/v1/models")
+        models = self.client.get_models()
+        self.assertEqual(len(models), 2)
+        self.assertEqual(self.server.count("GET", "/api/v1/models"), 3)
+
+    def test_retry_after_is_respected(self):
+        """_summary_"""
+        self.server.fail_next(429, path="/api/v1/models", headers={"Retry-After": "0.2"})
+        started = time.monotonic()
+        self.client.get_models()
+        self.assertGreaterEqual(time.monotonic() - started, 0.2)
+
+    def test_attempts_exhausted(self):
+        """_summary_"""
+        self.server.fail_next(503, count=3, path="/api/v1/models")
+        with self.assertRaises(ServerError) as context:
+            self.client.get_models()
+        self.assertEqual(context.exception.status_code, 503)
+        self.assertEqual(self.server.count("GET", "/api/v1/models"), 3)
+
+    def test_prompt_is_not_retried(self):
+        """_summary_"""
+        self.server.fail_next(503, path="/api/v1/prompts")
+        with self.assertRaises(ServerError):
+            self.client.prompt(model_tag_id=10, query="hello")
+        self.assertEqual(self.server.count("POST", "/api/v1/prompts"), 1)
+
+    def test_prompt_retried_when_enabled(self):
+        """_summary_"""
+        self.client.retry_policy = RetryPolicy(backoff_factor=0.01, retry_prompts=True)
+        self.server.fail_next(502, path="/api/v1/prompts")
+        response = self.client.prompt(model_tag_id=10, query="hello")
+        self.assertEqual(response["responseText"], "echo: hello")
+        self.assertEqual(self.server.count("POST", "/api/v1/prompts"), 2)
+
+    def test_typed_errors(self):
+        """_summary_"""
+        self.server.fail_next(429, count=3, path="/api/v1/models", headers={"Retry-After": "0"})
+        with self.assertRaises(RateLimitedError) as context:
+            self.client.get_models()
+        self.assertEqual(context.exception.retry_after, 0.0)
+        self.server.fail_next(404, path="/api/v1/datasources")
+        with self.assertRaises(AimanError) as context:
+            self.client.get_datasource_by_id(1)
+        self.assertEqual(context.exception.status_code, 404)
+        self.assertIsInstance(context.exception, RuntimeError)
+        self.server.fail_next(401, path="/api/v1/auth/authenticate")
+        with self.assertRaises(AuthError):
+            AimanClient(host_url=self.server.url, user_name="user", password="wrong").get_models()
+
+    def test_deadline(self):
+        """_summary_"""
+        self.client.retry_policy = RetryPolicy(max_attempts=10, deadline=0.3)
+        self.server.fail_next(503, count=10, path="/api/v1/models", headers={"Retry-After": "0.2"})
+        started = time.monotonic()
+        with self.assertRaises(ServerError):
+            self.client.get_models()
+        self.assertLess(time.monotonic() - started, 0.6)
+        self.assertEqual(self.server.count("GET", "/api/v1/models"), 2)
+
+    def test_policy(self):
+        """_summary_"""
+        policy = RetryPolicy(backoff_factor=1.0, max_backoff=3.0)
+        self.assertTrue(policy.allows(RequestType.GET, "/api/v1/models"))
+        self.assertFalse(policy.allows(RequestType.POST, "/api/v1/prompts/1"))
+        self.assertFalse(RetryPolicy.disabled().allows(RequestType.GET, "/api/v1/models"))
+        self.assertTrue(all(0 <= policy.backoff(5) <= 3.0 for _ in range(50)))
+        self.assertEqual(policy.backoff(1, retry_after=2.5), 2.5)
+        self.assertEqual(RetryPolicy.parse_retry_after("7"), 7.0)
+        self.assertEqual(RetryPolicy.parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT"), 0.0)
+        self.assertIsNone(RetryPolicy.parse_retry_after("soon"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+"""session test module"""
+import unittest
+from urllib3.util.retry import Retry
+from aiman.client import AimanClient
+from aiman.core.retry import RetryPolicy
+from aiman.core.session import SessionOptions
+
+
+class SessionTest(unittest.TestCase):
+    """_summary_
+
+    Args:
+        unittest (_type_): _description_
+    """
+    def test_create_session(self):
+        """_summary_"""
+        session = SessionOptions(pool_connections=2, pool_maxsize=32, max_retries=3).create_session()
+        adapter = session.get_adapter("https://aiman-api.brandcompete.com")
+        pools = adapter.poolmanager
+        self.assertEqual(pools.connection_pool_kw["maxsize"], 32)
+        for host in ("a", "b", "c"):
+            pools.connection_from_url(f"https://{host}.brandcompete.com")
+        # only pool_connections hosts keep a pool
+        self.assertEqual(len(pools.pools), 2)
+        self.assertEqual(adapter.max_retries.total, 3)
+        self.assertIs(session.get_adapter("http://localhost"), adapter)
+        session.close()
+
+    def test_retry_adapter(self):
+        """_summary_"""
+        retry = Retry(total=5, backoff_factor=0.5, status_forcelist=[502, 503])
+        adapter = SessionOptions(max_retries=retry).create_adapter()
+        self.assertEqual(adapter.max_retries.total, 5)
+        self.assertEqual(adapter.max_retries.status_forcelist, [502, 503])
+
+    def test_client_retries(self):
+        """_summary_"""
+        with AimanClient(host_url="https://aiman-api.brandcompete.com", user_name="user", password="pw") as client:
+            # the retry policy retries, the adapter does not retry its attempts again
+            self.assertEqual(client.session.get_adapter("https://aiman-api.brandcompete.com").max_retries.total, 0)
+        options = SessionOptions(max_retries=3)
+        with self.assertRaises(ValueError):
+            AimanClient(host_url="https://aiman-api.brandcompete.com", user_name="user", password="pw",
+                        session_options=options)
+        with AimanClient(host_url="https://aiman-api.brandcompete.com", user_name="user", password="pw",
+                         session_options=options, retry_policy=RetryPolicy.disabled()) as client:
+            self.assertEqual(client.session.get_adapter("https://aiman-api.brandcompete.com").max_retries.total, 3)
+        self.assertEqual(options.max_retries, 3)
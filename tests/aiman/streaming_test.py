@@ -0,0 +1,77 @@
+"""streaming test module"""
+import time
+import unittest
+from aiman.client import AimanClient, AsyncAimanClient
+from aiman.core.streaming import StreamDecoder
+from tests.aiman.fake_server import FakeAimanServer
+
+
+class StreamDecoderTest(unittest.TestCase):
+    """_summary_
+
+    Args:
+        unittest (_type_): _description_
+    """
+    def test_split_ndjson(self):
+        """_summary_"""
+        decoder = StreamDecoder("application/x-ndjson")
+        self.assertEqual(decoder.feed(b'{"responseText": "he'), [])
+        self.assertEqual(decoder.feed(b'llo"}\n{"response": " world"}\n{"done": true}'), ["hello", " world"])
+        self.assertEqual(decoder.flush(), [])
+        self.assertEqual(decoder.last_event, {"done": True})
+
+    def test_server_sent_events(self):
+        """_summary_"""
+        decoder = StreamDecoder("text/event-stream")
+        chunk = b'event: token\ndata: {"choices": [{"delta": {"content": "hi"}}]}\n\n: ping\ndata: [DONE]\n\n'
+        self.assertEqual(decoder.feed(chunk), ["hi"])
+
+    def test_plain_text(self):
+        """_summary_"""
+        decoder = StreamDecoder("text/plain; charset=utf-8")
+        encoded = "grüße".encode("utf-8")
+        self.assertEqual(decoder.feed(encoded[:3]) + decoder.feed(encoded[3:]) + decoder.flush(), ["gr", "üße"])
+
+
+class StreamingClientTest(unittest.IsolatedAsyncioTestCase):
+    """_summary_
+
+    Args:
+        unittest (_type_): _description_
+    """
+    def setUp(self):
+        self.server = FakeAimanServer().start()
+        self.addCleanup(self.server.close)
+
+    def test_prompt_stream(self):
+        """_summary_"""
+        self.server.stream_delay = 0.1
+        with AimanClient(host_url=self.server.url, user_name="user", password="pw") as client:
+            started = time.monotonic()
+            deltas = client.prompt_stream(model_tag_id=10, query="one two three four")
+            first = next(deltas)
+            time_to_first_token = time.monotonic() - started
+            self.assertEqual(first + "".join(deltas), "echo: one two three four")
+            self.assertLess(time_to_first_token, 0.3)
+
+    def test_prompt_stream_formats(self):
+        """_summary_"""
+        with AimanClient(host_url=self.server.url, user_name="user", password="pw") as client:
+            for stream_format in ["sse", "text"]:
+                self.server.stream_format = stream_format
+                deltas = list(client.prompt_stream(model_tag_id=10, datasource_id=3, query="a b"))
+                self.assertEqual("".join(deltas), "echo: a b")
+
+    def test_prompt_stream_error(self):
+        """_summary_"""
+        self.server.fail_next(503, path="/api/v1/prompts")
+        with AimanClient(host_url=self.server.url, user_name="user", password="pw") as client:
+            with self.assertRaises(RuntimeError):
+                client.prompt_stream(model_tag_id=10, query="a")
+
+    async def test_async_prompt_stream(self):
+        """_summary_"""
+        self.server.stream_format = "sse"
+        async with AsyncAimanClient(host_url=self.server.url, user_name="user", password="pw") as client:
+            deltas = [delta async for delta in client.prompt_stream(model_tag_id=10, query="x y z")]
+        self.assertEqual(deltas, ["echo:", " x", " y", " z"])
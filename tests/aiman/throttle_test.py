@@ -0,0 +1,151 @@
+"""request throttling test module"""
+import asyncio
+import os
+import tempfile
+import threading
+import time
+import unittest
+from aiman.client import AimanClient
+from aiman.core.retry import RetryPolicy
+from aiman.core.throttle import FileBucketBackend, LocalBucketBackend, RateLimit, RouteLimiter, route_group
+from tests.aiman.fake_server import FakeAimanServer
+
+
+class ThreadRecordingBackend(LocalBucketBackend):
+    """Remembers the threads which updated a bucket"""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.threads = set()
+
+    def update(self, key, change):
+        self.threads.add(threading.current_thread())
+        return super().update(key, change)
+
+
+def fixed_clock_backend(path: str, now: float) -> FileBucketBackend:
+    """Create a file backend whose clock stands still"""
+    backend = FileBucketBackend(path)
+    backend.clock = lambda: now
+    return backend
+
+
+class ThrottleTest(unittest.TestCase):
+    """_summary_
+
+    Args:
+        unittest (_type_): _description_
+    """
+    def test_route_group(self):
+        """_summary_"""
+        self.assertEqual(route_group("/api/v1/prompts/10"), "prompts")
+        self.assertEqual(route_group("/api/v1/datasources/3"), "datasources")
+        self.assertEqual(route_group("/api/v1/models"), "models")
+        self.assertEqual(route_group("/api/v1/other"), "default")
+
+    def test_token_bucket(self):
+        """_summary_"""
+        limiter = RouteLimiter(limits={"prompts": RateLimit(rate=10, burst=2)})
+        waits = [limiter.reserve("/api/v1/prompts/10") for _ in range(4)]
+        self.assertEqual(waits[:2], [0.0, 0.0])
+        self.assertAlmostEqual(waits[2], 0.1, delta=0.01)
+        self.assertAlmostEqual(waits[3], 0.2, delta=0.01)
+        self.assertEqual(limiter.reserve("/api/v1/datasources"), 0.0)
+        self.assertEqual(limiter.throttled, 2)
+
+    def test_adapts_to_429(self):
+        """_summary_"""
+        limiter = RouteLimiter(default=RateLimit(rate=100), recovery=0.25)
+        limiter.feedback("/api/v1/models", 429, retry_after=0.5)
+        self.assertEqual(limiter.factor("models"), 0.5)
+        self.assertAlmostEqual(limiter.reserve("/api/v1/models"), 0.52, delta=0.02)
+        limiter.feedback("/api/v1/models", 200)
+        limiter.feedback("/api/v1/models", 200)
+        self.assertEqual(limiter.factor("models"), 1.0)
+        for _ in range(10):
+            limiter.feedback("/api/v1/models", 429)
+        self.assertEqual(limiter.factor("models"), limiter.min_factor)
+
+    def test_shared_file_backend(self):
+        """_summary_"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "aiman-quota.json")
+            limits = {"prompts": RateLimit(rate=10, burst=1)}
+            now = time.time()
+            first = RouteLimiter(limits=limits, backend=fixed_clock_backend(path, now))
+            second = RouteLimiter(limits=limits, backend=fixed_clock_backend(path, now))
+            self.assertEqual(first.reserve("/api/v1/prompts/10"), 0.0)
+            self.assertAlmostEqual(second.reserve("/api/v1/prompts/10"), 0.1)
+            first.feedback("/api/v1/prompts/10", 429)
+            self.assertAlmostEqual(second.reserve("/api/v1/prompts/10"), 0.4)
+            self.assertEqual(second.factor("prompts"), 0.5)
+
+    def test_max_in_flight(self):
+        """_summary_"""
+        limiter = RouteLimiter(limits={"prompts": RateLimit(max_in_flight=2)})
+        active, peak, lock = [0], [0], threading.Lock()
+
+        def call():
+            with limiter.acquire("/api/v1/prompts/10"):
+                with lock:
+                    active[0] += 1
+                    peak[0] = max(peak[0], active[0])
+                time.sleep(0.02)
+                with lock:
+                    active[0] -= 1
+
+        threads = [threading.Thread(target=call) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(peak[0], 2)
+
+    def test_async_max_in_flight(self):
+        """_summary_"""
+        limiter = RouteLimiter(limits={"prompts": RateLimit(max_in_flight=3)})
+        active, peak = [0], [0]
+
+        async def call():
+            async with limiter.acquire_async("/api/v1/prompts/10"):
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+                await asyncio.sleep(0.01)
+                active[0] -= 1
+
+        async def main():
+            await asyncio.gather(*[call() for _ in range(10)])
+
+        asyncio.run(main())
+        self.assertEqual(peak[0], 3)
+        # a second event loop gets slots of its own
+        asyncio.run(main())
+        self.assertEqual(peak[0], 3)
+
+    def test_async_rate(self):
+        """_summary_"""
+        backend = ThreadRecordingBackend()
+        limiter = RouteLimiter(limits={"prompts": RateLimit(rate=20, burst=1)}, backend=backend)
+
+        async def main():
+            for _ in range(3):
+                async with limiter.acquire_async("/api/v1/prompts/10"):
+                    pass
+
+        started = time.perf_counter()
+        asyncio.run(main())
+        self.assertGreaterEqual(time.perf_counter() - started, 0.09)
+        self.assertEqual(limiter.throttled, 2)
+        # the backend may block, it is never called on the event loop
+        self.assertNotIn(threading.main_thread(), backend.threads)
+
+    def test_client(self):
+        """_summary_"""
+        limiter = RouteLimiter(default=RateLimit(rate=50, burst=5))
+        with FakeAimanServer() as server, AimanClient(
+                host_url=server.url, user_name="user", password="pw", route_limiter=limiter,
+                retry_policy=RetryPolicy(backoff_factor=0.001, retry_prompts=True)) as client:
+            server.fail_next(429, path="/api/v1/prompts", headers={"Retry-After": "0"})
+            self.assertEqual(client.prompt(model_tag_id=10, query="hello")["responseText"], "echo: hello")
+            self.assertEqual(server.count("POST", "/api/v1/prompts"), 2)
+            self.assertEqual(limiter.factor("prompts"), 0.5 + limiter.recovery)
@@ -0,0 +1,208 @@
+"""chunked upload test module"""
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from aiman.client import AimanClient, AsyncAimanClient
+from aiman.core.cache import MemoryResponseCache
+from aiman.core.classes import PromptOptions
+from aiman.core.exceptions import ServerError
+from aiman.core.retry import RetryPolicy
+from aiman.core.upload import ChunkedUploadOptions, UploadJournal
+from tests.aiman.fake_server import FakeAimanServer
+
+PART_SIZE = 64 * 1024
+
+
+class UploadTest(unittest.TestCase):
+    """_summary_
+
+    Args:
+        unittest (_type_): _description_
+    """
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, True)
+        self.server = FakeAimanServer().start()
+        self.addCleanup(self.server.close)
+        self.progress = []
+        self.path = os.path.join(self.directory, "large.pdf")
+        with open(self.path, "wb") as file:
+            file.write(os.urandom(5 * PART_SIZE + 100))
+        self.small = os.path.join(self.directory, "small.txt")
+        with open(self.small, "w", encoding="utf-8") as file:
+            file.write("small")
+        self.journal = os.path.join(self.directory, "uploads.json")
+
+    def create_client(self, retry_policy: RetryPolicy = None, **kwargs) -> AimanClient:
+        """_summary_"""
+        options = ChunkedUploadOptions(part_size=PART_SIZE, threshold=PART_SIZE, journal_path=self.journal,
+                                       on_part=self.progress.append)
+        client = AimanClient(host_url=self.server.url, user_name="user", password="pw",
+                             chunked_upload=options, retry_policy=retry_policy, **kwargs)
+        self.addCleanup(client.close)
+        return client
+
+    def part_requests(self) -> int:
+        """_summary_"""
+        return sum(1 for call in self.server.calls if call[0] == "PUT" and "/parts/" in call[1])
+
+    def test_prompt_and_documents(self):
+        """_summary_"""
+        client = self.create_client()
+        response = client.prompt(model_tag_id=10, query="summarize", attachments=[self.path, self.small])
+        self.assertEqual(response["attachments"], ["large.pdf", "small.txt"])
+        upload = self.server.uploads["upload-1"]
+        self.assertEqual((upload["parts"], upload["bytes"], upload["complete"]), (6, 5 * PART_SIZE + 100, True))
+        prompt_request = [entry for entry in self.server.received if entry[1].startswith("/api/v1/prompts")][0]
+        self.assertLess(prompt_request[3], PART_SIZE)
+        self.assertEqual([event.part for event in self.progress], [1, 2, 3, 4, 5, 6])
+
+        datasource_id = self.server.add_datasource()
+        datasource = client.add_documents(datasource_id, [self.path])
+        self.assertEqual(datasource["datasource"]["media"][0]["name"], "large.pdf")
+        # the completed upload is referenced again instead of being sent twice
+        self.assertEqual((len(self.server.uploads), self.part_requests()), (1, 6))
+
+    def test_part_retries(self):
+        """_summary_"""
+        client = self.create_client(RetryPolicy(backoff_factor=0.001))
+        self.server.fail_next(503, path="/api/v1/uploads/upload-1/parts/2")
+        client.prompt(model_tag_id=10, query="summarize", attachments=[self.path])
+        self.assertEqual(self.part_requests(), 7)
+        self.assertTrue(self.server.uploads["upload-1"]["complete"])
+
+    def test_resume(self):
+        """_summary_"""
+        client = self.create_client(RetryPolicy.disabled())
+        self.server.fail_next(500, path="/api/v1/uploads/upload-1/parts/3")
+        with self.assertRaises(ServerError):
+            client.prompt(model_tag_id=10, query="summarize", attachments=[self.path])
+        self.assertEqual(self.server.uploads["upload-1"]["parts"], 3)
+
+        # a new client (or process) finds the upload in the journal and sends only the missing parts
+        self.progress.clear()
+        self.create_client().prompt(model_tag_id=10, query="summarize", attachments=[self.path])
+        self.assertEqual([event.part for event in self.progress], [4, 5, 6])
+        self.assertEqual(self.progress[0].resumed_at, 3)
+        self.assertEqual((len(self.server.uploads), self.part_requests()), (1, 7))
+        self.assertTrue(self.server.uploads["upload-1"]["complete"])
+
+    def test_expired_upload(self):
+        """_summary_"""
+        client = self.create_client(RetryPolicy.disabled())
+        self.server.fail_next(500, path="/api/v1/uploads/upload-1/parts/1")
+        with self.assertRaises(ServerError):
+            client.prompt(model_tag_id=10, query="summarize", attachments=[self.path])
+        del self.server.uploads["upload-1"]
+        client.prompt(model_tag_id=10, query="summarize", attachments=[self.path])
+        self.assertTrue(self.server.uploads["upload-2"]["complete"])
+
+    def test_invalid_prompt(self):
+        """_summary_"""
+        with self.assertRaises(ValueError):
+            self.create_client().prompt(query="summarize", attachments=[self.path])
+        self.assertEqual(self.server.uploads, {})
+
+    def test_cached_prompt(self):
+        """_summary_"""
+        client = self.create_client(response_cache=MemoryResponseCache())
+        options = PromptOptions(temperature=0, seed=42)
+        client.prompt(model_tag_id=10, query="summarize", attachments=[self.path], prompt_options=options)
+        calls = len(self.server.calls)
+        response = client.prompt(model_tag_id=10, query="summarize", attachments=[self.path], prompt_options=options)
+        self.assertTrue(response["fromCache"])
+        # the cache hit is found by the file content, the upload is not even looked up again
+        self.assertEqual(len(self.server.calls), calls)
+
+    def test_below_threshold(self):
+        """_summary_"""
+        self.create_client().prompt(model_tag_id=10, query="summarize", attachments=[self.small])
+        self.assertEqual(self.server.uploads, {})
+
+
+class UploadJournalTest(unittest.TestCase):
+    """_summary_
+
+    Args:
+        unittest (_type_): _description_
+    """
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, True)
+        self.path = os.path.join(self.directory, "uploads.json")
+
+    def test_shared_path(self):
+        """_summary_"""
+        first, second = UploadJournal(self.path), UploadJournal(self.path)
+        first.set("a", "upload-1")
+        second.set("b", "upload-2")
+        first.set("c", "upload-3")
+        # no journal overwrites the entries of the other one
+        for journal in (first, second, UploadJournal(self.path)):
+            self.assertEqual([journal.get(key) for key in "abc"], ["upload-1", "upload-2", "upload-3"])
+        second.set("a", None)
+        self.assertIsNone(first.get("a"))
+        self.assertEqual(sorted(os.listdir(self.directory)), ["uploads.json", "uploads.json.lock"])
+
+    def test_corrupt_file(self):
+        """_summary_"""
+        with open(self.path, "w", encoding="utf-8") as file:
+            file.write('{"a": "upl')
+        journal = UploadJournal(self.path)
+        self.assertIsNone(journal.get("a"))
+        journal.set("b", "upload-2")
+        self.assertEqual(UploadJournal(self.path).get("b"), "upload-2")
+
+    def test_expired_entries(self):
+        """_summary_"""
+        first, second = UploadJournal(self.path, ttl=0.2), UploadJournal(self.path)
+        first.set("a", "upload-1")
+        second.set("b", "upload-2")
+        time.sleep(0.3)
+        self.assertIsNone(second.get("a"))
+        second.set("c", "upload-3")
+        # the next change removes the expired entry from the file
+        with open(self.path, "r", encoding="utf-8") as file:
+            self.assertEqual(sorted(json.load(file)), ["b", "c"])
+
+
+class AsyncUploadTest(unittest.IsolatedAsyncioTestCase):
+    """_summary_
+
+    Args:
+        unittest (_type_): _description_
+    """
+    async def test_add_documents(self):
+        """_summary_"""
+        with tempfile.TemporaryDirectory() as directory, FakeAimanServer() as server:
+            path = os.path.join(directory, "large.pdf")
+            with open(path, "wb") as file:
+                file.write(os.urandom(3 * PART_SIZE))
+            datasource_id = server.add_datasource()
+            options = ChunkedUploadOptions(part_size=PART_SIZE, threshold=PART_SIZE)
+            async with AsyncAimanClient(host_url=server.url, user_name="user", password="pw",
+                                        chunked_upload=options) as client:
+                await client.add_documents(datasource_id, [path])
+                response = await client.prompt(model_tag_id=10, query="summarize", attachments=[path])
+            self.assertEqual(response["attachments"], ["large.pdf"])
+            self.assertEqual(server.uploads["upload-1"]["parts"], 3)
+            self.assertEqual(len(server.uploads), 1)
+
+    async def test_cached_prompt(self):
+        """_summary_"""
+        with tempfile.TemporaryDirectory() as directory, FakeAimanServer() as server:
+            path = os.path.join(directory, "large.pdf")
+            with open(path, "wb") as file:
+                file.write(os.urandom(3 * PART_SIZE))
+            options = ChunkedUploadOptions(part_size=PART_SIZE, threshold=PART_SIZE)
+            async with AsyncAimanClient(host_url=server.url, user_name="user", password="pw",
+                                        chunked_upload=options, response_cache=MemoryResponseCache()) as client:
+                responses = [await client.prompt(model_tag_id=10, query="summarize", attachments=[path],
+                                                 prompt_options=PromptOptions(temperature=0, seed=42))
+                             for _ in range(2)]
+            self.assertEqual(responses[0]["attachments"], ["large.pdf"])
+            self.assertTrue(responses[1]["fromCache"])
+            self.assertEqual(len(server.uploads), 1)
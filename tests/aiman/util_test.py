@@ -30,6 +30,14 @@ class UtilTest(unittest.TestCase):
         parsed_url = aiman.Util.validate_url(url ="http://www.myUrl.com", check_only=False)
         self.assertEqual(parsed_url, "https://www.myUrl.com")
 
+    def test_validate_loopback_url(self):
+        """_summary_"""
+        parsed_url = aiman.Util.validate_url(url ="http://127.0.0.1:8080/", check_only=False)
+        self.assertEqual(parsed_url, "http://127.0.0.1:8080")
+
+        parsed_url = aiman.Util.validate_url(url ="http://localhost:8080", check_only=False)
+        self.assertEqual(parsed_url, "http://localhost:8080")
+
     def test_parse_filename(self):
         """_summary_"""
         test_path = f"{self.current_directory}/service_client_test.py"